@@ -64,13 +64,14 @@ class Observable(object):
 
 
 class BayesianOptimization(Observable):
-    def __init__(self, f, pbounds, random_state=None, verbose=2):
-        """"""
+    def __init__(self, f, pbounds, random_state=None, verbose=2, f_batch=None):
+        """f_batch (optional) evaluates a list of points at once (batch mode)"""
         self._random_state = ensure_rng(random_state)
 
         # Data structure containing the function to be optimized, the bounds of
         # its domain, and a record of the evaluations we have done so far
-        self._space = TargetSpace(f, pbounds, random_state)
+        self._space = TargetSpace(f, pbounds, random_state,
+                                  target_batch_func=f_batch)
 
         # queue
         self._queue = Queue()
@@ -112,6 +113,11 @@ class BayesianOptimization(Observable):
             self._space.probe(params)
             self.dispatch(Events.OPTMIZATION_STEP)
 
+    def probe_batch(self, params_list):
+        """Probe targets of several points at once"""
+        self._space.probe_batch(params_list)
+        self.dispatch(Events.OPTMIZATION_STEP)
+
     def suggest(self, utility_function):
         """Most promissing point to probe next"""
         if len(self._space) == 0:
@@ -134,6 +140,98 @@ class BayesianOptimization(Observable):
 
         return self._space.array_to_params(suggestion)
 
+    def suggest_batch(self, utility_function, batch_size, strategy='kb',
+                      pending=None):
+        """
+        Several diverse promissing points to probe next, in one GP fit
+
+        Each point is the argmax of the acquisition function once the pending
+        points and the previous points of the batch are added as fantasised
+        observations:
+        * 'kb' (Kriging believer): the fantasy is the GP mean at the point
+        * 'cl' (constant liar): the fantasy is the worst target found so far
+
+        Parameters
+        ----------
+        utility_function : UtilityFunction
+            The acquisition function.
+
+        batch_size : int
+            Number of points to suggest.
+
+        strategy : str
+            'kb' or 'cl'.
+
+        pending : list or None
+            Points being probed (target not yet known), as arrays.
+
+        Returns
+        -------
+        suggestions : list
+            batch_size points (as dicts).
+        """
+        if strategy not in ['kb', 'cl']:
+            raise NotImplementedError(
+                "The batch strategy {} has not been implemented, "
+                "please choose one of kb or cl.".format(strategy)
+            )
+
+        if len(self._space) == 0:
+            return [self._space.array_to_params(self._space.random_sample())
+                    for _ in range(batch_size)]
+
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            self._gp.fit(self._space.params, self._space.target)
+
+        # the fantasies are added without fitting again the kernel
+        # hyperparameters: only the first fit (on the real observations) does.
+        gp = GaussianProcessRegressor(
+            kernel=self._gp.kernel_,
+            alpha=self._gp.alpha,
+            normalize_y=self._gp.normalize_y,
+            optimizer=None,
+        )
+
+        params = self._space.params
+        target = self._space.target
+        y_liar = target.min()
+
+        if pending:
+            x_pending = np.asarray(pending, dtype=float).reshape(-1, self._space.dim)
+            if strategy == 'kb':
+                y_pending = self._gp.predict(x_pending)
+            else:
+                y_pending = np.full(len(x_pending), y_liar)
+            params = np.concatenate([params, x_pending])
+            target = np.concatenate([target, y_pending])
+
+        suggestions = []
+        for ii in range(batch_size):
+            if ii > 0 or pending:
+                with warnings.catch_warnings():
+                    warnings.simplefilter("ignore")
+                    gp.fit(params, target)
+            model = gp if ii > 0 or pending else self._gp
+
+            suggestion = acq_max(
+                ac=utility_function.utility,
+                gp=model,
+                y_max=target.max(),
+                bounds=self._space.bounds,
+                random_state=self._random_state
+            )
+            suggestions.append(self._space.array_to_params(suggestion))
+
+            if strategy == 'kb':
+                y_fantasy = model.predict(suggestion.reshape(1, -1))[0]
+            else:
+                y_fantasy = y_liar
+            params = np.concatenate([params, suggestion.reshape(1, -1)])
+            target = np.concatenate([target, [y_fantasy]])
+
+        return suggestions
+
     def _prime_queue(self, init_points):
         """Make sure there's something in the queue at the very beginning."""
         if self._queue.empty and self._space.empty:
@@ -155,8 +253,10 @@ class BayesianOptimization(Observable):
                  acq='ucb',
                  kappa=2.576,
                  xi=0.0,
+                 batch_size=1,
+                 batch_strategy='kb',
                  **gp_params):
-        """Mazimize your function"""
+        """Mazimize your function (batch_size points probed at once if > 1)"""
         self._prime_subscriptions()
         self.dispatch(Events.OPTMIZATION_START)
         self._prime_queue(init_points)
@@ -164,6 +264,24 @@ class BayesianOptimization(Observable):
 
         util = UtilityFunction(kind=acq, kappa=kappa, xi=xi)
         iteration = 0
+
+        if batch_size > 1:
+            while not self._queue.empty or iteration < n_iter:
+                x_batch = []
+                while not self._queue.empty and len(x_batch) < batch_size:
+                    x_batch.append(next(self._queue))
+                if not x_batch:
+                    x_batch = self.suggest_batch(
+                        util, min(batch_size, n_iter - iteration),
+                        strategy=batch_strategy
+                    )
+                    iteration += len(x_batch)
+
+                self.probe_batch(x_batch)
+
+            self.dispatch(Events.OPTMIZATION_END)
+            return
+
         while not self._queue.empty or iteration < n_iter:
             try:
                 x_probe = next(self._queue)
@@ -175,6 +293,77 @@ class BayesianOptimization(Observable):
 
         self.dispatch(Events.OPTMIZATION_END)
 
+    def maximize_async(self,
+                       f_submit,
+                       f_collect,
+                       workers,
+                       init_points=5,
+                       n_iter=25,
+                       acq='ucb',
+                       kappa=2.576,
+                       xi=0.0,
+                       batch_strategy='kb',
+                       **gp_params):
+        """
+        Mazimize your function, asynchronously
+
+        Up to `workers` points are probed at once. As soon as one is done, the
+        GP is fitted again and a new point suggested, the points still being
+        probed being added as fantasised observations (see suggest_batch).
+
+        Parameters
+        ----------
+        f_submit : function
+            Starts the evaluation of a point (given as dict) without waiting.
+
+        f_collect : function
+            Waits for the next evaluation done and returns (params, target),
+            params being the submitted dict.
+
+        workers : int
+            Maximum number of points probed at once.
+        """
+        self._prime_subscriptions()
+        self.dispatch(Events.OPTMIZATION_START)
+        self._prime_queue(init_points)
+        self.set_gp_params(**gp_params)
+
+        util = UtilityFunction(kind=acq, kappa=kappa, xi=xi)
+        iteration = 0
+        pending = []
+
+        while not self._queue.empty or iteration < n_iter or pending:
+            while len(pending) < workers and \
+                    (not self._queue.empty or iteration < n_iter):
+                try:
+                    x_probe = self._space._as_array(next(self._queue))
+                except StopIteration:
+                    x_probe = self._space._as_array(self.suggest_batch(
+                        util, 1, strategy=batch_strategy, pending=pending
+                    )[0])
+                    iteration += 1
+
+                # the same point is never probed twice
+                if x_probe in self._space or \
+                        any(np.array_equal(x_probe, x) for x in pending):
+                    x_probe = self._space.random_sample()
+
+                pending.append(x_probe)
+                f_submit(self._space.array_to_params(x_probe))
+
+            params, target = f_collect()
+            x_done = self._space._as_array(params)
+            for ii, x in enumerate(pending):
+                if np.array_equal(x_done, x):
+                    del pending[ii]
+                    break
+
+            if x_done not in self._space:
+                self._space.register(x_done, target)
+            self.dispatch(Events.OPTMIZATION_STEP)
+
+        self.dispatch(Events.OPTMIZATION_END)
+
     def set_bounds(self, new_bounds):
         """
         A method that allows changing the lower and upper searching bounds
@@ -22,7 +22,8 @@ class TargetSpace(object):
     >>> y = space.register_point(x)
     >>> assert self.max_point()['max_val'] == y
     """
-    def __init__(self, target_func, pbounds, random_state=None):
+    def __init__(self, target_func, pbounds, random_state=None,
+                 target_batch_func=None):
         """
         Parameters
         ----------
@@ -35,11 +36,16 @@ class TargetSpace(object):
 
         random_state : int, RandomState, or None
             optionally specify a seed for a random number generator
+
+        target_batch_func : function or None
+            Function evaluating a list of points (given as dicts) at once and
+            returning the list of their target values (used by probe_batch).
         """
         self.random_state = ensure_rng(random_state)
 
         # The function to be optimized
         self.target_func = target_func
+        self.target_batch_func = target_batch_func
 
         # Get the name of the parameters
         self._keys = sorted(pbounds)
@@ -195,6 +201,52 @@ class TargetSpace(object):
             self.register(x, target)
         return target
 
+    def probe_batch(self, params_list):
+        """
+        Evaulates several points at once, with the batch target function, and
+        records them as observations.
+
+        Notes
+        -----
+        The points previously seen (or repeated in params_list) are not
+        evaluated again: their cached value of y is returned.
+
+        Parameters
+        ----------
+        params_list : list
+            points, each with len(x) == self.dim
+
+        Returns
+        -------
+        targets : list
+            target function values, in the params_list order.
+        """
+        xs = [self._as_array(params) for params in params_list]
+
+        new_idx = []
+        new_keys = set()
+        for idx, x in enumerate(xs):
+            key = _hashable(x)
+            if key in self._cache or key in new_keys:
+                continue
+            new_keys.add(key)
+            new_idx.append(idx)
+
+        if new_idx:
+            if self.target_batch_func is None:
+                new_targets = [
+                    self.target_func(**dict(zip(self._keys, xs[idx])))
+                    for idx in new_idx
+                ]
+            else:
+                new_targets = self.target_batch_func(
+                    [dict(zip(self._keys, xs[idx])) for idx in new_idx]
+                )
+            for idx, target in zip(new_idx, new_targets):
+                self.register(xs[idx], target)
+
+        return [self._cache[_hashable(x)] for x in xs]
+
     def random_sample(self):
         """
         Creates random points within the bounds of the space.
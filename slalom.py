@@ -81,9 +81,93 @@ minimizeMethod = "Bayes"
 # The maximum number of iterations
 maxIter = 100
 
+# The number of simulations run concurrently (each one in its own sandbox directory)...
+# ...set to 1 to run the simulations one at a time, in place, in the output directory.
+# should not exceed the number of available cores and simulator licenses.
+workerCount = 1
+
+# Bayesian method with more than one worker: set bayesAsync to True to suggest a new point as soon as a simulation ends...
+# ...(the simulations still running being taken into account), or to False to suggest one batch of workerCount points at once.
+bayesAsync = False
+
+# The persistent evaluation cache directory, shared by the optimizations (and the users) with the same device...
+# ...the results are reused without launching the simulator. Set to None to disable the cache.
+# cacheSize is the maximum cache size in MB (the least recently used entries are removed).
+# the cache can be inspected or pruned with: python slalomCache.py --cacheDir ... --list (or --prune sizeMB)
+cacheDir = None
+cacheSize = 512
+
+# The maximum number of evaluations kept in memory to avoid evaluating twice the same parameters during an optimization...
+# ...the least recently used are removed first.
+memoSize = 4096
+
+# Early termination: set to a number of points (e.g. 4) to stop the simulator once the current changes sign (Voc crossed)...
+# ...plus this number of points, the outputs being extracted from the partial log. None to run the whole voltage sweep.
+earlyStop = None
+# the anode voltage and current columns of the simulator log (simuloutput_all.log), by their names in the log header...
+# ...or their positions in the data lines, e.g. (0, 1). None for the simulator defaults (v."anode" and i."anode").
+earlyStopColumns = None
+
+# Simulator watchdog: a simulation running longer than simulTimeout seconds (None: no limit)...
+# ...or simulTimeoutFactor times the mean duration of the complete full resolution simulations (None: not adaptive) is stopped and the evaluation failed.
+simulTimeout = None
+simulTimeoutFactor = None
+
+# Failure policy, when a simulation fails (simulator error or efficiency not evaluated):
+# "abort" (stop the optimization on simulator error or timeout), "penalty" (continue with failurePenalty as efficiency),...
+# ..."perturb" (retry with slightly perturbed parameters) or "relax" (retry with relaxed numerics)...
+# ...the failed evaluations being recorded in simuloutput_failed.txt
+failurePolicy = "abort"
+failurePenalty = 0.0
+
+# Bayesian warm start: list of results files (simuloutput_optimized.txt) of previous optimizations of the same device...
+# ...their points within the current bounds are registered before the Bayesian optimization (no random initialization).
+warmStart = None
+
+# Multi-fidelity (Bayesian method): set fidelity (e.g. 0.5) to explore with coarse evaluations (the input file resolution...
+# ...variables NPointsX, NPointsY..., voltagePoints and BeamWnum scaled by fidelity), the best fidelityPromote fraction...
+# ...being then evaluated at full resolution (the optimum given at full resolution). None to evaluate at full resolution only.
+# The promotion is single-stage: the promoted points are evaluated once at full resolution and the best one kept...
+# ...the warm start (full resolution) points being compared with them, not mixed with the coarse evaluations.
+fidelity = None
+fidelityPromote = 0.25
+
+# Brute mode sampling: "grid" (full factorial grid of the device paramPoints, indexed lazily: any number of parameters), "sobol" (quasi-random...
+# ...Sobol sequence) or "lhs" (Latin hypercube) with bruteBudget points (the parameters with paramPoints = 1 are kept fixed).
+bruteSampling = "grid"
+bruteBudget = 256
+
+# Brute grid indices range [bruteStart, bruteEnd) evaluated (bruteEnd None: up to the grid end)...
+# ...to share a large grid between several optimizations (e.g. on several machines), each one with its own range.
+bruteStart = 0
+bruteEnd = None
+
+# Brute surrogate pre-screening: set screening (e.g. 0.2) to skip the grid points whose efficiency upper confidence bound...
+# ...(Gaussian process fitted on the results so far) is less than screening times the maximum efficiency. None to evaluate all points.
+screening = None
+
+# The results are appended to simuloutput_results.jsonl (one record per evaluation, read incrementally by the monitor).
+# Set resultsText to False to not write the rows in simuloutput_optimized.txt (export them with slalomStore.py --export).
+resultsText = True
+
+# Simulator output files archiving: "header" (the title, comment and parameters written at the start of each file)...
+# ...or "rename" (the files only renamed, without rewriting: their header kept in simuloutput_manifest.jsonl).
+outputArchive = "header"
+
+# Incremental archiving: set archiveChunk (e.g. 100) to archive the output files on a background thread, in zip chunks...
+# ...sealed every archiveChunk evaluations (<outputDir>_archive), instead of zipping the output directory at the end.
+archiveChunk = None
+
 # Set to True to start the optimization with a random point
 randomInit = False
 
+# Set to the output directory of an interrupted optimization to resume it (with the same optimType and minimizeMethod)...
+# ...the evaluations done are replayed from the checkpoint (checkpoint.txt) instead of the simulator: counters, maximum...
+# ...and memoization restored (for all the modes, Brute included, and the asynchronous Bayesian method whose trajectory...
+# ...may differ after the replayed points, depending on the completion order), the Brute grid points already evaluated...
+# ...skipped, the failed evaluations simulated again and the new results appended. None to start a new optimization.
+resumeDir = None
+
 # Set to True to delete the output directory and all its content before optimization
 clearOutputDir = False
 
@@ -98,7 +182,7 @@ dirSepChar = '\\' if ('\\' in currentDir) else '/'
 # set to True to enable the SLALOM GUI
 enableGUI = True
 
-# command line arguments: python slalom.py --enableGUI --currentDir ... --remoteDir ... --remoteSSH ... --deviceType ... --optimType ... --minimizeMethod ...
+# command line arguments: python slalom.py --enableGUI --currentDir ... --remoteDir ... --remoteSSH ... --deviceType ... --optimType ... --minimizeMethod ... --workers ... --bayesAsync ... --cacheDir ... --earlyStop ... --timeout ... --timeoutFactor ... --failurePolicy ... --resume ... --warmStart ... --fidelity ... --screening ... --sampling ... --budget ... --bruteRange start:end --resultsText ... --outputArchive ... --archiveChunk ...
 # examples:
 # python slalom.py --enableGUI No
 # python slalom.py --currentDir "M:\\TCAD\\SLALOM\\Device\\Silvaco\\" --remoteDir "/home/sidi/SLALOM/Device/Silvaco/" --remoteSSH user@slalom --deviceType InGaN_PN --optimType Optim --minimizeMethod SLSQP
@@ -109,7 +193,7 @@ if argc >= 1:
     isValid = True
     errMsg = None
     try:
-        opts, args = getopt.getopt(sys.argv[1:], None, ["enableGUI=", "deviceSimulator=", "currentDir=", "remoteDir=", "remoteSSH=", "deviceType=", "optimType=", "minimizeMethod="])
+        opts, args = getopt.getopt(sys.argv[1:], None, ["enableGUI=", "deviceSimulator=", "currentDir=", "remoteDir=", "remoteSSH=", "deviceType=", "optimType=", "minimizeMethod=", "workers=", "bayesAsync=", "cacheDir=", "earlyStop=", "timeout=", "timeoutFactor=", "failurePolicy=", "resume=", "warmStart=", "fidelity=", "screening=", "sampling=", "budget=", "bruteRange=", "resultsText=", "outputArchive=", "archiveChunk="])
         print ("\n# ------------------ Command Line Arguments ---------------------")
         for opt, arg in opts:
             if opt == "--enableGUI":
@@ -179,6 +263,149 @@ if argc >= 1:
                     isValid = False
                     errMsg = "minimizeMethod: invalid option '%s'\n" % arg
                 # end if
+            elif opt == "--workers":
+                try:
+                    workerCount = int(arg)
+                except:
+                    workerCount = 0
+                # end try
+                if (workerCount >= 1) and (workerCount <= 256):
+                    print("workerCount: %d" % workerCount)
+                else:
+                    isValid = False
+                    errMsg = "workers: invalid number of workers '%s' (should be between 1 and 256)\n" % arg
+                # end if
+            elif opt == "--bayesAsync":
+                arg = arg.lower()
+                bayesAsync = True if ((arg == "yes") or (arg == "true")) else False
+                print("bayesAsync: " + str(bayesAsync))
+            elif opt == "--cacheDir":
+                cacheDir = None if (arg.lower() == "none") else arg
+                print("cacheDir: " + str(cacheDir))
+            elif opt == "--earlyStop":
+                if arg.lower() == "none":
+                    earlyStop = None
+                else:
+                    try:
+                        earlyStop = int(arg)
+                    except:
+                        earlyStop = 0
+                    # end try
+                    if (earlyStop < 1) or (earlyStop > 100):
+                        isValid = False
+                        errMsg = "earlyStop: invalid number of points '%s' (should be between 1 and 100)\n" % arg
+                    # end if
+                # end if
+                print("earlyStop: " + str(earlyStop))
+            elif (opt == "--timeout") or (opt == "--timeoutFactor"):
+                if arg.lower() == "none":
+                    timeoutT = None
+                else:
+                    try:
+                        timeoutT = float(arg)
+                    except:
+                        timeoutT = 0.0
+                    # end try
+                    if (timeoutT <= (0.0 if (opt == "--timeout") else 1.0)):
+                        isValid = False
+                        errMsg = "%s: invalid value '%s'\n" % (opt[2:], arg)
+                    # end if
+                # end if
+                if opt == "--timeout":
+                    simulTimeout = timeoutT
+                    print("simulTimeout: " + str(simulTimeout))
+                else:
+                    simulTimeoutFactor = timeoutT
+                    print("simulTimeoutFactor: " + str(simulTimeoutFactor))
+                # end if
+            elif opt == "--failurePolicy":
+                if arg in ("abort", "penalty", "perturb", "relax"):
+                    failurePolicy = arg
+                    print("failurePolicy: " + failurePolicy)
+                else:
+                    isValid = False
+                    errMsg = "failurePolicy: invalid option '%s'\n" % arg
+                # end if
+            elif opt == "--resume":
+                if os.path.isdir(arg):
+                    resumeDir = arg
+                    print("resumeDir: " + resumeDir)
+                else:
+                    isValid = False
+                    errMsg = "resume: output directory '%s' not found\n" % arg
+                # end if
+            elif opt == "--warmStart":
+                # comma-separated list of results files
+                warmStart = [tT for tT in arg.split(",") if (len(tT) > 0)]
+                listT = [tT for tT in warmStart if not os.path.isfile(tT)]
+                if len(listT) == 0:
+                    print("warmStart: " + ", ".join(warmStart))
+                else:
+                    isValid = False
+                    errMsg = "warmStart: results file '%s' not found\n" % listT[0]
+                # end if
+            elif opt == "--fidelity":
+                fidelity = None if (arg.lower() == "none") else float(arg)
+                if (fidelity is None) or ((fidelity > 0.0) and (fidelity < 1.0)):
+                    print("fidelity: " + str(fidelity))
+                else:
+                    isValid = False
+                    errMsg = "fidelity: invalid value '%s' (should be between 0 and 1)\n" % arg
+                # end if
+            elif opt == "--screening":
+                screening = None if (arg.lower() == "none") else float(arg)
+                if (screening is None) or ((screening > 0.0) and (screening < 1.0)):
+                    print("screening: " + str(screening))
+                else:
+                    isValid = False
+                    errMsg = "screening: invalid value '%s' (should be between 0 and 1)\n" % arg
+                # end if
+            elif opt == "--sampling":
+                if arg in ("grid", "sobol", "lhs"):
+                    bruteSampling = arg
+                    print("bruteSampling: " + bruteSampling)
+                else:
+                    isValid = False
+                    errMsg = "sampling: invalid option '%s' (grid, sobol or lhs)\n" % arg
+                # end if
+            elif opt == "--budget":
+                bruteBudget = int(arg)
+                if bruteBudget >= 1:
+                    print("bruteBudget: " + str(bruteBudget))
+                else:
+                    isValid = False
+                    errMsg = "budget: invalid number of points '%s'\n" % arg
+                # end if
+            elif opt == "--bruteRange":
+                listT = arg.split(":")
+                bruteStart = int(listT[0]) if (listT[0] != "") else 0
+                bruteEnd = int(listT[1]) if ((len(listT) > 1) and (listT[1] != "")) else None
+                if (bruteStart >= 0) and ((bruteEnd is None) or (bruteEnd > bruteStart)):
+                    print("bruteRange: " + str(bruteStart) + ":" + ("" if (bruteEnd is None) else str(bruteEnd)))
+                else:
+                    isValid = False
+                    errMsg = "bruteRange: invalid range '%s'\n" % arg
+                # end if
+            elif opt == "--resultsText":
+                arg = arg.lower()
+                resultsText = True if ((arg == "yes") or (arg == "true")) else False
+                print("resultsText: " + str(resultsText))
+            elif opt == "--outputArchive":
+                if arg in ("header", "rename"):
+                    outputArchive = arg
+                    print("outputArchive: " + outputArchive)
+                else:
+                    isValid = False
+                    errMsg = "outputArchive: invalid option '%s' (header or rename)\n" % arg
+                # end if
+            elif opt == "--archiveChunk":
+                archiveChunk = None if (arg.lower() == "none") else int(arg)
+                if (archiveChunk is None) or (archiveChunk >= 1):
+                    print("archiveChunk: " + str(archiveChunk))
+                else:
+                    isValid = False
+                    errMsg = "archiveChunk: invalid number of evaluations '%s'\n" % arg
+                # end if
             # end if
         # end for
         print ("# ---------------------------------------------------------------\n")
@@ -390,7 +617,7 @@ if remoteMon:
             dispError("Remote directory not found and cannot be created: " + tmpDir, doExit = True)
         # end if
 
-        pythonFiles = ['slalom.py', 'slalomCore.py', 'slalomDevice.py', 'slalomSimulator.py']
+        pythonFiles = ['slalom.py', 'slalomCore.py', 'slalomDevice.py', 'slalomSimulator.py', 'slalomEngine.py', 'slalomCache.py', 'slalomStore.py', 'slalomArchive.py', 'slalomJV.py', 'slalomOffline.py']
         for fileName in pythonFiles:
             shutil.copyfile(optDir + fileName, tmpDir + fileName)
         # end if
@@ -639,6 +866,26 @@ else:
             Optimizer.setMinimizeMethod(minimizeMethod, maxIter = maxIter, tolerance = 1e-3, optimPoints = 21)
         # end if
 
+        Optimizer.setWorkers(workerCount)
+        Optimizer.setBayesAsync(bayesAsync)
+        Optimizer.setCache(cacheDir, cacheSize)
+        Optimizer.setMemoSize(memoSize)
+        Optimizer.setEarlyStop(earlyStop, earlyStopColumns)
+        Optimizer.setTimeout(simulTimeout, simulTimeoutFactor)
+        Optimizer.setFailurePolicy(failurePolicy, failurePenalty)
+        Optimizer.setWarmStart(warmStart)
+        Optimizer.setFidelity(fidelity, fidelityPromote)
+        Optimizer.setScreening(screening)
+        Optimizer.setBruteSampling(bruteSampling, bruteBudget)
+        Optimizer.setBruteRange(bruteStart, bruteEnd)
+        Optimizer.setResultsText(resultsText)
+        Optimizer.setOutputArchive(outputArchive)
+        Optimizer.setArchiveChunk(archiveChunk)
+
+        if resumeDir is not None:
+            Optimizer.setResume(resumeDir)
+        # end if
+
         # set enableMonitor to True to start the optimizer monitor
         enableMonitor = enableGUI
         if enableMonitor:
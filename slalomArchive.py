@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================
+# SLALOM - Open-Source Solar Cell Multivariate Optimizer
+# Copyright(C) 2012-2019 Sidi OULD SAAD HAMADY (1,2,*), Nicolas FRESSENGEAS (1,2). All rights reserved.
+# (1) Université de Lorraine, Laboratoire Matériaux Optiques, Photonique et Systèmes, Metz, F-57070, France
+# (2) Laboratoire Matériaux Optiques, Photonique et Systèmes, CentraleSupélec, Université Paris-Saclay, Metz, F-57070, France
+# (*) sidi.hamady@univ-lorraine.fr
+# SLALOM source code is available to download from:
+# https://github.com/sidihamady/SLALOM
+# https://hal.archives-ouvertes.fr/hal-01897934
+# http://www.hamady.org/photovoltaics/slalom_source.zip
+# Cite as: S Ould Saad Hamady and N Fressengeas, EPJ Photovoltaics, 9:13, 2018.
+# See Copyright Notice in COPYRIGHT
+# ======================================================================================================
+
+# ------------------------------------------------------------------------------------------------------
+# File:           slalomArchive.py
+# Type:           Class
+# Use:            slalomArchive is used by slalomCore.py and slalomWindow.py
+#                  it archives the optimization output files incrementally, on a background thread:...
+#                  ...the output files of each evaluation are appended to the current zip chunk...
+#                  ...(<outputDirShort>_archive/<outputDirShort>_0001.zip, ...) sealed every chunkSize evaluations...
+#                  ...and listed in archive.txt (the chunks being written are not listed: .zip.part).
+#                 At the optimization end, only the files not yet archived (results, logs...) are written in the final chunk.
+#                 Extracting all the chunks in order gives the output directory content (as the single zip archive).
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import re
+import zipfile
+import threading
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+# end try
+
+from slalomStore import *
+
+class slalomArchive(object):
+    """ the SLALOM incremental archive: zip chunks written on a background thread """
+
+    # the archive directory suffix (next to the output directory), the sealed chunks list and the chunk being written extension
+    dirSuffix = "_archive"
+    indexFilename = "archive.txt"
+    partExt = ".part"
+
+    # the evaluation output files (<name>_<index>_<date>.<ext>, never modified once archived)
+    evaluationPattern = re.compile(r"_\d+_\d{8}-\d{6}\.[^./\\]+$")
+
+    def __init__(self, outputDir, chunkSize = 100):
+        """ slalomArchive constructor (the output files of outputDir archived every chunkSize evaluations) """
+
+        if (not outputDir.endswith('/')) and (not outputDir.endswith('\\')):
+            outputDir += ('\\' if ('\\' in outputDir) else '/')
+        # end if
+        self.outputDir = outputDir
+        self.outputDirShort = os.path.basename(outputDir.rstrip('/\\'))
+        self.archiveDir = self.getArchiveDir(outputDir)
+        self.chunkSize = max(1, int(chunkSize))
+
+        self.queue = queue.Queue()
+        self.thread = None
+
+        # the evaluation output files already archived (relative to outputDir)
+        self.listArchived = set()
+        self.chunkIndex = 0
+        self.chunkZip = None
+        self.chunkCount = 0
+        self.chunkFiles = 0
+        self.chunkManifest = list()
+
+        self.sealedCount = 0
+        self.errorCount = 0
+
+    # end __init__
+
+    @staticmethod
+    def getArchiveDir(outputDir):
+        """ the archive directory of an output directory """
+
+        sepT = '\\' if ('\\' in outputDir) else '/'
+        return outputDir.rstrip('/\\') + slalomArchive.dirSuffix + sepT
+
+    # end getArchiveDir
+
+    @staticmethod
+    def readIndex(strContent):
+        """ the sealed chunks name, in the archive index content """
+
+        return [lineT.split("\t")[0] for lineT in strContent.splitlines() if (len(lineT.strip()) > 0) and (not lineT.startswith("#"))]
+
+    # end readIndex
+
+    def getChunkName(self, chunkIndex):
+        return self.outputDirShort + ("_%04d.zip" % chunkIndex)
+    # end getChunkName
+
+    def start(self):
+        """ start the archiving thread (the chunks sealed by a previous run of a resumed optimization kept) """
+
+        if not os.path.isdir(self.archiveDir):
+            os.makedirs(self.archiveDir)
+        # end if
+
+        pathIndex = self.archiveDir + self.indexFilename
+        if os.path.isfile(pathIndex):
+            fileT = open(pathIndex, "r")
+            listChunk = self.readIndex(fileT.read())
+            fileT.close()
+            for chunkName in listChunk:
+                try:
+                    zipT = zipfile.ZipFile(self.archiveDir + chunkName, "r")
+                    self.listArchived.update([nameT for nameT in zipT.namelist() if self.evaluationPattern.search(nameT)])
+                    zipT.close()
+                except:
+                    pass
+                # end try
+            # end for
+            self.chunkIndex = len(listChunk)
+        # end if
+
+        # chunk not sealed (optimization interrupted): its files archived again
+        for nameT in os.listdir(self.archiveDir):
+            if nameT.endswith(self.partExt):
+                try:
+                    os.unlink(self.archiveDir + nameT)
+                except:
+                    pass
+                # end try
+            # end if
+        # end for
+
+        self.thread = threading.Thread(target = self.run)
+        self.thread.daemon = True
+        self.thread.start()
+
+    # end start
+
+    def add(self, listName, strManifest = None):
+        """ queue the output files of one evaluation (names relative to outputDir) and their manifest record, if any """
+        self.queue.put((list(listName), strManifest))
+    # end add
+
+    def run(self):
+        """ the archiving thread: the queued files written in the current chunk, sealed every chunkSize evaluations """
+
+        while True:
+            itemT = self.queue.get()
+            if itemT is None:
+                break
+            # end if
+            try:
+                self.write(itemT[0], itemT[1])
+                if self.chunkCount >= self.chunkSize:
+                    self.seal()
+                # end if
+            except:
+                self.errorCount += 1
+            # end try
+        # end while
+
+    # end run
+
+    def write(self, listName, strManifest = None, isEvaluation = True):
+        """ write files in the current chunk (created if needed) """
+
+        if self.chunkZip is None:
+            self.chunkZip = zipfile.ZipFile(self.archiveDir + self.getChunkName(self.chunkIndex + 1) + self.partExt, "w", compression=zipfile.ZIP_DEFLATED)
+            self.chunkCount = 0
+            self.chunkFiles = 0
+            self.chunkManifest = list()
+        # end if
+
+        for nameT in listName:
+            if nameT in self.listArchived:
+                continue
+            # end if
+            pathT = os.path.join(self.outputDir, nameT)
+            if not os.path.isfile(pathT):
+                continue
+            # end if
+            self.chunkZip.write(pathT, nameT)
+            self.chunkFiles += 1
+            if isEvaluation:
+                self.listArchived.add(nameT)
+            # end if
+        # end for
+
+        if strManifest:
+            self.chunkManifest.append(strManifest)
+        # end if
+
+        if isEvaluation:
+            self.chunkCount += 1
+        # end if
+
+    # end write
+
+    def seal(self, isFinal = False):
+        """ close the current chunk and list it in the archive index """
+
+        if self.chunkZip is None:
+            return
+        # end if
+
+        # the manifest records of the chunk files: each chunk readable alone (see slalomStore.joinHeader)
+        if len(self.chunkManifest) > 0:
+            self.chunkZip.writestr(slalomStore.manifestFilename, "".join(self.chunkManifest))
+        # end if
+        self.chunkZip.close()
+        self.chunkZip = None
+
+        chunkName = self.getChunkName(self.chunkIndex + 1)
+        if os.path.isfile(self.archiveDir + chunkName):
+            os.unlink(self.archiveDir + chunkName)
+        # end if
+        os.rename(self.archiveDir + chunkName + self.partExt, self.archiveDir + chunkName)
+
+        fileT = open(self.archiveDir + self.indexFilename, "a")
+        fileT.write(chunkName + ("\t%d\t%d\t" % (self.chunkCount, self.chunkFiles)) + ("final" if isFinal else "evaluations") + "\n")
+        fileT.close()
+
+        self.chunkIndex += 1
+        self.sealedCount += 1
+
+    # end seal
+
+    def finish(self):
+        """ wait for the queued files, write the files not yet archived in the final chunk and seal it """
+
+        if self.thread is not None:
+            self.queue.put(None)
+            self.thread.join()
+            self.thread = None
+        # end if
+
+        # the whole manifest is archived below: the records of the current chunk not written twice
+        if os.path.isfile(self.outputDir + slalomStore.manifestFilename):
+            self.chunkManifest = list()
+        # end if
+
+        listName = list()
+        dirToZip = self.outputDir.rstrip('/\\')
+        for (dirPath, dirNames, fileNames) in os.walk(dirToZip):
+            for fileName in fileNames:
+                listName.append(os.path.relpath(os.path.join(dirPath, fileName), dirToZip))
+            # end for
+        # end for
+
+        try:
+            self.write(listName, None, isEvaluation = False)
+            self.seal(isFinal = True)
+        except:
+            self.errorCount += 1
+        # end try
+
+        return self.sealedCount
+
+    # end finish
+
+# end slalomArchive
@@ -0,0 +1,408 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================
+# SLALOM - Open-Source Solar Cell Multivariate Optimizer
+# Copyright(C) 2012-2019 Sidi OULD SAAD HAMADY (1,2,*), Nicolas FRESSENGEAS (1,2). All rights reserved.
+# (1) Université de Lorraine, Laboratoire Matériaux Optiques, Photonique et Systèmes, Metz, F-57070, France
+# (2) Laboratoire Matériaux Optiques, Photonique et Systèmes, CentraleSupélec, Université Paris-Saclay, Metz, F-57070, France
+# (*) sidi.hamady@univ-lorraine.fr
+# SLALOM source code is available to download from:
+# https://github.com/sidihamady/SLALOM
+# https://hal.archives-ouvertes.fr/hal-01897934
+# http://www.hamady.org/photovoltaics/slalom_source.zip
+# Cite as: S Ould Saad Hamady and N Fressengeas, EPJ Photovoltaics, 9:13, 2018.
+# See Copyright Notice in COPYRIGHT
+# ======================================================================================================
+
+# ------------------------------------------------------------------------------------------------------
+# File:           slalomCache.py
+# Type:           Class and Module
+# Use:            slalomCache is used by slalomCore.py
+#                  it keeps the evaluation results on disk, across the optimizations (and users sharing the directory)...
+#                  ...each entry is addressed by a hash of the normalized input deck, the model files,...
+#                  ...the simulator name and the parameters as written in the simulator input.
+#                 The least recently used entries are removed when the cache size exceeds its limit.
+#                 To inspect or prune the cache from the console type one of the following commands:
+#                   python slalomCache.py --cacheDir ... --list
+#                   python slalomCache.py --cacheDir ... --prune 256
+#                   python slalomCache.py --cacheDir ... --clear
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import getopt
+import shutil
+import hashlib
+import threading
+
+class slalomCache(object):
+    """ the SLALOM persistent evaluation cache """
+
+    def __init__(self, cacheDir, cacheSize = 512):
+        """ slalomCache constructor (cacheSize in MB) """
+
+        if (not cacheDir.endswith('/')) and (not cacheDir.endswith('\\')):
+            cacheDir += ('\\' if ('\\' in cacheDir) else '/')
+        # end if
+        self.cacheDir = cacheDir
+        self.cacheSize = int(cacheSize) * 1024 * 1024
+
+        # the entry file (figures of merit) and the J-V curve files, named after the key:...
+        # ...the full J-V characteristic (simuloutput_jv.log) and its photovoltaic part, from 0 V to Voc (simuloutput_jvp.log)
+        self.entryExt = ".txt"
+        self.jvExt = "_jv.log"
+        self.jvpExt = "_jvp.log"
+
+        # hash of the evaluation context (deck, models and simulator), set by setContext
+        self.context = None
+
+        self.hitCount = 0
+        self.missCount = 0
+
+        # the entries are read by the engine workers (see get): the read, its access time and the counters...
+        # ...updated under the lock, as the entries removal (see prune)
+        self.lock = threading.Lock()
+
+        # the current size is estimated from the directory scan, then updated on each put
+        self.sizeCurrent = None
+
+        if not os.path.isdir(self.cacheDir):
+            os.makedirs(self.cacheDir)
+        # end if
+
+    # end __init__
+
+    @staticmethod
+    def normalize(fileContent, listPrefix):
+        """ normalize a deck or model file content: line endings, spaces, blank lines, comments...
+            ...and the lines starting with one of listPrefix (the parameters, given separately in the key) """
+
+        listLine = list()
+        for lineT in fileContent.splitlines():
+            lineX = lineT.strip()
+            if (lineX == "") or lineX.startswith("#") or lineX.startswith("//"):
+                continue
+            # end if
+            if any([lineX.startswith(prefixT) for prefixT in listPrefix]):
+                continue
+            # end if
+            listLine.append(" ".join(lineX.split()))
+        # end for
+
+        return "\n".join(listLine)
+
+    # end normalize
+
+    def setContext(self, simulatorName, inputContent, listModelContent, listPrefix):
+        """ set the evaluation context (hashed once for all the evaluations) """
+
+        hashT = hashlib.sha1()
+        hashT.update(("simulator:" + simulatorName + "\n").encode("utf-8"))
+        hashT.update(("deck:" + self.normalize(inputContent, listPrefix) + "\n").encode("utf-8"))
+        for modelContent in listModelContent:
+            hashT.update(("model:" + self.normalize(modelContent, listPrefix) + "\n").encode("utf-8"))
+        # end for
+        self.context = hashT.hexdigest()
+
+    # end setContext
+
+    def getKey(self, paramKey):
+        """ get the entry key for the parameters, as written in the simulator input """
+
+        hashT = hashlib.sha1()
+        hashT.update((self.context + "\n" + paramKey).encode("utf-8"))
+        return hashT.hexdigest()
+
+    # end getKey
+
+    def getPath(self, key):
+        return self.cacheDir + key[0:2] + os.sep + key
+    # end getPath
+
+    def get(self, paramKey):
+        """ get the results saved for the parameters (dict), or None if not in the cache...
+            ...can be called concurrently by the engine workers """
+
+        with self.lock:
+            return self.read(paramKey)
+        # end with
+
+    # end get
+
+    def read(self, paramKey):
+        """ read the entry saved for the parameters and update the hits and misses counters (see get) """
+
+        if self.context is None:
+            return None
+        # end if
+
+        pathT = self.getPath(self.getKey(paramKey)) + self.entryExt
+        if not os.path.isfile(pathT):
+            self.missCount += 1
+            return None
+        # end if
+
+        entryT = dict()
+        try:
+            fileT = open(pathT, "r")
+            for lineT in fileT:
+                if lineT.startswith("#"):
+                    continue
+                # end if
+                listT = lineT.rstrip("\r\n").split("\t")
+                if len(listT) >= 2:
+                    entryT[listT[0]] = listT[1:] if (len(listT) > 2) else listT[1]
+                # end if
+            # end for
+            fileT.close()
+            for nameT in ["Efficiency", "SimulatorEfficiency", "Jm", "Vm", "FF", "Jsc", "Voc"]:
+                entryT[nameT] = float(entryT[nameT])
+            # end for
+            # least recently used: the entry modification time is updated on each hit
+            os.utime(pathT, None)
+        except:
+            # incomplete or corrupted entry
+            self.missCount += 1
+            return None
+        # end try
+
+        # the J-V curve files saved, as listed in the entry (Curves)
+        pathT = self.getPath(self.getKey(paramKey))
+        if "Curves" in entryT:
+            listCurve = entryT["Curves"] if isinstance(entryT["Curves"], list) else [entryT["Curves"]]
+            entryT["JV"] = (pathT + self.jvExt) if (("JV" in listCurve) and os.path.isfile(pathT + self.jvExt)) else None
+            entryT["JVP"] = (pathT + self.jvpExt) if (("JVP" in listCurve) and os.path.isfile(pathT + self.jvpExt)) else None
+        else:
+            # entry saved by a previous version: the J-V file is only the photovoltaic part (from 0 V to Voc)
+            entryT["JV"] = None
+            entryT["JVP"] = (pathT + self.jvExt) if os.path.isfile(pathT + self.jvExt) else None
+        # end if
+
+        self.hitCount += 1
+        return entryT
+
+    # end read
+
+    def put(self, paramKey, paramName, paramNatural, outputT, outputO, fJm, fVm, fFF, fJsc, fVoc, pathJV = None, pathJVP = None):
+        """ save the results for the parameters (and the full J-V and its photovoltaic part files if given) """
+
+        if self.context is None:
+            return False
+        # end if
+
+        pathT = self.getPath(self.getKey(paramKey))
+        try:
+            dirT = os.path.dirname(pathT)
+            if not os.path.isdir(dirT):
+                os.makedirs(dirT)
+            # end if
+
+            strT = "# SLALOM cache entry @ " + time.strftime("%Y-%m-%d %H:%M:%S") + "\n"
+            strT += "Parameter\t" + "\t".join(paramName) + "\n"
+            strT += "Natural\t" + "\t".join([("%g" % fT) for fT in paramNatural]) + "\n"
+            strT += "Key\t" + paramKey.replace("\t", " ") + "\n"
+            # the figures of merit at full precision: a hit gives back exactly the simulated values (same optimizer trajectory)
+            strT += ("Efficiency\t%.17g\n" % outputT) + ("SimulatorEfficiency\t%.17g\n" % outputO)
+            strT += ("Jm\t%.17g\n" % fJm) + ("Vm\t%.17g\n" % fVm) + ("FF\t%.17g\n" % fFF) + ("Jsc\t%.17g\n" % fJsc) + ("Voc\t%.17g\n" % fVoc)
+
+            sizeT = 0
+            listCurve = list()
+            for (nameT, pathFrom, extT) in [("JV", pathJV, self.jvExt), ("JVP", pathJVP, self.jvpExt)]:
+                if (pathFrom is not None) and os.path.isfile(pathFrom):
+                    shutil.copyfile(pathFrom, pathT + extT + ".tmp")
+                    self.rename(pathT + extT + ".tmp", pathT + extT)
+                    sizeT += os.path.getsize(pathT + extT)
+                    listCurve.append(nameT)
+                # end if
+            # end for
+            if len(listCurve) > 0:
+                strT += "Curves\t" + "\t".join(listCurve) + "\n"
+            # end if
+
+            # written to a temporary file then renamed: the entry is never read incomplete
+            fileT = open(pathT + self.entryExt + ".tmp", "w")
+            fileT.write(strT)
+            fileT.close()
+            self.rename(pathT + self.entryExt + ".tmp", pathT + self.entryExt)
+            sizeT += len(strT)
+        except:
+            return False
+        # end try
+
+        if self.sizeCurrent is None:
+            self.prune()
+        else:
+            self.sizeCurrent += sizeT
+            if self.sizeCurrent > self.cacheSize:
+                self.prune()
+            # end if
+        # end if
+
+        return True
+
+    # end put
+
+    @staticmethod
+    def rename(pathFrom, pathTo):
+        if os.path.isfile(pathTo):
+            os.unlink(pathTo)
+        # end if
+        os.rename(pathFrom, pathTo)
+    # end rename
+
+    def getEntries(self):
+        """ get the cache entries: list of (modification time, size, key), the least recently used first """
+
+        listEntry = list()
+        for rootT, dirsT, filesT in os.walk(self.cacheDir):
+            for fileName in filesT:
+                if not fileName.endswith(self.entryExt):
+                    continue
+                # end if
+                key = fileName[0:len(fileName) - len(self.entryExt)]
+                pathT = os.path.join(rootT, fileName)
+                try:
+                    sizeT = os.path.getsize(pathT)
+                    for extT in [self.jvExt, self.jvpExt]:
+                        pathJV = os.path.join(rootT, key + extT)
+                        if os.path.isfile(pathJV):
+                            sizeT += os.path.getsize(pathJV)
+                        # end if
+                    # end for
+                    listEntry.append((os.path.getmtime(pathT), sizeT, key))
+                except:
+                    pass
+                # end try
+            # end for
+        # end for
+
+        listEntry.sort()
+        return listEntry
+
+    # end getEntries
+
+    def remove(self, key):
+        """ remove one entry """
+
+        pathT = self.getPath(key)
+        for extT in [self.entryExt, self.jvExt, self.jvpExt]:
+            try:
+                if os.path.isfile(pathT + extT):
+                    os.unlink(pathT + extT)
+                # end if
+            except:
+                pass
+            # end try
+        # end for
+
+    # end remove
+
+    def prune(self, cacheSize = None):
+        """ remove the least recently used entries until the cache size is below cacheSize (in bytes)...
+            ...returns the number of removed entries """
+
+        if cacheSize is None:
+            cacheSize = self.cacheSize
+        # end if
+
+        listEntry = self.getEntries()
+        self.sizeCurrent = sum([entryT[1] for entryT in listEntry])
+
+        removedCount = 0
+        with self.lock:
+            for entryT in listEntry:
+                if self.sizeCurrent <= cacheSize:
+                    break
+                # end if
+                self.remove(entryT[2])
+                self.sizeCurrent -= entryT[1]
+                removedCount += 1
+            # end for
+        # end with
+
+        return removedCount
+
+    # end prune
+
+    def getSummary(self):
+        """ the cache hits and misses, used in the optimization summary """
+
+        countT = self.hitCount + self.missCount
+        strT = "Cache: %d hits / %d evaluations" % (self.hitCount, countT)
+        if countT > 0:
+            strT += " (%.1f %%)" % (100.0 * float(self.hitCount) / float(countT))
+        # end if
+        return strT
+
+    # end getSummary
+
+# end slalomCache
+
+if __name__ == "__main__":
+
+    cacheDir = None
+    doList = False
+    doClear = False
+    pruneSize = None
+
+    usageT = "SLALOM cache usage:\n python slalomCache.py --cacheDir ... [--list] [--prune sizeMB] [--clear]"
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], None, ["cacheDir=", "list", "prune=", "clear"])
+        for opt, arg in opts:
+            if opt == "--cacheDir":
+                cacheDir = arg
+            elif opt == "--list":
+                doList = True
+            elif opt == "--prune":
+                pruneSize = float(arg)
+            elif opt == "--clear":
+                doClear = True
+            # end if
+        # end for
+    except Exception as excT:
+        print(str(excT) + "\n" + usageT)
+        sys.exit(1)
+    # end try
+
+    if (cacheDir is None) or (not os.path.isdir(cacheDir)):
+        print("cacheDir: directory not found\n" + usageT)
+        sys.exit(1)
+    # end if
+
+    Cache = slalomCache(cacheDir)
+
+    if doClear:
+        pruneSize = 0
+    # end if
+
+    if pruneSize is not None:
+        removedCount = Cache.prune(int(pruneSize * 1024.0 * 1024.0))
+        print("%d entries removed" % removedCount)
+    # end if
+
+    listEntry = Cache.getEntries()
+
+    if doList:
+        for entryT in listEntry:
+            entryX = dict()
+            try:
+                fileT = open(Cache.getPath(entryT[2]) + Cache.entryExt, "r")
+                for lineT in fileT:
+                    listT = lineT.rstrip("\r\n").split("\t")
+                    if len(listT) >= 2:
+                        entryX[listT[0]] = "\t".join(listT[1:])
+                    # end if
+                # end for
+                fileT.close()
+            except:
+                pass
+            # end try
+            print(time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(entryT[0])) + "\t" + entryT[2] + "\t" + entryX.get("Efficiency", "?") + "\t" + entryX.get("Parameter", "?") + "\t" + entryX.get("Natural", "?"))
+        # end for
+    # end if
+
+    print("Cache: %s\nEntries: %d\nSize: %.3f MB" % (cacheDir, len(listEntry), float(sum([entryT[1] for entryT in listEntry])) / (1024.0 * 1024.0)))
+
+# end if
@@ -28,19 +28,38 @@ slalomVersion = 'Version: 1.2 Build: 2105'
 import math
 import numpy as np
 from scipy import optimize, interpolate, signal
+try:
+    # quasi-random sequences (scipy >= 1.7): Sobol sampling of the Brute mode
+    from scipy.stats import qmc
+except ImportError:
+    qmc = None
+# end try
 from Bayes import BayesianOptimization
 from Bayes import UtilityFunction
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import Matern
 import random
 
 # Control
 import subprocess
 import datetime, shutil, os, stat, sys, time
+# process signals (the simulator process group stopped), not to be confused with scipy.signal
+import signal as ossignal
 import zipfile
 import traceback
+import warnings
 
 import itertools
+import collections
+import json
+import zlib
 
 from slalomSimulator import *
+from slalomEngine import *
+from slalomCache import *
+from slalomStore import *
+from slalomArchive import *
+from slalomJV import *
 
 def dispError(message, doExit = True, atExit = None, errFilename = None, **atExitArgs):
     """ print out an error message and exit if doExit set to True """
@@ -103,10 +122,78 @@ class slalomCore(object):
         self.ftolerance = 0.005
         self.jaceps = np.array([])
 
-        # Optimization cache
-        self.lastParam = list()
-        self.lastOutput = list()
-        self.lastParamLimit = 12
+        # Evaluation engine: number of simulations run concurrently, each one in its own sandbox directory...
+        # ...(sandboxDir, created in the output directory). Set to 1 to run the simulations in place, one at a time.
+        self.workerCount = 1
+        self.engine = None
+        self.sandboxDir = "sandbox"
+        self.sandboxCounter = 0
+        # Persistent evaluation cache (shared across optimizations): None to disable...
+        # ...cacheSize: maximum size in MB (the least recently used entries are removed)
+        self.cacheDir = None
+        self.cacheSize = 512
+        self.cache = None
+        # Bayesian method with more than one worker: if True, a new point is suggested as soon as a worker is free...
+        # ...(asynchronous), otherwise one point per worker is suggested and the batch evaluated at once (synchronous).
+        self.bayesAsync = False
+        self.asyncCounter = 0
+        self.asyncTime = 0.0
+        self.asyncTic = 0.0
+        # the evaluations in progress (memoization key) and the same points suggested meanwhile, given the same results
+        self.asyncPending = dict()
+        self.asyncWaiting = dict()
+
+        # Early termination (None to disable): the simulator is stopped earlyStop log points after the Voc crossing...
+        # ...and the outputs extracted from the partial log by the extract part of the input file (extractTemplate)
+        self.earlyStop = None
+        self.earlyStopCount = 0
+        self.extractTemplate = None
+        # the anode voltage and current columns of the simulator log: names or positions (None: the simulator defaults)
+        self.earlyStopColumns = None
+        self.extractFilename = "extract.in"
+        self.extractCommandFilename = "Extract.bat" if (os.name == "nt") else "Extract.sh"
+
+        # Simulator watchdog: the simulator is stopped (and the evaluation failed) if running longer than...
+        # ...timeout seconds (None: no limit) or timeoutFactor times the mean run duration...
+        # ...(None: not adaptive), once timeoutCount runs done
+        self.timeout = None
+        self.timeoutFactor = None
+        self.timeoutCount = 3
+        self.timeoutCounter = 0
+        # the mean duration of the complete full resolution runs (coarse, early stopped and timed out runs excluded)
+        self.timeoutDelaySum = 0
+        self.timeoutDelayCount = 0
+
+        # Failure policy, applied when the simulator fails (error or efficiency not evaluated):
+        # * "abort": a simulator error or timeout stops the optimization (the efficiency not evaluated is not retried...
+        #   ...and failurePenalty returned as efficiency)
+        # * "penalty": the evaluation failed, the optimization continues with failurePenalty as efficiency
+        # * "perturb": retried (failureRetry times at most) with the parameters perturbed by failurePerturb...
+        #   ...(fraction of each parameter range), then as "penalty"
+        # * "relax": retried once with relaxed numerics (see slalomSimulator.relax), then as "penalty"
+        # the failed evaluations are recorded in failedFilename
+        self.failurePolicyList = ["abort", "penalty", "perturb", "relax"]
+        self.failurePolicy = "abort"
+        self.failurePenalty = 0.0
+        self.failureRetry = 2
+        self.failurePerturb = 0.01
+        self.failedFilename = "simuloutput_failed.txt"
+        self.failedCount = 0
+        self.recoveredCount = 0
+        self.relaxTemplate = None
+
+        # input and model files templates (parsed once by prepareTemplate)...
+        # ...and, for each model file, True if it contains no optimized parameter
+        self.inputTemplate = None
+        self.modelTemplate = list()
+        self.modelStatic = list()
+
+        # Optimization cache (in memory): efficiency of the evaluated parameters, keyed by the parameters at the output precision...
+        # ...memoSize entries at most, the least recently used removed first
+        self.memo = collections.OrderedDict()
+        self.memoSize = 4096
+        self.memoHit = 0
+        self.memoMiss = 0
 
         self.mainTitle = ""
         self.pythonInterpreter = ""
@@ -148,10 +235,47 @@ class slalomCore(object):
         self.delayMin = 0
         self.delayMax = 0
         self.delayMean = 0
+        self.delaySum = 0
+        self.delayCount = 0
         self.counterFormat = '{0:02d}'
 
         self.guessParam = False
         self.bruteSimul = False
+        # number of grid points given to each worker at once (Brute mode with more than one worker)
+        self.bruteChunk = 4
+        # Brute mode sampling: "grid" (full factorial grid of paramPoints), "sobol" (quasi-random Sobol sequence)...
+        # ...or "lhs" (Latin hypercube) with bruteBudget points. The parameters with paramPoints = 1 are kept at their initial value.
+        self.bruteSamplingList = ["grid", "sobol", "lhs"]
+        self.bruteSampling = "grid"
+        self.bruteBudget = 256
+        # Brute grid indices range [bruteStart, bruteEnd) evaluated (bruteEnd None: up to the grid end)...
+        # ...used to share a grid between optimizations (each one with its own range) or to start from a given index
+        self.bruteStart = 0
+        self.bruteEnd = None
+
+        # instrumentation: one record (JSON line) per evaluation with the phases duration, the simulator exit code...
+        # ...and the cache hit/miss. The phases total is given at the optimization end.
+        self.timingFilename = "simuloutput_timing.jsonl"
+        self.timingTotal = collections.OrderedDict()
+        self.timingCount = 0
+
+        # results store: one record per evaluation appended to simuloutput_results.jsonl (with its byte-offset index)...
+        # ...read incrementally by the monitor. The results text file rows (simuloutput_optimized.txt) are optional...
+        # ...(resultsText False: only the header and summary written, the rows exported with slalomStore.py --export)
+        self.store = None
+        self.resultsText = True
+
+        # simulator output files archiving: "header" (the title, comment and parameters written at each file start...
+        # ...each file being rewritten) or "rename" (the files only renamed, their header kept in simuloutput_manifest.jsonl...
+        # ...and joined on demand with slalomStore.readOutput; the cached J-V characteristics are hard-linked, not copied)
+        self.outputArchiveList = ["header", "rename"]
+        self.outputArchive = "header"
+
+        # incremental archiving: set archiveChunk (e.g. 100) to archive the output files of each evaluation, on a background...
+        # ...thread, in zip chunks sealed every archiveChunk evaluations (<outputDirShort>_archive directory), the optimization...
+        # ...end only sealing the final chunk. None to zip the output directory at the optimization end.
+        self.archiveChunk = None
+        self.archive = None
 
         self.inJac = False
 
@@ -208,6 +332,48 @@ class slalomCore(object):
         self.stoppedFilename = "stopped.txt"
         self.stoppedDone = False
         self.delayFilename = "delay.txt"
+        # Brute grid indices already evaluated (used to resume an interrupted Brute optimization)
+        self.bruteFilename = "brute.txt"
+
+        # set to True (by setResume) to continue an interrupted optimization in its output directory
+        self.isResumed = False
+        # optimizer checkpoint: mode, random seed and initial parameters, then one line per evaluation done...
+        # ...(counters, results and parameters), appended as the evaluations are merged. When resuming (all the modes), the...
+        # ...counters, maximum and Brute screening data are restored and the evaluations done replayed from the checkpoint...
+        # ...(memoization, also looked up before the asynchronous Bayesian submissions) instead of the simulator.
+        self.checkpointFilename = "checkpoint.txt"
+        self.randomSeed = None
+
+        # Bayesian warm start: results files (simuloutput_optimized.txt) of previous optimizations of the same device...
+        # ...their points (within the current bounds) registered before the Bayesian optimization, instead of the random initialization
+        self.warmStart = list()
+        self.warmStartCount = 0
+
+        # multi-fidelity (Bayesian method): the space explored with coarse evaluations (the input file resolution variables...
+        # ...scaled by fidelity, see slalomSimulator.coarse), then the best fidelityPromote fraction evaluated at full resolution...
+        # ...(the optimum given at full resolution). The coarse evaluations are written in coarseFilename. None to disable.
+        self.fidelity = None
+        self.fidelityPromote = 0.25
+        self.coarseFilename = "simuloutput_coarse.txt"
+        self.coarseTemplate = None
+        self.isCoarse = False
+        # the coarse evaluations done: (efficiency, normalized parameters)...
+        # ...and the full resolution ones known before the promotion (warm start, checkpoint), never given to the coarse Gaussian process
+        self.coarseList = list()
+        self.fineList = list()
+        self.promotedCount = 0
+
+        # Brute surrogate pre-screening: a Gaussian process fitted on the results so far, the grid points whose upper confidence...
+        # ...bound (mean + screeningKappa * std) is less than screening times the maximum efficiency skipped (None to disable)...
+        # ...the screening starts after screeningMin evaluations and the surrogate is refitted as the results arrive
+        self.screening = None
+        self.screeningKappa = 2.576
+        self.screeningMin = 10
+        # the evaluations done: (normalized parameters, efficiency)
+        self.screeningData = list()
+        self.screeningModel = None
+        self.screeningFitted = 0
+        self.screenedCount = 0
 
         self.currentDir = ""
         self.outputDir = ""
@@ -247,6 +413,9 @@ class slalomCore(object):
         else:
             self.counterFormat = '{0:07d}'
         # endif
+        if self.store is not None:
+            self.store.setCounterFormat(self.counterFormat)
+        # end if
     # end setCounterFormat
 
     def setInterpreter(self, pythonInterpreter):
@@ -414,6 +583,32 @@ class slalomCore(object):
                 if (self.jacCounter >= self.paramCount):
                     strT += (" (%d for the Jacobian approximation)" % self.jacCounter)
                 # end if
+                strT += ("\nMemoization: %d hits / %d misses" % (self.memoHit, self.memoMiss))
+                if self.cache is not None:
+                    strT += "\n" + self.cache.getSummary()
+                # end if
+                if self.earlyStop is not None:
+                    strT += ("\nEarly termination: %d simulations stopped after Voc" % self.earlyStopCount)
+                # end if
+                if (self.timeout is not None) or (self.timeoutFactor is not None):
+                    strT += ("\nWatchdog: %d simulations stopped (timeout)" % self.timeoutCounter)
+                # end if
+                strTiming = self.getTimingSummary()
+                if strTiming is not None:
+                    strT += "\n" + strTiming
+                # end if
+                if self.screenedCount > 0:
+                    strT += ("\nScreening: %d grid points skipped (efficiency upper bound less than %g %% of the maximum)" % (self.screenedCount, 100.0 * self.screening))
+                # end if
+                if len(self.coarseList) > 0:
+                    strT += ("\nMulti-fidelity: %d coarse evaluations (fidelity %g), %d promoted to full resolution" % (len(self.coarseList), self.fidelity, self.promotedCount))
+                # end if
+                if self.warmStartCount > 0:
+                    strT += ("\nWarm start: %d points of previous optimizations registered" % self.warmStartCount)
+                # end if
+                if (self.failedCount > 0) or (self.recoveredCount > 0):
+                    strT += ("\nFailures: %d evaluations failed (see %s), %d recovered by retry (policy: %s)" % (self.failedCount, self.failedFilename, self.recoveredCount, self.failurePolicy))
+                # end if
                 strT += "\n---------------------------------------------------------------\n"
 
                 if (x is not None) and (success is not None) and (message is not None):
@@ -525,19 +720,33 @@ class slalomCore(object):
                 self.stoppedDone = True
             # end if
 
-            self.log("\nZipping optimization result files...")
-            zipFilename = self.outputRoot + self.outputDirShort + ".zip"
-            outFile = zipfile.ZipFile(zipFilename, "w", compression=zipfile.ZIP_DEFLATED)
-            dirToZip = self.outputDir.rstrip(self.dirSepChar)
-            for (dirPath, dirNames, fileNames) in os.walk(dirToZip):
-                for fileName in fileNames:
-                    fileAbsolutePath = os.path.join(dirPath, fileName)
-                    fileRelativePath = fileAbsolutePath.replace(dirToZip + self.dirSepChar, '')
-                    outFile.write(fileAbsolutePath, fileRelativePath)
+            if self.archive is not None:
+                self.log("\nSealing the final archive chunk...")
+                ticT = time.time()
+                archiveT = self.archive
+                self.archive = None
+                chunkCount = archiveT.finish()
+                strT = "\nArchiving done (%d chunks sealed in %s, %s)." % (chunkCount, os.path.basename(archiveT.archiveDir.rstrip('/\\')), self.printTime(time.time() - ticT))
+                if archiveT.errorCount > 0:
+                    strT += " %d archiving errors." % archiveT.errorCount
+                # end if
+                self.log(strT)
+            else:
+                self.log("\nZipping optimization result files...")
+                ticT = time.time()
+                zipFilename = self.outputRoot + self.outputDirShort + ".zip"
+                outFile = zipfile.ZipFile(zipFilename, "w", compression=zipfile.ZIP_DEFLATED)
+                dirToZip = self.outputDir.rstrip(self.dirSepChar)
+                for (dirPath, dirNames, fileNames) in os.walk(dirToZip):
+                    for fileName in fileNames:
+                        fileAbsolutePath = os.path.join(dirPath, fileName)
+                        fileRelativePath = fileAbsolutePath.replace(dirToZip + self.dirSepChar, '')
+                        outFile.write(fileAbsolutePath, fileRelativePath)
+                    # end for
                 # end for
-            # end for
-            outFile.close()
-            self.log("\nZipping done (File: " + self.outputDirShort + ".zip" + ").")
+                outFile.close()
+                self.log("\nZipping done (File: " + self.outputDirShort + ".zip" + ", " + self.printTime(time.time() - ticT) + ").")
+            # end if
 
             self.isRunning = False
         except:
@@ -582,19 +791,23 @@ class slalomCore(object):
 
     # end guess
 
-    def isErrorOccurred(self):
+    def isErrorOccurred(self, workDir = None):
         """ check if a simulator error has occurred """
 
+        if workDir is None:
+            workDir = self.outputDir
+        # end if
+
         maxLines = 16383
         curLine = 0
         simulatorError = None
         try:
-            pathV = os.path.join(self.outputDir + self.verboseFilename)
+            pathV = os.path.join(workDir + self.verboseFilename)
             if not os.path.isfile(pathV):
                 return  None
             # end if
             iLines = 0;
-            fileT = open(self.outputDir + self.verboseFilename, "r")
+            fileT = open(workDir + self.verboseFilename, "r")
             for lineT in fileT:
                 if (simulatorError is not None):
                     simulatorError += lineT + '\n'
@@ -623,17 +836,21 @@ class slalomCore(object):
 
     # end isErrorOccurred
 
-    def printOutput(self):
+    def printOutput(self, workDir = None):
         """ print out the simulator output """
 
+        if workDir is None:
+            workDir = self.outputDir
+        # end if
+
         maxLines = 16383
         curLine = 0
         try:
-            pathV = os.path.join(self.outputDir + self.verboseFilename)
+            pathV = os.path.join(workDir + self.verboseFilename)
             if not os.path.isfile(pathV):
                 return
             # end if
-            fileT = open(self.outputDir + self.verboseFilename, "r")
+            fileT = open(workDir + self.verboseFilename, "r")
             strT = "\n# ---------------------- SIMULATOR OUTPUT: ----------------------\n\n"
             print(strT)
             for lineT in fileT:
@@ -688,6 +905,11 @@ class slalomCore(object):
 
         def optimizeJac(x, *args):
             x0 = np.asfarray(x)
+
+            if (optimFunc == self.optimizeFunc) and (self.workerCount > 1) and (len(args) == 0):
+                return optimizeJacConcurrent(x0)
+            # end if
+
             self.inJac = False
             f0 = np.atleast_1d(optimFunc(*((x0,)+args)))
             self.inJac = True
@@ -706,6 +928,33 @@ class slalomCore(object):
             return jac.transpose()
         # end optimizeJac
 
+        def optimizeJacConcurrent(x0):
+            # the base point and the paramCount perturbed points are independent:...
+            # ...evaluate them together, each one in its own sandbox, and then build the Jacobian
+            ixcount = len(x0)
+            listParamNormalized = [x0]
+            listInJac = [False]
+            dx = np.zeros(ixcount)
+            for ii in range(ixcount):
+                self.log("\nJacobian approximation [%d / %d]..." % (ii + 1, ixcount))
+                dx[ii] = self.jaceps[ii]
+                listParamNormalized.append(x0 + dx)
+                listInJac.append(True)
+                dx[ii] = 0.0
+            # end for
+            self.inJac = True
+            listOutput = self.optimizeBatch(listParamNormalized, listInJac)
+            self.inJac = False
+            f0 = np.atleast_1d(listOutput[0])
+            ifcount = len(f0)
+            jac = np.zeros([ixcount, ifcount])
+            for ii in range(ixcount):
+                jac[ii] = (np.atleast_1d(listOutput[ii + 1]) - f0) / self.jaceps[ii]
+            # end for
+            self.jacCounter += ixcount
+            return jac.transpose()
+        # end optimizeJacConcurrent
+
         return optimizeJac
     # end getOptimizeJac
 
@@ -732,6 +981,20 @@ class slalomCore(object):
         return self.weightFunc[idx]
     # end if
 
+    def getNormalizedBayesian(self, paramNormalizedBayesian):
+        """ convert a Bayesian parameters dict to a normalized parameters set """
+        paramNormalized = np.zeros(self.paramCount)
+        for paramT in paramNormalizedBayesian:
+            for ii in range(0, self.paramCount):
+                if (self.paramName[ii] == paramT):
+                    paramNormalized[ii] = float(paramNormalizedBayesian[paramT])
+                    break
+                # end if
+            # end for
+        # end for
+        return paramNormalized
+    # end getNormalizedBayesian
+
     def optimizeFuncBayesian(self, **paramNormalizedBayesian):
         """ the optimizer maximization function for the Bayesian method """
         paramCount = len(paramNormalizedBayesian)
@@ -745,17 +1008,70 @@ class slalomCore(object):
             # end try
             return 0.0
         # end if
+        return self.optimizeFunc(self.getNormalizedBayesian(paramNormalizedBayesian))
+    # end optimizeFuncBayesian
+
+    def optimizeBatchBayesian(self, listParamNormalizedBayesian):
+        """ the optimizer maximization function for the Bayesian method, evaluating a batch of points concurrently """
+        for paramNormalizedBayesian in listParamNormalizedBayesian:
+            if (self.paramCount != len(paramNormalizedBayesian)):
+                # should never happen
+                try:
+                    self.finish(errorOccured=True, userStopped=True)
+                except:
+                    self.isRunning = False
+                    sys.exit(1)
+                # end try
+                return [0.0] * len(listParamNormalizedBayesian)
+            # end if
+        # end for
+        return self.optimizeBatch([self.getNormalizedBayesian(paramNormalizedBayesian) for paramNormalizedBayesian in listParamNormalizedBayesian])
+    # end optimizeBatchBayesian
+
+    def getNatural(self, paramNormalized):
+        """ convert a normalized parameters set to natural values """
+
+        paramNatural = np.zeros(self.paramCount)
+        for ii in range(0, self.paramCount):
+            if self.paramLogscale[ii]:
+                paramNatural[ii] = math.pow(10.0, (paramNormalized[ii] * math.log10(self.paramNorm[ii])))
+            else:
+                paramNatural[ii] = paramNormalized[ii] * self.paramNorm[ii]
+            # end if
+        # end for
+
+        return paramNatural
+
+    # end getNatural
+
+    def getNormalized(self, paramNatural):
+        """ convert a natural parameters set to normalized values """
+
         paramNormalized = np.zeros(self.paramCount)
-        for paramT in paramNormalizedBayesian:
-            for ii in range(0, self.paramCount):
-                if (self.paramName[ii] == paramT):
-                    paramNormalized[ii] = float(paramNormalizedBayesian[paramT])
-                    break
-                # end if
-            # end for
+        for ii in range(0, self.paramCount):
+            if self.paramLogscale[ii]:
+                paramNormalized[ii] = math.log10(paramNatural[ii]) / math.log10(self.paramNorm[ii])
+            else:
+                paramNormalized[ii] = paramNatural[ii] / self.paramNorm[ii]
+            # end if
         # end for
-        return self.optimizeFunc(paramNormalized)
-    # end optimizeFuncBayesian
+
+        return paramNormalized
+
+    # end getNormalized
+
+    def getParamKey(self, paramNatural):
+        """ format the parameters as written in the output (used as the cache key) """
+
+        tParam = ""
+        for ii in range(0, self.paramCount - 1):
+            tParam += (self.paramFormat[ii] % paramNatural[ii]) + "\t"
+        # end for
+        tParam += (self.paramFormat[self.paramCount - 1] % paramNatural[self.paramCount - 1])
+
+        return tParam
+
+    # end getParamKey
 
     def optimizeFunc(self, paramNormalized):
         """ the optimizer minimization function """
@@ -772,7 +1088,15 @@ class slalomCore(object):
             return 0.0
         # end if
 
-        bShowOutput = ((self.inJac == False) or (self.optimType == "Brute"))
+        return self.optimizeBatch([paramNormalized])[0]
+
+    # end optimizeFunc
+
+    def optimizeBatch(self, listParamNormalized, listInJac = None, listIndex = None):
+        """ the optimizer minimization function for a set of independent parameters...
+            ...evaluated concurrently if more than one worker is set (results returned in the same order)...
+            ...listInJac, if given, sets for each parameters set if it is a Jacobian approximation point...
+            ...listIndex, if given, sets for each parameters set its Brute grid index (used as counter) """
 
         # If stopFilename exists, stop optimization
         if self.stopSet():
@@ -782,900 +1106,1649 @@ class slalomCore(object):
                 self.isRunning = False
                 sys.exit(1)
             # end try
-            return 0.0
+            return [0.0] * len(listParamNormalized)
         # end if
 
-        for ii in range(0, self.paramCount):
-            if self.paramLogscale[ii]:
-                self.paramNatural[ii] = math.pow(10.0, (paramNormalized[ii] * math.log10(self.paramNorm[ii])))
-            else:
-                self.paramNatural[ii] = paramNormalized[ii] * self.paramNorm[ii]
-            # end if
-        # end for
+        if self.engine is None:
+            self.engine = slalomEngine(self.workerCount)
+        # end if
 
-        # A cache strategy is implemented to avoid redundant calculation.
-        try:
-            if (self.funcCounter >= 1) and (len(self.lastParam) >= 1):
-                tParam = ""
-                for ii in range(0, self.paramCount - 1):
-                    tParam += (self.paramFormat[ii] % self.paramNatural[ii]) + "\t"
-                # end for
-                tParam += (self.paramFormat[self.paramCount - 1] % self.paramNatural[self.paramCount - 1])
-                if (tParam in self.lastParam):
-                    return self.lastOutput[self.lastParam.index(tParam)]
-                # end if
+        listOutput = [0.0] * len(listParamNormalized)
+        listEvaluation = list()
+        listPending = list()
+
+        for ii in range(0, len(listParamNormalized)):
+            evaluationT = slalomEvaluation(listParamNormalized[ii], self.getNatural(listParamNormalized[ii]), self.outputDir)
+            evaluationT.inJac = self.inJac if (listInJac is None) else listInJac[ii]
+            evaluationT.guessParam = self.guessParam
+            evaluationT.isCoarse = self.isCoarse
+            if listIndex is not None:
+                evaluationT.gridIndex = listIndex[ii]
             # end if
-        except:
-            pass
-        # end try
-
-        strT = ""
+            listEvaluation.append(evaluationT)
 
-        if (bShowOutput == True):
-            if self.guessParam:
-                strT = "\n-------------------- GUESS " + (self.counterFormat.format(self.optimCounter)) + " RUNNING -----------------------\n"
-            else:
-                strT = "\n----------------- OPTIMIZATION " + (self.counterFormat.format(self.optimCounter)) + " RUNNING ---------------------\n"
+            # A cache strategy is implemented to avoid redundant calculation.
+            outputT = self.getMemo(evaluationT.paramNatural, evaluationT.isCoarse)
+            if outputT is not None:
+                listOutput[ii] = self.getOutput(evaluationT, outputT)
+                continue
             # end if
 
-            strT += self.title + ": Optimization (" + self.optimType
-            if self.optimType == "Optim":
-                strT += " " + self.minimizeMethod
-            # end if
+            listPending.append(ii)
+        # end for
 
-            strT += ") "
-            dateT = datetime.datetime.now()
-            dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
-            strT += (dateStr + "\n")
+        if len(listPending) < 1:
+            return listOutput
+        # end if
 
-            strT += "Parameter:\t"
-            for ii in range(0, self.paramCount - 1):
-                if ((self.paramPoints[ii] > 1) or (self.bruteSimul == False)):
-                    strT += "@" + self.paramName[ii] + "\t"
-                else:
-                    strT += self.paramName[ii] + "\t"
-                # end if
+        if (not self.engine.isConcurrent()) or (len(listPending) < 2):
+            # serial evaluations, in place in the output directory
+            for ii in listPending:
+                evaluationT = listEvaluation[ii]
+                evaluationT.optimCounter = self.optimCounter if (evaluationT.gridIndex is None) else (evaluationT.gridIndex + 1)
+                self.logEvaluation(evaluationT)
+                self.runEvaluation(evaluationT)
+                listOutput[ii] = self.commitEvaluation(evaluationT)
             # end for
-            if ((self.paramPoints[self.paramCount - 1] > 1) or (self.bruteSimul == False)):
-                strT += "@" + self.paramName[self.paramCount - 1] + "\n"
-            else:
-                strT += self.paramName[self.paramCount - 1] + "\n"
-            # end if
+            return listOutput
+        # end if
 
-            strT += "Natural:\t"
-            for ii in range(0, self.paramCount - 1):
-                strT += (self.paramFormat[ii] % self.paramNatural[ii]) + "\t"
-            # end for
-            strT += (self.paramFormat[self.paramCount - 1] % self.paramNatural[self.paramCount - 1]) + "\n"
+        # concurrent evaluations, each one in its own sandbox.
+        # the counters are given in the submission order to get the same merge order whatever the workers timing.
+        optimCounter = self.optimCounter
+        for ii in listPending:
+            evaluationT = listEvaluation[ii]
+            if evaluationT.gridIndex is not None:
+                optimCounter = evaluationT.gridIndex + 1
+            # end if
+            evaluationT.optimCounter = optimCounter
+            if evaluationT.inJac == False:
+                optimCounter += 1
+            # end if
+            self.setSandbox(evaluationT)
+            self.logEvaluation(evaluationT)
+        # end for
 
-            strT += "Normalized:\t"
-            for ii in range(0, self.paramCount - 1):
-                strT += (self.paramFormatNormalized[ii] % paramNormalized[ii]) + "\t"
-            # end for
-            strT += (self.paramFormatNormalized[self.paramCount - 1] % paramNormalized[self.paramCount - 1])
+        # each evaluation is merged as soon as it and the previous ones are done
+        ticT = time.time()
+        elapsedTime = self.elapsedTime
+        iPending = 0
+        for evaluationT in self.engine.stream(self.runEvaluation, [listEvaluation[ii] for ii in listPending]):
+            self.elapsedTime = elapsedTime + (time.time() - ticT)
+            listOutput[listPending[iPending]] = self.commitEvaluation(evaluationT)
+            iPending += 1
+        # end for
 
-            strT += "\n---------------------------------------------------------------\n"
+        return listOutput
 
-            self.log(strT)
-        # end if bShowOutput
+    # end optimizeBatch
 
-        ticT = time.time()
+    def setSandbox(self, evaluationT):
+        """ set the evaluation working directory to a new sandbox """
 
-        pathIn = os.path.join(self.outputDir, self.inputFilename)
-        if not os.path.isfile(pathIn):
-            dispError("cannot open input: file not found", doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-        # end if
+        self.sandboxCounter += 1
+        evaluationT.workDir = self.outputDir + self.sandboxDir + self.dirSepChar + ("%d" % self.sandboxCounter) + self.dirSepChar
+        evaluationT.isSandbox = True
 
-        fileContent = ""
+    # end setSandbox
 
-        fileT = open(self.outputDir + self.inputFilename, "r")
-        for lineT in fileT:
-            # Normalize line ending (Silvaco do not run input file if contains CRLF terminated lines)
-            lineT = lineT.rstrip("\r\n")
-            lineX = lineT.lstrip("\t ")
-            nSpaces = len(lineT) - len(lineX)
-            prefixT = lineT[0:nSpaces]
+    def submitBayesian(self, paramNormalizedBayesian):
+        """ start the evaluation of a point for the asynchronous Bayesian method, without waiting for it...
+            ...the counters are given in the submission order """
 
-            if (self.simulator.name == "atlas") and lineX.startswith("tonyplot"):
-                # skip tonyplot commands
-                continue
-            # endif
+        # If stopFilename exists, stop optimization
+        if self.stopSet():
+            try:
+                self.finish(errorOccured=False, userStopped=True)
+            except:
+                self.isRunning = False
+                sys.exit(1)
+            # end try
+            return
+        # end if
 
-            if not lineX.startswith("#"):
-                for ii in range(0, self.paramCount):
-                    setparamT = self.simulator.vardeclpre % self.paramName[ii]
-                    if lineX.startswith(setparamT):
-                        # Need to format parameter to match simulator floating representation
-                        strT = self.paramFormatShort[ii] % self.paramNatural[ii]
-                        fT = float(strT)
-                        lineT = self.simulator.vardecl % (self.paramName[ii], fT)
-                        break
-                    # end if
-                # end for
-            # end if
+        if self.asyncCounter < 1:
+            self.asyncCounter = self.optimCounter
+            self.asyncTime = self.elapsedTime
+            self.asyncTic = time.time()
+        # end if
 
-            fileContent += (lineT + "\n")
-        # end for
+        paramNormalized = self.getNormalizedBayesian(paramNormalizedBayesian)
+        evaluationT = slalomEvaluation(paramNormalized, self.getNatural(paramNormalized))
+        evaluationT.inJac = self.inJac
+        evaluationT.guessParam = self.guessParam
+        evaluationT.isCoarse = self.isCoarse
+        evaluationT.paramBayesian = paramNormalizedBayesian
+
+        # as in optimizeBatch, the points already evaluated (resumed, warm start...) are not evaluated again
+        keyT = self.getMemoKey(evaluationT.paramNatural, evaluationT.isCoarse)
+        outputT = self.getMemo(evaluationT.paramNatural, evaluationT.isCoarse)
+        if outputT is not None:
+            evaluationT.isMemoized = True
+            evaluationT.outputT = outputT
+            self.engine.put(evaluationT)
+            return
+        # end if
+        if keyT in self.asyncPending:
+            # the same point in progress: its results given when done (see collectBayesian)
+            evaluationT.isMemoized = True
+            self.asyncWaiting.setdefault(keyT, list()).append(evaluationT)
+            return
+        # end if
 
-        fileT.close()
+        evaluationT.optimCounter = self.asyncCounter
+        self.asyncCounter += 1
+        self.setSandbox(evaluationT)
+        self.logEvaluation(evaluationT)
 
-        fileT = open(self.outputDir + self.inputFilename, "w")
-        fileT.write(fileContent)
-        fileT.close()
+        self.asyncPending[keyT] = evaluationT
 
-        # format model files
-        if self.modelCount > 0:
-            for ii in range(0, self.modelCount):
-                if self.modelFilename[ii] == "":
-                    break
-                # end if
-                pathCC = os.path.join(self.outputDir, self.modelFilename[ii])
-                if not os.path.isfile(pathCC):
-                    dispError("cannot open model file: " + self.modelFilename[ii], doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-                # end if
+        # the persistent cache looked up before taking a worker
+        ticT = time.time()
+        isCached = self.getCached(evaluationT)
+        if self.cache is not None:
+            self.addTiming(evaluationT, "cache", ticT)
+        # end if
+        if isCached:
+            evaluationT.duration = time.time() - ticT
+            self.engine.put(evaluationT)
+            return
+        # end if
 
-                fileContent = ""
+        self.engine.submit(self.runEvaluation, evaluationT)
 
-                fileT = open(self.outputDir + self.modelFilename[ii], "r")
-                for lineT in fileT:
-                    # Normalize line ending (Silvaco do not run input file if contains CRLF terminated lines)
-                    lineT = lineT.rstrip("\r\n")
-                    lineX = lineT.lstrip("\t ")
-                    nSpaces = len(lineT) - len(lineX)
-                    prefixT = lineT[0:nSpaces]
-
-                    bFound = False
-
-                    nn = len(self.paramName)
-                    bFound = False
-                    if nn > 0:
-                        for jj in range(0, nn):
-                            setparamT = "double " + self.paramName[jj] + " = "
-                            if lineX.startswith(setparamT):
-                                strT = self.paramFormat[jj] % self.paramNatural[jj]
-                                fT = float(strT)
-                                lineT = prefixT + setparamT + ("%g" % fT) + ";"
-                                bFound = True
-                                break
-                            # end if
-                        # end for
-                    # end if
+    # end submitBayesian
 
-                    fileContent += (lineT + "\n")
-                # end while
-                fileT.close()
+    def collectBayesian(self):
+        """ wait for the next evaluation done (asynchronous Bayesian method) and merge it...
+            ...the evaluations are merged in the completion order """
 
-                fileT = open(self.outputDir + self.modelFilename[ii], "w")
-                fileT.write(fileContent)
-                fileT.close()
+        evaluationT = self.engine.wait()
+        self.elapsedTime = self.asyncTime + (time.time() - self.asyncTic)
+        if evaluationT.isMemoized:
+            outputT = self.getOutput(evaluationT, evaluationT.outputT)
+        else:
+            # the same points suggested meanwhile: given the results (the point requested, even if perturbed)
+            keyT = self.getMemoKey(self.getNatural(self.getNormalizedBayesian(evaluationT.paramBayesian)), evaluationT.isCoarse)
+            self.asyncPending.pop(keyT, None)
+            outputT = self.commitEvaluation(evaluationT)
+            for evaluationW in self.asyncWaiting.pop(keyT, list()):
+                evaluationW.outputT = evaluationT.outputT
+                self.engine.put(evaluationW)
             # end for
         # end if
+        # the next counter is the next one to submit, not the next one to merge
+        self.optimCounter = self.asyncCounter
 
-        # remove the simulator verbose output file before starting optimization
-        pathT = os.path.join(self.outputDir, self.verboseFilename)
-        try:
-            if os.path.isfile(pathT):
-                os.unlink(pathT)
-            # end if
-        except:
-            pass
-        # end try
+        # the point as suggested (the pending one), even if perturbed by a retry
+        return evaluationT.paramBayesian, outputT
 
-        # run optimization
-        try:
-            tEnv = dict(os.environ)
-            subprocess.check_call([self.outputDir + self.commandFilename, ""], shell=True, env=tEnv)
-        except (subprocess.CalledProcessError, excT):
-            try:
-                strT = self.printOutput()
-                fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
-                fileOptim.write(strT)
-                fileOptim.close()
-            except:
-                pass
-            # end try
-            dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-            return 0.0
-        # end try
+    # end collectBayesian
 
-        simulatorError = self.isErrorOccurred()
-        if (simulatorError is not None):
-            try:
-                fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
-                fileOptim.write(simulatorError)
-                fileOptim.close()
-            except:
-                pass
-            # end try
-            dispError(simulatorError, doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-            return 0.0
-        # end if
+    def logEvaluation(self, evaluationT):
+        """ log the evaluation start """
 
-        # Calculate the efficiency (Very important to be precise for the optimization algorithm)
-        LinesToSkip = 4
-        arrVoltage = np.array([])
-        arrCurrent = np.array([])
-        arrPower = np.array([])
-        iLine = 0
-        iPoints = 0
-        iPVPoints = 0
-
-        pathJV = os.path.join(self.outputDir, self.outputFilename[self.outputFilenameJVposition])
-        if not os.path.isfile(pathJV):
-            # do not necessarily exit, since the simulator can sometimes diverge for a set of parameters choosen by the optimizer
-            dispError("cannot evaluate efficiency: J-V file not found: check the simulator output file (%s)" % self.verboseFilename, doExit = False)
-            return 0.0
+        bShowOutput = ((evaluationT.inJac == False) or (self.optimType == "Brute"))
+        if (bShowOutput == False):
+            return
         # end if
 
-        # :REV:1:20181115: J(V) from V = 0 to V = VOC (the photovoltaic part of the I(V) characteristic)
-        pathJVP = os.path.join(self.outputDir, self.outputFilename[self.outputFilenameJVPposition])
-        JVPcontent = ""
+        if evaluationT.guessParam:
+            strT = "\n-------------------- GUESS " + (self.counterFormat.format(evaluationT.optimCounter)) + " RUNNING -----------------------\n"
+        else:
+            strT = "\n----------------- OPTIMIZATION " + (self.counterFormat.format(evaluationT.optimCounter)) + " RUNNING ---------------------\n"
+        # end if
 
-        try:
+        strT += self.title + ": Optimization (" + self.optimType
+        if self.optimType == "Optim":
+            strT += " " + self.minimizeMethod
+        # end if
 
-            iVpos = 0
-            fVocx = 0.0
-            fV = 0.0
-            fVprev = 0.0
-            fJ = 0.0
-            fJprev = 0.0
-            fP = 0.0
-            fPprev = 0.0
-            DblPrecision = 1e-13
-            bStarted = False
-            bFirstV = False
-
-            fileT = open(self.outputDir + self.outputFilename[self.outputFilenameJVposition], "r")
-            for lineT in fileT:
+        strT += ") "
+        dateT = datetime.datetime.now()
+        dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
+        strT += (dateStr + "\n")
 
-                if (lineT.startswith("#")):
-                    JVPcontent += lineT
-                    continue
-                # end if
+        strT += "Parameter:\t"
+        for ii in range(0, self.paramCount - 1):
+            if ((self.paramPoints[ii] > 1) or (self.bruteSimul == False)):
+                strT += "@" + self.paramName[ii] + "\t"
+            else:
+                strT += self.paramName[ii] + "\t"
+            # end if
+        # end for
+        if ((self.paramPoints[self.paramCount - 1] > 1) or (self.bruteSimul == False)):
+            strT += "@" + self.paramName[self.paramCount - 1] + "\n"
+        else:
+            strT += self.paramName[self.paramCount - 1] + "\n"
+        # end if
 
-                if iLine < LinesToSkip:
-                    iLine += 1
-                    JVPcontent += lineT
-                    continue
-                # end if
+        strT += "Natural:\t"
+        for ii in range(0, self.paramCount - 1):
+            strT += (self.paramFormat[ii] % evaluationT.paramNatural[ii]) + "\t"
+        # end for
+        strT += (self.paramFormat[self.paramCount - 1] % evaluationT.paramNatural[self.paramCount - 1]) + "\n"
 
-                arrLine = []
-                try:
-                    arrLine = lineT.split(self.simulator.dataSeparator)
-                except:
-                    break
-                # end try
+        strT += "Normalized:\t"
+        for ii in range(0, self.paramCount - 1):
+            strT += (self.paramFormatNormalized[ii] % evaluationT.paramNormalized[ii]) + "\t"
+        # end for
+        strT += (self.paramFormatNormalized[self.paramCount - 1] % evaluationT.paramNormalized[self.paramCount - 1])
 
-                if (len(arrLine) < 2):
-                    continue
-                # end if
+        strT += "\n---------------------------------------------------------------\n"
 
-                fV = float(arrLine[0])
-                fJ = float(arrLine[1])
-                fP = math.fabs(fV * fJ)
+        self.log(strT)
 
-                if (False == bStarted):
-                    bStarted = True
-                    fVprev = fV
-                    fJprev = fJ
-                    fPprev = fP
-                    continue
-                # end if
+    # end logEvaluation
 
-                # voltage should be in increasing order
-                if (fV <= fVprev):
-                    fVprev = fV
-                    fJprev = fJ
-                    fPprev = fP
-                    continue
-                # end if
+    def runEvaluation(self, evaluationT):
+        """ run one evaluation in its working directory...
+            ...can be called concurrently by the engine workers: only the evaluation is modified here...
+            ...except the persistent cache hits and misses counters, updated under the cache lock (see slalomCache.get) """
 
-                if (math.fabs(fV) < DblPrecision):
-                    fV = 0.0
-                # end if
+        ticT = time.time()
 
-                if (False == bFirstV):
-                    bFirstV = True
-                    arrVoltage = np.append(arrVoltage, fVprev)
-                    arrCurrent = np.append(arrCurrent, fJprev)
-                    arrPower = np.append(arrPower, fPprev)
-                    continue
+        try:
+            # the cache possibly looked up before the evaluation submitted (see submitBayesian)
+            isChecked = evaluationT.isCacheChecked
+            isCached = evaluationT.isCached if isChecked else self.getCached(evaluationT)
+            if (self.cache is not None) and (not isChecked):
+                self.addTiming(evaluationT, "cache", ticT)
+            # end if
+            if isCached:
+                # results from the persistent cache: the simulator is not launched
+                pass
+            elif self.simulateEvaluation(evaluationT):
+                # failure policy: retried with perturbed parameters or relaxed numerics, or failed with a penalty
+                while (not evaluationT.isDone()) and self.setRetry(evaluationT):
+                    self.simulateEvaluation(evaluationT)
+                # end while
+                if (evaluationT.status == "error") and (self.failurePolicy != "abort"):
+                    evaluationT.status = "failed"
                 # end if
+            # end if
+        except Exception:
+            # catch only Exception (since sys.exit raise BaseException)
+            evaluationT.status = "error"
+            evaluationT.error = traceback.format_exc()
+        # end try
 
-                arrVoltage = np.append(arrVoltage, fV)
-                arrCurrent = np.append(arrCurrent, fJ)
-                arrPower = np.append(arrPower, fP)
-                iPoints = len(arrVoltage)
+        evaluationT.duration = time.time() - ticT
 
-                if (fV * fJ) <= 0.0:
-                    JVPcontent += lineT
-                # end if
+        return evaluationT
 
-                if (iPoints != len(arrCurrent)) or (iPoints != len(arrPower)):
-                    # do not necessarily exit, since the simulator can sometimes diverge for a set of parameters choosen by the optimizer
-                    dispError("cannot evaluate efficiency: J-V file content not valid: check the simulator output file (%s)" % self.verboseFilename, doExit = False)
-                    return 0.0
-                # end if
+    # end runEvaluation
 
-                if ((fV > 0.0) and (fJ > 0.0)):
-                    if (iVpos == 0):
-                        fVocx = fVprev
-                    # end if
-                    iVpos += 1
-                    if (iVpos > 2):
-                        break
-                    # end if
-                # end if
+    def simulateEvaluation(self, evaluationT):
+        """ write the input, run the simulator and calculate the efficiency...
+            ...returns False if the input cannot be written (the simulator not launched) """
 
-                if ((fV * fJ) < 0.0):
-                    iPVPoints += 1
-                #end if
+        ticT = time.time()
+        isWritten = self.writeInput(evaluationT)
+        ticT = self.addTiming(evaluationT, "input", ticT)
+        if not isWritten:
+            return False
+        # end if
 
-                fVprev = fV
+        isDone = self.runSimulator(evaluationT)
+        ticT = self.addTiming(evaluationT, "simulator", ticT)
+        if isDone:
+            # the J-V reading is timed separately (in getEfficiency)
+            timeJV = evaluationT.timing.get("jv", 0.0)
+            self.getEfficiency(evaluationT)
+            self.addTiming(evaluationT, "efficiency", ticT + (evaluationT.timing.get("jv", 0.0) - timeJV))
+        # end if
 
-                iLine += 1
-            # end for
+        return True
 
-            fileT.close()
+    # end simulateEvaluation
 
+    @staticmethod
+    def addTiming(evaluationT, phaseT, ticT):
+        """ add the time elapsed since ticT to the evaluation phase duration, returns the current time """
+
+        tocT = time.time()
+        evaluationT.timing[phaseT] = evaluationT.timing.get(phaseT, 0.0) + (tocT - ticT)
+
+        return tocT
+
+    # end addTiming
+
+    def setTiming(self, evaluationT):
+        """ write the evaluation timing record (JSON line) and add its phases duration to the total """
+
+        self.timingCount += 1
+        for phaseT in evaluationT.timing:
+            self.timingTotal[phaseT] = self.timingTotal.get(phaseT, 0.0) + evaluationT.timing[phaseT]
+        # end for
+
+        try:
+            recordT = collections.OrderedDict()
+            recordT["index"] = evaluationT.optimCounter
+            recordT["time"] = datetime.datetime.now().strftime("%Y%m%d-%H%M%S")
+            recordT["status"] = "timeout" if evaluationT.isTimeout else evaluationT.status
+            recordT["exit"] = evaluationT.exitCode
+            recordT["cache"] = None if (self.cache is None) else ("hit" if evaluationT.isCached else "miss")
+            recordT["retries"] = evaluationT.retryCount
+            recordT["stopped"] = evaluationT.isStopped
+            recordT["coarse"] = evaluationT.isCoarse
+            recordT["sandbox"] = evaluationT.isSandbox
+            recordT["duration"] = round(evaluationT.duration, 4)
+            recordT["phases"] = collections.OrderedDict([(phaseT, round(evaluationT.timing[phaseT], 4)) for phaseT in evaluationT.timing])
+            fileT = open(self.outputDir + self.timingFilename, "a")
+            fileT.write(json.dumps(recordT) + "\n")
+            fileT.close()
         except:
-            dispError("cannot evaluate efficiency: check the simulator output file (%s)" % self.verboseFilename, doExit = True)
             pass
         # end try
 
-        # :REV:1:20181115: J(V) from V = 0 to V = VOC
-        fileJVP = open(pathJVP, "w")
-        fileJVP.write(JVPcontent)
-        fileJVP.close()
+    # end setTiming
 
-        outputT = 0.0
-        outputO = 0.0
+    def getTimingSummary(self):
+        """ the phases total duration and share (where the evaluations time went) """
 
-        # max current in mA/cm2
-        fJm = 0.0
+        timeTotal = sum(self.timingTotal.values())
+        if (self.timingCount < 1) or (timeTotal <= 0.0):
+            return None
+        # end if
 
-        # max voltage in Volts
-        fVm = 0.0
+        listT = [(phaseT, self.timingTotal[phaseT]) for phaseT in self.timingTotal]
+        listT.sort(key = lambda itemT: itemT[1], reverse = True)
+        strT = "Timing (%d evaluations, %s): " % (self.timingCount, self.printTime(timeTotal))
+        strT += ", ".join([("%s %.2f s (%.1f %%)" % (phaseT, timeT, 100.0 * timeT / timeTotal)) for phaseT, timeT in listT])
 
-        # Fill Factor
-        fFF = 0.0
+        return strT
 
-        # Short-circuit current in mA/cm2
-        fJsc = 0.0
+    # end getTimingSummary
 
-        # Open-circuit voltage in Volts
-        fVoc = 0.0
+    def setRetry(self, evaluationT):
+        """ prepare the evaluation to be retried according to the failure policy (False if not to be retried) """
+
+        if self.failurePolicy == "perturb":
+            if evaluationT.retryCount >= self.failureRetry:
+                return False
+            # end if
+            if evaluationT.randomState is None:
+                # called from the worker threads: a generator per evaluation (not the global one), seeded from the...
+                # ...optimization seed, the evaluation index and the point requested (the Jacobian points share their index)...
+                # ...to get the same perturbed points whatever the workers timing and when resuming
+                indexT = (evaluationT.gridIndex + 1) if (evaluationT.gridIndex is not None) else evaluationT.optimCounter
+                keyT = zlib.crc32(repr(self.getMemoKey(evaluationT.paramNatural, evaluationT.isCoarse)).encode("utf-8")) & 0xffffffff
+                evaluationT.randomState = np.random.RandomState([self.randomSeed & 0xffffffff, indexT & 0xffffffff, keyT])
+            # end if
+            paramNormalized = np.array(evaluationT.paramNormalized)
+            for ii in range(0, self.paramCount):
+                tStart, tEnd = self.getNormalizedBounds(ii)
+                paramNormalized[ii] += evaluationT.randomState.uniform(-1.0, 1.0) * self.failurePerturb * (tEnd - tStart)
+                paramNormalized[ii] = min(max(paramNormalized[ii], min(tStart, tEnd)), max(tStart, tEnd))
+            # end for
+            # the point actually simulated: the memoization, checkpoint, cache and results store keyed by it
+            evaluationT.paramNormalized = paramNormalized
+            evaluationT.paramNatural = self.getNatural(paramNormalized)
+        elif self.failurePolicy == "relax":
+            if (evaluationT.retryCount >= 1) or (self.relaxTemplate is None):
+                return False
+            # end if
+            evaluationT.isRelaxed = True
+        else:
+            return False
+        # end if
 
-        # Maximal power in mW/cm2
-        Pmax = 0.0
+        evaluationT.retryCount += 1
+        evaluationT.warning.append("Evaluation failed (%s): retried %s" % (self.getFailure(evaluationT),
+            (("with perturbed parameters: " + self.getParamKey(evaluationT.paramNatural).replace("\t", " ")) if (self.failurePolicy == "perturb") else "with relaxed numerics")))
+        evaluationT.status = "pending"
+        evaluationT.error = None
+        evaluationT.errorOutput = None
+        evaluationT.isTimeout = False
+        evaluationT.isStopped = False
+        self.deleteOutput(evaluationT.workDir)
 
-        doCalc = True
+        return True
 
-        if (iPVPoints < 12):
-            doCalc = False
-            # do not necessarily exit, since the simulator can sometimes diverge for a set of parameters choosen by the optimizer
-            dispError("Cannot evaluate efficiency: J-V curve has less than 12 points with V*J < 0", doExit = False)
-            return 0.0
+    # end setRetry
+
+    @staticmethod
+    def getFailure(evaluationT):
+        """ the failure reason (first line of the error or of the last warning) """
+
+        strT = evaluationT.error if (evaluationT.error is not None) else (evaluationT.warning[-1] if (len(evaluationT.warning) > 0) else "")
+        listT = [lineT.strip() for lineT in strT.split("\n") if (lineT.strip() != "")]
+        if len(listT) < 1:
+            return "unknown"
         # end if
 
-        try:
-            if doCalc == True:
+        # Python traceback: the exception is on the last line
+        return listT[-1] if listT[0].startswith("Traceback") else listT[0]
 
-                windowLen = 8
+    # end getFailure
 
-                # interpolate the J-V data to accurately calculate the efficiency
-                funcCurrent = interpolate.interp1d(arrVoltage, arrCurrent, kind='slinear')
-                funcPower = interpolate.interp1d(arrVoltage, arrPower, kind='cubic')
-                iPointsNew = iPoints * windowLen
-                #
+    def getNormalizedBounds(self, paramIndex):
+        """ the normalized parameter range (start, end) """
 
-                dV = (arrVoltage[iPoints - 1] - arrVoltage[0]) / float(iPointsNew - 1)
-                arrVoltageNew = np.arange(arrVoltage[0], arrVoltage[iPoints - 1] + dV, dV)
-                iPointsNew = len(arrVoltageNew)
+        if self.paramLogscale[paramIndex]:
+            tStart = math.log10(self.paramStart[paramIndex]) / math.log10(self.paramNorm[paramIndex])
+            tEnd = math.log10(self.paramEnd[paramIndex]) / math.log10(self.paramNorm[paramIndex])
+        else:
+            tStart = self.paramStart[paramIndex] / self.paramNorm[paramIndex]
+            tEnd = self.paramEnd[paramIndex] / self.paramNorm[paramIndex]
+        # end if
 
-                iC = iPointsNew
-                for ii in range(iPointsNew - 1, iPointsNew - windowLen - 1, -1):
-                    if (arrVoltageNew[ii] > arrVoltage[iPoints - 1]):
-                        iC -= 1
-                    else:
-                        break
-                    # end if
-                # end for
-                if iC < iPointsNew:
-                    arrVoltageNew = np.delete(arrVoltageNew, np.arange(iC, iPointsNew, 1))
-                    iPointsNew = len(arrVoltageNew)
-                # end for
+        return tStart, tEnd
 
-                arrCurrentNew = funcCurrent(arrVoltageNew)
-                arrPowerNew = funcPower(arrVoltageNew)
-                dV = arrVoltageNew[1] - arrVoltageNew[0]
+    # end getNormalizedBounds
 
-                bFoundJsc = False
-                bFoundVoc = False
-                bFoundPmax = False
+    def setFailed(self, evaluationT):
+        """ record the failed evaluation (parameters and reason) in the failed evaluations file """
 
-                # Find PV parameters
-                for ii in range(0, iPointsNew - 1):
+        self.failedCount += 1
 
-                    # Short-circuit current (mA/cm2)
-                    if (bFoundJsc == False):
-                        if ((arrVoltageNew[ii] < 0.0) and (arrVoltageNew[ii + 1] > 0.0)):
-                            fJsc = 0.5 * (arrCurrentNew[ii] + arrCurrentNew[ii + 1])
-                            bFoundJsc = True
-                            if (bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True):
-                                break
-                            # end if
-                        elif ((arrVoltageNew[ii] >= 0.0) and (arrVoltageNew[ii] <= dV)):
-                            fJsc = arrCurrentNew[ii]
-                            bFoundJsc = True
-                            if (bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True):
-                                break
-                            # end if
-                        # end if
-                    # end if
+        try:
+            pathT = os.path.join(self.outputDir, self.failedFilename)
+            strT = ""
+            if not os.path.isfile(pathT):
+                strT += "Index\tTime\t" + "\t".join(self.paramName) + "\tStatus\tRetries\tReason\n"
+            # end if
+            strT += self.counterFormat.format(evaluationT.optimCounter) + "\t" + datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + "\t"
+            strT += self.getParamKey(evaluationT.paramNatural) + "\t" + ("timeout" if evaluationT.isTimeout else evaluationT.status) + ("\t%d\t" % evaluationT.retryCount)
+            strT += self.getFailure(evaluationT).replace("\t", " ") + "\n"
+            fileT = open(pathT, "a")
+            fileT.write(strT)
+            fileT.close()
+        except:
+            pass
+        # end try
 
-                    # Open-circuit voltage (V)
-                    if (bFoundVoc == False):
-                        if ((arrCurrentNew[ii] < 0.0) and (arrCurrentNew[ii + 1] > 0.0)):
-                            fVoc = 0.5 * (arrVoltageNew[ii] + arrVoltageNew[ii + 1])
-                            bFoundVoc = True
-                            if (bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True):
-                                break
-                        elif ((arrCurrentNew[ii] < 0.0) and (arrCurrentNew[ii + 1] >= 0.0)):
-                            fVoc = arrVoltageNew[ii + 1]
-                            bFoundVoc = True
-                            if (bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True):
-                                break
-                            # end if
-                        # end if
-                    # end if
+    # end setFailed
 
-                    # Maximum power (mW/cm2)
-                    if ((bFoundPmax == False) and (ii >= windowLen) and (ii <= (iPointsNew - windowLen))):
-                        if ((arrPowerNew[ii - 2] < arrPowerNew[ii - 1]) and (arrPowerNew[ii - 1] < arrPowerNew[ii]) and (arrPowerNew[ii] > arrPowerNew[ii + 1]) and (arrPowerNew[ii + 1] > arrPowerNew[ii + 2])):
-                            fJm = arrCurrentNew[ii]
-                            fVm = arrVoltageNew[ii]
-                            Pmax = arrPowerNew[ii]
-                            bFoundPmax = True
-                            if (bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True):
-                                break
-                            # end if
-                        # end if
-                    # end if
+    def prepareTemplate(self):
+        """ parse once the input and model files (in the output directory) into templates:...
+            ...list of text segments and parameter slots, the slots being (parameter index, line prefix) tuples """
 
-                    # Direct polarization
-                    if (((arrVoltageNew[ii] > 0.0) and (arrCurrentNew[ii] > 0.0)) or ((arrVoltageNew[ii] < 0.0) and (arrCurrentNew[ii] < 0.0))) and bFoundPmax:
-                        break
-                    # end if
-                # end for (Find PV parameters)
+        self.inputTemplate = None
+        self.modelTemplate = list()
+        self.modelStatic = list()
+
+        pathIn = os.path.join(self.outputDir, self.inputFilename)
+        if not os.path.isfile(pathIn):
+            return False
+        # end if
 
-                outputT = 0.0
+        listSetparam = [(self.simulator.vardeclpre % self.paramName[ii]) for ii in range(0, self.paramCount)]
 
-                if (bFoundJsc == False):
-                    if ((arrCurrentNew[0] < 0.0) and (arrVoltageNew[0] > 0.0)):
-                        fJsc = -arrCurrentNew[0]
-                    # end if
-                else:
-                    fJsc = -fJsc
-                # end if
+        # early termination: the variables and the extract part of the input file (from the log extraction to the end)
+        strSet = (self.simulator.vardeclpre % "")
+        extractT = list()
+        isExtract = False
 
-                if (bFoundVoc == False):
-                    if ((arrCurrentNew[iPointsNew - 1] < 0.0) and (arrVoltageNew[iPointsNew - 1] > 0.0)):
-                        fVoc = arrVoltageNew[iPointsNew - 1]
-                    else:
-                        if (fVocx > 0.01):
-                            fVoc = fVocx
-                            bFoundVoc = True
-                        # end if
-                    # end if
-                # end if
+        # failure policy: the input file with relaxed numerics
+        relaxT = list()
+        isRelax = False
 
-                if ((bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True)):
-                    fFF = 100.0 * Pmax / math.fabs(fJsc * fVoc)
-                    if (fFF >= 95.0):
-                        bFoundPmax = False
-                    # end if
-                # end if
+        # multi-fidelity: the input file with a lower resolution
+        coarseT = list()
+        isCoarse = False
 
-                if ((bFoundJsc == False) or (bFoundVoc == False) or (bFoundPmax == False)):
-                    strT = "Cannot evaluate efficiency: "
-                    if bFoundJsc:
-                        strT += ("  JSC = %.5f mA/cm2" % math.fabs(fJsc))
-                    else:
-                        strT += "  JSC not found"
-                    # end if
-                    if bFoundVoc:
-                        strT += ("  VOC = %.5f V" % math.fabs(fVoc))
-                    else:
-                        strT += "  VOC not found"
-                    # end if
-                    if bFoundPmax:
-                        strT += ("  Pmax = %.5f mW/cm2" % Pmax)
-                    else:
-                        strT += "  Pmax not found"
-                        Pmax = 0.0
-                    # end if
-                    strT += "\n -> increase V-range and/or decrease V-step"
-                    dispError(strT, doExit = False)
-                # end if
+        templateT = list()
+        fileT = open(self.outputDir + self.inputFilename, "r")
+        for lineT in fileT:
+            # Normalize line ending (Silvaco do not run input file if contains CRLF terminated lines)
+            lineT = lineT.rstrip("\r\n")
+            lineX = lineT.lstrip("\t ")
 
-                # AM 1.5 power density ~ 100 mW/cm2 (Atlas default AM 1.5 spectrum gives 100.037 mW/cm2)
-                Psolar = 100.037
-                outputT = 100.0 * Pmax / Psolar
-                if (outputT == 0.0):
-                    fJsc = 0.0
-                    fVoc = 0.0
-                    fFF = 0.0
-                # end if
+            if (self.simulator.name == "atlas") and lineX.startswith("tonyplot"):
+                # skip tonyplot commands
+                continue
+            # endif
 
-                # efficiency as calculated by the simulator
-                if ((bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True)):
-                    pathEE = os.path.join(self.outputDir, self.outputFilename[self.outputFilenameEFFposition])
-                    if not os.path.isfile(pathEE):
-                        dispError("cannot evaluate efficiency: '%s' file not found" % pathEE, doExit = False)
+            if not lineX.startswith("#"):
+                slotT = None
+                for ii in range(0, self.paramCount):
+                    if lineX.startswith(listSetparam[ii]):
+                        slotT = (ii, None)
+                        break
                     # end if
-                    outputO = 0.0
-                    try:
-                        fileO = open(self.outputDir + self.outputFilename[self.outputFilenameEFFposition], "r")
-                        lineO = ""
-                        iLT = len("Efficiency=20.123456789123456789123456789")
-                        for lineOT in fileO:
-                            if lineOT.startswith("Efficiency=") and (len(lineOT) <= iLT):
-                                lineO = lineOT
-                            # end if
-                        # end for
-                        fileO.close()
-                        if lineO.startswith("Efficiency=") and (len(lineO) <= iLT):
-                            outputO = float(lineO.split("=")[1].rstrip(" \t\r\n").lstrip(" \t\r\n"))
-                        # end if
-                        os.unlink(self.outputDir + self.outputFilename[self.outputFilenameEFFposition])
-                    except:
-                        outputO = 0.0
-                        pass
-                    # end try
+                # end for
+                if slotT is not None:
+                    templateT.append(slotT)
+                    extractT.append(slotT)
+                    relaxT.append(slotT)
+                    coarseT.append(slotT)
+                    continue
                 # end if
-
-                if outputT > self.outputOptimized:
-                    self.outputOptimized = outputT
-                    self.paramOptim = np.zeros(self.paramCount)
-                    for ii in range(0, self.paramCount):
-                        self.paramOptim[ii] = self.paramNatural[ii]
-                    # end if
+                if lineX.startswith("extract") and ("init" in lineX) and (self.outputFilename[0] in lineX):
+                    isExtract = True
                 # end if
-
-                if math.fabs(fJsc) > self.outputOptimizedx:
-                    self.outputOptimizedx = math.fabs(fJsc)
+                if isExtract or lineX.startswith(strSet):
+                    self.appendTemplate(extractT, lineT + "\n")
                 # end if
+            # end if
 
-                if math.fabs(fVoc) > self.outputOptimizedy:
-                    self.outputOptimizedy = math.fabs(fVoc)
-                # end if
+            self.appendTemplate(templateT, lineT + "\n")
+            lineR = lineT if lineX.startswith("#") else self.simulator.relaxLine(lineT)
+            isRelax = isRelax or (lineR != lineT)
+            self.appendTemplate(relaxT, lineR + "\n")
+            lineC = lineT if (lineX.startswith("#") or (self.fidelity is None)) else self.simulator.coarseLine(lineT, self.fidelity)
+            isCoarse = isCoarse or (lineC != lineT)
+            self.appendTemplate(coarseT, lineC + "\n")
+        # end for
+        fileT.close()
+        self.inputTemplate = templateT
+        self.extractTemplate = extractT if isExtract else None
+        self.relaxTemplate = relaxT if isRelax else None
+        self.coarseTemplate = coarseT if isCoarse else None
+        if (self.earlyStop is not None) and (not isExtract):
+            self.log("\nEarly termination disabled: the input file does not extract the outputs from " + self.outputFilename[0] + "\n")
+        # end if
+
+        # model files
+        listSetparam = [("double " + self.paramName[jj] + " = ") for jj in range(0, self.paramCount)]
+        for ii in range(0, self.modelCount):
+            if self.modelFilename[ii] == "":
+                break
+            # end if
+            pathCC = os.path.join(self.outputDir, self.modelFilename[ii])
+            if not os.path.isfile(pathCC):
+                self.modelTemplate.append(None)
+                self.modelStatic.append(False)
+                continue
+            # end if
 
-                if fFF > self.outputOptimizedz:
-                    self.outputOptimizedz = fFF
+            templateT = list()
+            fileT = open(self.outputDir + self.modelFilename[ii], "r")
+            for lineT in fileT:
+                # Normalize line ending (Silvaco do not run input file if contains CRLF terminated lines)
+                lineT = lineT.rstrip("\r\n")
+                lineX = lineT.lstrip("\t ")
+                nSpaces = len(lineT) - len(lineX)
+                prefixT = lineT[0:nSpaces]
+
+                slotT = None
+                for jj in range(0, self.paramCount):
+                    if lineX.startswith(listSetparam[jj]):
+                        slotT = (jj, prefixT + listSetparam[jj])
+                        break
+                    # end if
+                # end for
+                if slotT is not None:
+                    templateT.append(slotT)
+                else:
+                    self.appendTemplate(templateT, lineT + "\n")
                 # end if
+            # end for
+            fileT.close()
+            self.modelTemplate.append(templateT)
+            # dependency map: a model file without any optimized parameter is rendered only once, here
+            isStatic = all([(not isinstance(itemT, tuple)) for itemT in templateT])
+            self.modelStatic.append(isStatic)
+            if isStatic:
+                fileT = open(self.outputDir + self.modelFilename[ii], "w")
+                fileT.write("".join(templateT))
+                fileT.close()
+            # end if
+        # end for
 
-            # end if doCalc
-        except:
-            dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-            pass
-        # end try
+        return True
 
-        durationT = time.time() - ticT
-        self.elapsedTime += durationT
-        if self.funcCounter == 1:
-            self.delayMean = float(durationT)
+    # end prepareTemplate
+
+    @staticmethod
+    def appendTemplate(templateT, strT):
+        """ append a text segment to a template (merged with the previous text segment) """
+        if (len(templateT) > 0) and (not isinstance(templateT[-1], tuple)):
+            templateT[-1] += strT
         else:
-            self.delayMean = float(self.elapsedTime) / float(self.funcCounter)
+            templateT.append(strT)
         # end if
+    # end appendTemplate
 
-        if (self.delayMin == 0) or (durationT < self.delayMin):
-            self.delayMin = durationT
-        if (self.delayMax == 0) or (durationT > self.delayMax):
-            self.delayMax = durationT
-
-        try:
-            # Timing information
-            pathDelay = os.path.join(self.outputDir, self.delayFilename)
-            fileT = open(pathDelay, "w")
-            fileT.write("DelayMin = %.1f" % self.delayMin)
-            fileT.write("\nDelayMax = %.1f" % self.delayMax)
-            fileT.write("\nDelayMean = %.1f" % self.delayMean)
-            fileT.close()
-        except:
-            pass
-
-        strT = ""
+    def renderTemplate(self, templateT, paramNatural):
+        """ render a template with the parameters values (formatted to match the simulator floating representation) """
 
-        if (bShowOutput == True):
-            if self.guessParam:
-                strT = "\n---------------------- GUESS " + (self.counterFormat.format(self.optimCounter)) + " DONE --------------------------\n"
+        listT = list()
+        for itemT in templateT:
+            if not isinstance(itemT, tuple):
+                listT.append(itemT)
+                continue
+            # end if
+            ii, prefixT = itemT
+            if prefixT is None:
+                # input file: set parameter
+                listT.append((self.simulator.vardecl % (self.paramName[ii], float(self.paramFormatShort[ii] % paramNatural[ii]))) + "\n")
             else:
-                strT = "\n------------------- OPTIMIZATION " + (self.counterFormat.format(self.optimCounter)) + " DONE ----------------------\n"
+                # model file: double parameter
+                listT.append(prefixT + ("%g" % float(self.paramFormat[ii] % paramNatural[ii])) + ";\n")
             # end if
+        # end for
 
-            strT += self.title + ": Optimization (" + self.optimType
-            if self.optimType == "Optim":
-                strT += " " + self.minimizeMethod
-            # end if
+        return "".join(listT)
 
-            strT += ") "
-            dateT = datetime.datetime.now()
-            dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
-            strT += (dateStr + "\n")
+    # end renderTemplate
 
-            strT += "Parameter:\t"
-            for ii in range(0, self.paramCount - 1):
-                strT += self.paramName[ii] + "\t"
-            # end for
-            strT += self.paramName[self.paramCount - 1] + "\n"
+    def writeInput(self, evaluationT):
+        """ write the simulator input and model files with the evaluation parameters in its working directory...
+            ...from the templates parsed once by prepareTemplate """
 
-            strT += "Natural:\t"
-            tParam = ""
-            for ii in range(0, self.paramCount - 1):
-                strT += (self.paramFormat[ii] % self.paramNatural[ii]) + "\t"
-                tParam += (self.paramFormat[ii] % self.paramNatural[ii]) + "\t"
-            # end for
-            strT += (self.paramFormat[self.paramCount - 1] % self.paramNatural[self.paramCount - 1]) + "\n"
-            tParam += (self.paramFormat[self.paramCount - 1] % self.paramNatural[self.paramCount - 1])
-            if (len(self.lastParam) >= self.lastParamLimit):
-                self.lastParam.pop(0)
-            # end if
-            self.lastParam.append(tParam)
+        workDir = evaluationT.workDir
 
-            strT += "Normalized:\t"
-            for ii in range(0, self.paramCount - 1):
-                strT += (self.paramFormatNormalized[ii] % paramNormalized[ii]) + "\t"
-            # end for
-            strT += (self.paramFormatNormalized[self.paramCount - 1] % paramNormalized[self.paramCount - 1])
+        if self.inputTemplate is None:
+            evaluationT.status = "error"
+            evaluationT.error = "cannot open input: file not found"
+            return False
+        # end if
 
-            strT += "\nPRESENT Efficiency: " + ("%g %%" % outputT) + " (Simulator: " + ("%g %%" % outputO) + ")"
-            strT += "\nPRESENT " + ("FF = %08.5f %%" % fFF) + (" ; Jsc = %08.5f mA/cm2" % math.fabs(fJsc)) + (" ; Voc = %08.5f V" % math.fabs(fVoc))
-            strT += "\nMAXIMUM Efficiency: %g %%" % self.outputOptimized
-            strT += "\nThis run duration: " + self.printTime(float(durationT)) + " (mean: " + self.printTime(self.delayMean) + ")"
-            strT += "\nElapsed time: " + self.printTime(float(self.elapsedTime))
-            strT += "\nNumber of function evaluations: %d" % self.funcCounter
-            if self.bruteSimul:
-                if self.funcCounter < (self.paramCountTotal - 1):
-                    remainingT = (float(self.paramCountTotal) * self.delayMean) - float(self.elapsedTime)
-                    strT += "\nEstimated remaining time: " + self.printTime(remainingT)
-                # end if
+        for ii in range(0, len(self.modelTemplate)):
+            if self.modelTemplate[ii] is None:
+                evaluationT.status = "error"
+                evaluationT.error = "cannot open model file: " + self.modelFilename[ii]
+                return False
             # end if
-            strT += "\n---------------------------------------------------------------\n"
+        # end for
 
-            self.log(strT)
+        if evaluationT.isSandbox:
+            # the sandbox contains its own input, models, launcher and outputs
+            slalomEngine.createSandbox(workDir)
+            strT = "\n".join(self.simulator.getCommand(self.inputFilename, self.currentDir, workDir, self.verboseFilename))
+            fileT = open(workDir + self.commandFilename, "w")
+            fileT.write(strT)
+            fileT.close()
+            self.chmodExec(workDir + self.commandFilename)
+        # end if
 
-            dateStrCompact = None
+        fileT = open(workDir + self.inputFilename, "w")
+        # the relaxed numerics (failure policy retry) are at full resolution
+        if evaluationT.isRelaxed:
+            templateT = self.relaxTemplate
+        elif evaluationT.isCoarse:
+            templateT = self.coarseTemplate
+        else:
+            templateT = self.inputTemplate
+        # end if
+        fileT.write(self.renderTemplate(templateT, evaluationT.paramNatural))
+        fileT.close()
 
-            if not self.guessParam:
-                dateT = datetime.datetime.now()
-                dateStrCompact = dateT.strftime("%Y%m%d-%H%M%S")
+        # format model files (only those with optimized parameters)
+        for ii in range(0, len(self.modelTemplate)):
+            if self.modelStatic[ii]:
+                # unchanged: kept as is in the output directory, linked in the sandbox
+                if evaluationT.isSandbox:
+                    slalomEngine.linkFile(self.outputDir + self.modelFilename[ii], workDir + self.modelFilename[ii])
+                # end if
+                continue
+            # end if
+            fileT = open(workDir + self.modelFilename[ii], "w")
+            fileT.write(self.renderTemplate(self.modelTemplate[ii], evaluationT.paramNatural))
+            fileT.close()
+        # end for
 
-                strT = (self.counterFormat.format(self.optimCounter)) + "\t" + dateStrCompact + "\t"
+        return True
 
-                for ii in range(0, self.paramCount):
-                    strT += (self.paramFormat[ii] % self.paramNatural[ii]) + "\t"
-                # end for
+    # end writeInput
 
-                strT += ("%08.5f\t" % math.fabs(fJm)) + ("%08.5f\t" % fVm) + ("%08.5f\t" % fFF) + ("%08.5f\t" % math.fabs(fJsc)) + ("%08.5f\t" % math.fabs(fVoc)) + ("%08.5f" % outputT) + "\n"
-                fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
-                fileOptim.write(strT)
-                fileOptim.close()
+    def runSimulator(self, evaluationT):
+        """ run the simulator in the evaluation working directory """
+
+        workDir = evaluationT.workDir
+
+        # remove the simulator verbose output file before starting optimization
+        pathT = os.path.join(workDir, self.verboseFilename)
+        try:
+            if os.path.isfile(pathT):
+                os.unlink(pathT)
             # end if
+        except:
+            pass
+        # end try
 
-            # in updateOutput, output files are moved
-            self.updateOutput(dateStrCompact)
-        else:
-            # delete output files before the next run
-            self.deleteOutput()
-        # end if bShowOutput
+        # run optimization
+        try:
+            tEnv = dict(os.environ)
+            timeoutT = self.getTimeoutCurrent()
+            if ((self.earlyStop is not None) and (self.extractTemplate is not None)) or (timeoutT is not None):
+                # stopped once Voc crossed, then the outputs extracted from the partial log...
+                # ...or stopped when the timeout expires (the evaluation failed)
+                if self.watchSimulator(evaluationT, tEnv, timeoutT):
+                    self.runExtract(evaluationT, tEnv)
+                # end if
+                if evaluationT.status == "failed":
+                    return False
+                # end if
+            else:
+                subprocess.check_call([workDir + self.commandFilename, ""], shell=True, env=tEnv)
+                evaluationT.exitCode = 0
+            # end if
+        except Exception as excT:
+            # catch only Exception (since sys.exit raise BaseException)
+            evaluationT.exitCode = getattr(excT, "returncode", None)
+            evaluationT.status = "error"
+            evaluationT.error = traceback.format_exc()
+            try:
+                evaluationT.errorOutput = self.printOutput(workDir)
+            except:
+                pass
+            # end try
+            return False
+        # end try
 
-        if self.inJac == False:
-            self.optimCounter += 1
+        simulatorError = self.isErrorOccurred(workDir)
+        if (simulatorError is not None):
+            evaluationT.status = "error"
+            evaluationT.error = simulatorError
+            evaluationT.errorOutput = simulatorError
+            return False
         # end if
 
-        self.funcCounter += 1
+        return True
 
-        if not self.guessParam:
+    # end runSimulator
 
-            if self.paramWeight and self.isBound:
-                # Parameters Weight: decreases near the bounds
-                fa = 0.0
-                fb = 0.0
-                for ii in range(0, self.paramCount):
-                    ft = (paramNormalized[ii] * paramNormalized[ii])
-                    fa += ft
-                    fw = self.getWeight(ii, paramNormalized[ii])
-                    fb += ft * (fw * fw)
-                # end for
-                if (fa > 0.0):
-                    outputT = outputT * (fb / fa)
+    def watchSimulator(self, evaluationT, tEnv, timeoutT = None):
+        """ run the simulator while reading its log (simuloutput_all.log) as it is written (early termination):...
+            ...the simulator is stopped earlyStop points after the current sign change (Voc crossed)...
+            ...or when it runs longer than timeoutT seconds (watchdog: the evaluation failed)...
+            ...returns True if stopped after Voc (the outputs to be extracted from the partial log), False otherwise """
+
+        workDir = evaluationT.workDir
+        pathLog = os.path.join(workDir, self.outputFilename[0])
+        isWatched = (self.earlyStop is not None) and (self.extractTemplate is not None)
+        ticT = time.time()
+
+        # the log of a previous run (serial evaluations in the output directory)
+        try:
+            if os.path.isfile(pathLog):
+                os.unlink(pathLog)
+            # end if
+        except:
+            pass
+        # end try
+
+        # the simulator launched in its own process group, to stop the launcher and the simulator at once
+        if os.name == "nt":
+            processT = subprocess.Popen([workDir + self.commandFilename, ""], shell=True, env=tEnv, creationflags=subprocess.CREATE_NEW_PROCESS_GROUP)
+        else:
+            processT = subprocess.Popen([workDir + self.commandFilename, ""], shell=True, env=tEnv, preexec_fn=os.setsid)
+        # end if
+
+        fileLog = None
+        strPending = ""
+        isNegative = False
+        pointsAfter = -1
+        # the voltage and current positions: given, or found in the log header (no early termination until then)
+        logPositions = self.simulator.getLogColumns(None, self.earlyStopColumns)
+
+        while processT.poll() is None:
+            time.sleep(0.2)
+
+            if (timeoutT is not None) and ((time.time() - ticT) > timeoutT):
+                self.stopSimulator(processT)
+                evaluationT.exitCode = processT.poll()
+                if fileLog is not None:
+                    fileLog.close()
                 # end if
+                evaluationT.status = "failed"
+                evaluationT.isTimeout = True
+                evaluationT.warning.append("Simulator stopped: still running after %.1f seconds (timeout)" % timeoutT)
+                return False
             # end if
 
-            # all methods minimize except the Bayesian method that maximizes
-            if (self.minimizeMethod == "Bayes"):
-                tOutput = outputT
-            else:
-                tOutput = (1.0 - (outputT / 100.0))
+            if not isWatched:
+                continue
             # end if
 
-            if (len(self.lastOutput) >= self.lastParamLimit):
-                self.lastOutput.pop(0)
+            if fileLog is None:
+                try:
+                    fileLog = open(pathLog, "r")
+                except:
+                    continue
+                # end try
             # end if
-            self.lastOutput.append(tOutput)
 
-            return tOutput
+            # only the lines completely written
+            strPending += fileLog.read()
+            listLine = strPending.split("\n")
+            strPending = listLine.pop()
 
-        else:
-            return outputT
-        # end if
+            for lineT in listLine:
+                if logPositions is None:
+                    logPositions = self.simulator.getLogColumns(lineT, self.earlyStopColumns)
+                    continue
+                # end if
+                pointT = self.simulator.getLogPoint(lineT, logPositions)
+                if pointT is None:
+                    continue
+                # end if
+                fV, fJ = pointT
+                if pointsAfter >= 0:
+                    pointsAfter += 1
+                elif fJ < 0.0:
+                    isNegative = True
+                elif isNegative and (fJ > 0.0) and (fV > 0.0):
+                    pointsAfter = 0
+                # end if
+            # end for
 
-    # end optimizeFunc
+            if pointsAfter >= self.earlyStop:
+                break
+            # end if
+        # end while
 
-    @staticmethod
-    def removeOutputFiles(outputDirT):
-        """ delete the output directory content (everything in that directory will be deleted!) """
-        for fileT in os.listdir(outputDirT):
-            pathT = os.path.join(outputDirT, fileT)
-            try:
-                if os.path.isfile(pathT):
-                    os.unlink(pathT)
-                elif os.path.isdir(pathT):
-                    shutil.rmtree(pathT)
-                # end if
-            except:
-                pass
-            # end try
-        # end for
+        if fileLog is not None:
+            fileLog.close()
+        # end if
 
-        return
+        if processT.poll() is not None:
+            evaluationT.exitCode = processT.returncode
+            if processT.returncode != 0:
+                raise subprocess.CalledProcessError(processT.returncode, workDir + self.commandFilename)
+            # end if
+            return False
+        # end if
 
-    # end removeOutputFiles
+        self.stopSimulator(processT)
+        evaluationT.exitCode = processT.poll()
+        evaluationT.isStopped = True
+
+        return True
 
-    def updateOutputFile(self, outputFilenameOld, outputComment, outputFilenameSuffix):
-        """ update/rename the output files"""
+    # end watchSimulator
 
-        outputFilenameNew = ""
+    @staticmethod
+    def stopSimulator(processT):
+        """ stop the simulator process group (terminated, then killed if still running after 5 seconds) """
 
-        # Files in the output directory
         try:
-            pathOld = os.path.join(self.outputDir, outputFilenameOld)
-            if not os.path.isfile(pathOld):
-                return
+            if os.name == "nt":
+                subprocess.call(["taskkill", "/F", "/T", "/PID", str(processT.pid)], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            else:
+                os.killpg(processT.pid, ossignal.SIGTERM)
             # end if
-            fileT = open(self.outputDir + outputFilenameOld, "r")
-            fileT.close()
-            # Exists... change filename and shutil.move it to the outpur dir
-            strT1 = outputFilenameOld.split(".")[0]
-            strT2 = outputFilenameOld.split(".")[1]
-            outputFilenameNew = strT1 + "_" + (self.counterFormat.format(self.optimCounter)) + "_" + outputFilenameSuffix + "." + strT2
-            shutil.move(self.outputDir + outputFilenameOld, self.outputDir + outputFilenameNew)
         except:
-            return
+            pass
         # end try
 
-        try:
-            # Save optimization infos
-            fileHeader = "# " + self.title + "\n# "
-            fileHeader += outputComment + "\n# "
-            for ii in range(0, self.paramCount):
-                fileHeader += self.paramName[ii]
-                if (ii < (self.paramCount - 1)):
-                    fileHeader += "\t"
-                # end if
-            # end for
-            fileHeader += "\n# "
-            for ii in range(0, self.paramCount):
-                fileHeader += (self.paramFormat[ii] % self.paramNatural[ii])
-                if (ii < (self.paramCount - 1)):
-                    fileHeader += "\t"
-                # end if
-            # end for
-            fileHeader += "\n"
+        for ii in range(0, 50):
+            if processT.poll() is not None:
+                return
+            # end if
+            time.sleep(0.1)
+        # end for
 
-            fileT = open(self.outputDir + outputFilenameNew, "r")
-            lll = False
-            fileContent = ""
-            for lineT in fileT:
-                if lll == False:
-                    if lineT.startswith(self.simulator.header):
-                        fileContent = lineT + fileHeader
-                    else:
-                        fileContent = fileHeader + lineT
-                    lll = True
-                    continue
-                # end if
-                fileContent += lineT
-            # end for
-            fileT.close()
-            fileContent += "\n"
-            fileT = open(self.outputDir + outputFilenameNew, "w")
-            fileT.write(fileContent)
-            fileT.close()
-        except Exception as excT:
-            # catch only Exception (since sys.exit raise BaseException)
-            dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        try:
+            if os.name == "nt":
+                processT.kill()
+            else:
+                os.killpg(processT.pid, ossignal.SIGKILL)
+            # end if
+            processT.wait()
+        except:
             pass
         # end try
 
-        return
-
-    # end updateOutputFile
+    # end stopSimulator
 
-    def updateOutput(self, dateStrCompact):
-        """ update the simulator output files """
+    def getTimeoutCurrent(self):
+        """ the simulator timeout for the next evaluation, in seconds (None if no timeout):...
+            ...timeoutFactor times the mean duration of the complete full resolution runs (once known), limited to timeout...
+            ...(the coarse runs would lower the limit below the full resolution run duration) """
 
-        if dateStrCompact is None:
-            dateT = datetime.datetime.now()
-            dateStrCompact = dateT.strftime("%Y%m%d-%H%M%S")
+        timeoutT = self.timeout
+        if (self.timeoutFactor is not None) and (self.timeoutDelayCount >= self.timeoutCount):
+            timeoutX = self.timeoutFactor * float(self.timeoutDelaySum) / float(self.timeoutDelayCount)
+            if (timeoutT is None) or (timeoutX < timeoutT):
+                timeoutT = timeoutX
+            # end if
         # end if
 
-        for ii in range(0, self.outputCount):
-            self.updateOutputFile(self.outputFilename[ii], self.outputComment[ii], dateStrCompact)
-        # end for
+        return timeoutT
 
-        return
+    # end getTimeoutCurrent
 
-    # end updateOutput
+    def runExtract(self, evaluationT, tEnv):
+        """ extract the outputs from the partial log (the extract part of the input file, run by the simulator) """
 
-    def deleteOutput(self):
-        """ delete the simulator output files """
+        workDir = evaluationT.workDir
 
-        for ii in range(0, self.outputCount):
-            pathT = os.path.join(self.outputDir, self.outputFilename[ii])
-            try:
-                if os.path.isfile(pathT):
-                    os.unlink(pathT)
-                # end if
-            except:
-                pass
-            # end try
-        # end for
+        fileT = open(workDir + self.extractFilename, "w")
+        fileT.write(self.renderTemplate(self.extractTemplate, evaluationT.paramNatural))
+        fileT.close()
 
-        return
+        strT = "\n".join(self.simulator.getCommand(self.extractFilename, self.currentDir, workDir, self.verboseFilename))
+        fileT = open(workDir + self.extractCommandFilename, "w")
+        fileT.write(strT)
+        fileT.close()
+        self.chmodExec(workDir + self.extractCommandFilename)
 
-    # end deleteOutput
+        subprocess.check_call([workDir + self.extractCommandFilename, ""], shell=True, env=tEnv)
 
-    def prepare(self):
-        """ prepare the optimization """
+    # end runExtract
 
-        if self.isRunning:
-            return False
-        # end if
+    def getEfficiency(self, evaluationT):
+        """ calculate the efficiency from the simulator output in the evaluation working directory """
 
-        if not self.isChecked():
-            dispError("Simulator path and parameters not up to date",
-                        doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-        # end if
+        workDir = evaluationT.workDir
 
-        if not self.updatePath():
-            dispError("Simulator path cannot be updated", doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-        # end if
+        # Calculate the efficiency (Very important to be precise for the optimization algorithm)
+        LinesToSkip = 4
 
-        self.optimCounter = 1
-        self.funcCounter = 1
-        self.jacCounter = 0
-        self.elapsedTime = 0
-        self.isRunning = True
+        pathJV = os.path.join(workDir, self.outputFilename[self.outputFilenameJVposition])
+        if not os.path.isfile(pathJV):
+            # do not necessarily exit, since the simulator can sometimes diverge for a set of parameters choosen by the optimizer
+            evaluationT.status = "failed"
+            evaluationT.warning.append("cannot evaluate efficiency: J-V file not found: check the simulator output file (%s)" % self.verboseFilename)
+            return False
+        # end if
 
-        self.stopSet()
+        # :REV:1:20181115: J(V) from V = 0 to V = VOC (the photovoltaic part of the I(V) characteristic)
+        pathJVP = os.path.join(workDir, self.outputFilename[self.outputFilenameJVPposition])
 
-        # remove the simulator verbose output file
-        pathT = os.path.join(self.outputDir, self.verboseFilename)
+        ticT = time.time()
         try:
-            if os.path.isfile(pathT):
-                os.unlink(pathT)
-            # end if
+            # the J-V file is read in one pass (voltage in increasing order, up to the third point in direct polarization)
+            jvT = slalomJV.read(pathJV, self.simulator.dataSeparator, LinesToSkip)
         except:
-            pass
+            evaluationT.status = "error"
+            evaluationT.error = "cannot evaluate efficiency: check the simulator output file (%s)" % self.verboseFilename
+            return False
         # end try
 
-        # remove the simulator output files
-        for ii in range(0, self.outputCount):
-            pathT = os.path.join(self.outputDir, self.outputFilename[ii])
-            try:
-                if os.path.isfile(pathT):
+        iPVPoints = jvT.pvPoints
+
+        # :REV:1:20181115: J(V) from V = 0 to V = VOC
+        jvT.writeContent(pathJVP)
+        self.addTiming(evaluationT, "jv", ticT)
+
+        outputT = 0.0
+        outputO = 0.0
+
+        # max current in mA/cm2
+        fJm = 0.0
+
+        # max voltage in Volts
+        fVm = 0.0
+
+        # Fill Factor
+        fFF = 0.0
+
+        # Short-circuit current in mA/cm2
+        fJsc = 0.0
+
+        # Open-circuit voltage in Volts
+        fVoc = 0.0
+
+        doCalc = True
+
+        if (iPVPoints < 12):
+            doCalc = False
+            # do not necessarily exit, since the simulator can sometimes diverge for a set of parameters choosen by the optimizer
+            evaluationT.status = "failed"
+            evaluationT.warning.append("Cannot evaluate efficiency: J-V curve has less than 12 points with V*J < 0")
+            return False
+        # end if
+
+        try:
+            if doCalc == True:
+
+                # the figures of merit (the same calculation used by slalomOffline to re-analyze archived outputs)
+                outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT)
+                if strWarning is not None:
+                    evaluationT.warning.append(strWarning)
+                # end if
+
+                # efficiency as calculated by the simulator
+                if strWarning is None:
+                    pathEE = os.path.join(workDir, self.outputFilename[self.outputFilenameEFFposition])
+                    if not os.path.isfile(pathEE):
+                        evaluationT.warning.append("cannot evaluate efficiency: '%s' file not found" % pathEE)
+                    # end if
+                    outputO = 0.0
+                    try:
+                        fileO = open(workDir + self.outputFilename[self.outputFilenameEFFposition], "r")
+                        lineO = ""
+                        iLT = len("Efficiency=20.123456789123456789123456789")
+                        for lineOT in fileO:
+                            if lineOT.startswith("Efficiency=") and (len(lineOT) <= iLT):
+                                lineO = lineOT
+                            # end if
+                        # end for
+                        fileO.close()
+                        if lineO.startswith("Efficiency=") and (len(lineO) <= iLT):
+                            outputO = float(lineO.split("=")[1].rstrip(" \t\r\n").lstrip(" \t\r\n"))
+                        # end if
+                        os.unlink(workDir + self.outputFilename[self.outputFilenameEFFposition])
+                    except:
+                        outputO = 0.0
+                        pass
+                    # end try
+                # end if
+
+            # end if doCalc
+        except:
+            evaluationT.status = "error"
+            evaluationT.error = traceback.format_exc()
+            return False
+        # end try
+
+        evaluationT.outputT = outputT
+        evaluationT.outputO = outputO
+        evaluationT.fJm = fJm
+        evaluationT.fVm = fVm
+        evaluationT.fFF = fFF
+        evaluationT.fJsc = fJsc
+        evaluationT.fVoc = fVoc
+        evaluationT.status = "done"
+
+        return True
+
+    # end getEfficiency
+
+    def mergeSandbox(self, evaluationT):
+        """ move the remaining simulator files from the evaluation sandbox to the output directory and remove the sandbox """
+
+        if not evaluationT.isSandbox:
+            return
+        # end if
+
+        listInput = [self.inputFilename, self.commandFilename, self.extractFilename, self.extractCommandFilename]
+        if self.modelCount > 0:
+            listInput += self.modelFilename
+        # end if
+
+        try:
+            for fileT in sorted(os.listdir(evaluationT.workDir)):
+                pathT = os.path.join(evaluationT.workDir, fileT)
+                if (fileT in listInput) or (not os.path.isfile(pathT)):
+                    continue
+                # end if
+                pathN = os.path.join(self.outputDir, fileT)
+                if os.path.isfile(pathN):
+                    os.unlink(pathN)
+                # end if
+                shutil.move(pathT, pathN)
+            # end for
+        except:
+            pass
+        # end try
+
+        slalomEngine.removeSandbox(evaluationT.workDir)
+
+    # end mergeSandbox
+
+    def commitEvaluation(self, evaluationT):
+        """ merge the evaluation results: log, optimization output file, output files and counters...
+            ...always called from the main thread, in the evaluations submission order """
+
+        for strT in evaluationT.warning:
+            dispError(strT, doExit = False)
+        # end for
+
+        if evaluationT.isStopped:
+            self.earlyStopCount += 1
+        # end if
+
+        if evaluationT.isTimeout:
+            self.timeoutCounter += 1
+            self.log("\nEvaluation %s failed (simulator timeout): %s\n" % (self.counterFormat.format(evaluationT.optimCounter), self.getParamKey(evaluationT.paramNatural).replace("\t", " ")))
+        # end if
+
+        if (evaluationT.retryCount > 0) and evaluationT.isDone():
+            self.recoveredCount += 1
+        # end if
+
+        if evaluationT.status == "error":
+            if evaluationT.errorOutput is not None:
+                try:
+                    fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+                    fileOptim.write(evaluationT.errorOutput)
+                    fileOptim.close()
+                except:
+                    pass
+                # end try
+            # end if
+            dispError(evaluationT.error, doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+            return 0.0
+        # end if
+
+        if evaluationT.status != "done":
+            ticT = time.time()
+            self.setFailed(evaluationT)
+            self.mergeSandbox(evaluationT)
+            self.setBruteDone(evaluationT)
+            self.addTiming(evaluationT, "merge", ticT)
+            self.setTiming(evaluationT)
+            if evaluationT.isTimeout and (self.failurePolicy == "abort"):
+                # a simulator timeout stops the optimization, as a simulator error
+                dispError("Simulator timeout: " + self.getFailure(evaluationT), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+            # end if
+            # failure policy: the penalty (as efficiency) returned to the optimizer (transformed as any efficiency)
+            return self.getOutput(evaluationT, self.failurePenalty)
+        # end if
+
+        bShowOutput = ((evaluationT.inJac == False) or (self.optimType == "Brute"))
+
+        paramNormalized = evaluationT.paramNormalized
+        self.paramNatural = np.array(evaluationT.paramNatural)
+        self.optimCounter = evaluationT.optimCounter
+
+        outputT = evaluationT.outputT
+        outputO = evaluationT.outputO
+        fJm = evaluationT.fJm
+        fVm = evaluationT.fVm
+        fFF = evaluationT.fFF
+        fJsc = evaluationT.fJsc
+        fVoc = evaluationT.fVoc
+
+        if evaluationT.isCoarse:
+            # multi-fidelity: the maximum is given by the full resolution evaluations only
+            self.coarseList.append((outputT, np.array(paramNormalized)))
+        else:
+            if self.screening is not None:
+                self.screeningData.append((np.array(paramNormalized), outputT))
+            # end if
+            if outputT > self.outputOptimized:
+                self.outputOptimized = outputT
+                self.paramOptim = np.zeros(self.paramCount)
+                for ii in range(0, self.paramCount):
+                    self.paramOptim[ii] = self.paramNatural[ii]
+                # end if
+            # end if
+
+            if math.fabs(fJsc) > self.outputOptimizedx:
+                self.outputOptimizedx = math.fabs(fJsc)
+            # end if
+
+            if math.fabs(fVoc) > self.outputOptimizedy:
+                self.outputOptimizedy = math.fabs(fVoc)
+            # end if
+
+            if fFF > self.outputOptimizedz:
+                self.outputOptimizedz = fFF
+            # end if
+        # end if
+
+        durationT = evaluationT.duration
+        if not evaluationT.isSandbox:
+            # for concurrent evaluations, the elapsed (wall) time is updated for the whole set
+            self.elapsedTime += durationT
+        # end if
+
+        # the cached evaluations are not taken into account in the simulator timing
+        if not evaluationT.isCached:
+            self.delaySum += durationT
+            self.delayCount += 1
+            self.delayMean = float(self.delaySum) / float(self.delayCount)
+
+            if (self.delayMin == 0) or (durationT < self.delayMin):
+                self.delayMin = durationT
+            if (self.delayMax == 0) or (durationT > self.delayMax):
+                self.delayMax = durationT
+
+            if not (evaluationT.isCoarse or evaluationT.isStopped or evaluationT.isTimeout):
+                self.timeoutDelaySum += durationT
+                self.timeoutDelayCount += 1
+            # end if
+        # end if
+
+        ticT = time.time()
+        self.setCached(evaluationT)
+        ticT = self.addTiming(evaluationT, "store", ticT)
+
+        try:
+            # Timing information
+            pathDelay = os.path.join(self.outputDir, self.delayFilename)
+            fileT = open(pathDelay, "w")
+            fileT.write("DelayMin = %.1f" % self.delayMin)
+            fileT.write("\nDelayMax = %.1f" % self.delayMax)
+            fileT.write("\nDelayMean = %.1f" % self.delayMean)
+            fileT.close()
+        except:
+            pass
+
+        strT = ""
+
+        if (bShowOutput == True):
+            if evaluationT.guessParam:
+                strT = "\n---------------------- GUESS " + (self.counterFormat.format(self.optimCounter)) + " DONE --------------------------\n"
+            else:
+                strT = "\n------------------- OPTIMIZATION " + (self.counterFormat.format(self.optimCounter)) + " DONE ----------------------\n"
+            # end if
+
+            strT += self.title + ": Optimization (" + self.optimType
+            if self.optimType == "Optim":
+                strT += " " + self.minimizeMethod
+            # end if
+
+            strT += ") "
+            dateT = datetime.datetime.now()
+            dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
+            strT += (dateStr + "\n")
+
+            strT += "Parameter:\t"
+            for ii in range(0, self.paramCount - 1):
+                strT += self.paramName[ii] + "\t"
+            # end for
+            strT += self.paramName[self.paramCount - 1] + "\n"
+
+            strT += "Natural:\t"
+            strT += self.getParamKey(self.paramNatural) + "\n"
+
+            strT += "Normalized:\t"
+            for ii in range(0, self.paramCount - 1):
+                strT += (self.paramFormatNormalized[ii] % paramNormalized[ii]) + "\t"
+            # end for
+            strT += (self.paramFormatNormalized[self.paramCount - 1] % paramNormalized[self.paramCount - 1])
+
+            strT += "\nPRESENT Efficiency: " + ("%g %%" % outputT) + " (Simulator: " + ("%g %%" % outputO) + ")"
+            if evaluationT.isCoarse:
+                strT += (" [coarse evaluation, fidelity %g]" % self.fidelity)
+            # end if
+            strT += "\nPRESENT " + ("FF = %08.5f %%" % fFF) + (" ; Jsc = %08.5f mA/cm2" % math.fabs(fJsc)) + (" ; Voc = %08.5f V" % math.fabs(fVoc))
+            if evaluationT.isCoarse:
+                strT += "\nMAXIMUM Efficiency (coarse): %g %%" % max([itemT[0] for itemT in self.coarseList])
+            else:
+                strT += "\nMAXIMUM Efficiency: %g %%" % self.outputOptimized
+            # end if
+            strT += "\nThis run duration: " + self.printTime(float(durationT)) + " (mean: " + self.printTime(self.delayMean) + ")"
+            strT += "\nElapsed time: " + self.printTime(float(self.elapsedTime))
+            strT += "\nNumber of function evaluations: %d" % self.funcCounter
+            if self.bruteSimul:
+                if self.funcCounter < (self.paramCountTotal - 1):
+                    remainingT = float(max(0, self.paramCountTotal - self.funcCounter - self.screenedCount)) * self.delayMean / float(self.workerCount)
+                    strT += "\nEstimated remaining time: " + self.printTime(remainingT)
+                # end if
+            # end if
+            strT += "\n---------------------------------------------------------------\n"
+
+            self.log(strT)
+
+            dateStrCompact = None
+
+            if not evaluationT.guessParam:
+                dateT = datetime.datetime.now()
+                dateStrCompact = dateT.strftime("%Y%m%d-%H%M%S")
+
+                strT = (self.counterFormat.format(self.optimCounter)) + "\t" + dateStrCompact + "\t"
+
+                for ii in range(0, self.paramCount):
+                    strT += (self.paramFormat[ii] % self.paramNatural[ii]) + "\t"
+                # end for
+
+                strT += ("%08.5f\t" % math.fabs(fJm)) + ("%08.5f\t" % fVm) + ("%08.5f\t" % fFF) + ("%08.5f\t" % math.fabs(fJsc)) + ("%08.5f\t" % math.fabs(fVoc)) + ("%08.5f" % outputT) + "\n"
+                if evaluationT.isCoarse:
+                    if not os.path.isfile(self.outputDir + self.coarseFilename):
+                        strT = ("# Coarse evaluations (fidelity %g)\n" % self.fidelity) + "Index\tTime\t" + "".join([(nameT + "\t") for nameT in self.paramName]) + "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n" + strT
+                    # end if
+                    fileOptim = open(self.outputDir + self.coarseFilename, "a")
+                else:
+                    fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+                # end if
+                if evaluationT.isCoarse or self.resultsText:
+                    fileOptim.write(strT)
+                # end if
+                fileOptim.close()
+
+                if (self.store is not None) and (not evaluationT.isCoarse):
+                    try:
+                        self.store.append(self.optimCounter, dateStrCompact, self.paramNatural, [math.fabs(fJm), fVm, fFF, math.fabs(fJsc), math.fabs(fVoc), outputT])
+                    except:
+                        dispError("cannot write the results store: store disabled", doExit = False)
+                        self.store = None
+                    # end try
+                # end if
+            # end if
+
+            ticT = self.addTiming(evaluationT, "log", ticT)
+
+            if evaluationT.isCoarse:
+                # the coarse evaluations output files are not kept
+                self.deleteOutput(evaluationT.workDir)
+            else:
+                # in updateOutput, output files are moved (only the J-V characteristic, full and photovoltaic part, is kept in the cache)
+                self.updateOutput(dateStrCompact, evaluationT.workDir, [self.outputFilenameJVPposition, self.outputFilenameJVposition] if evaluationT.isCached else None)
+            # end if
+        else:
+            # delete output files before the next run
+            self.deleteOutput(evaluationT.workDir)
+        # end if bShowOutput
+        ticT = self.addTiming(evaluationT, "output", ticT)
+
+        self.mergeSandbox(evaluationT)
+        self.setBruteDone(evaluationT)
+        ticT = self.addTiming(evaluationT, "merge", ticT)
+
+        if evaluationT.inJac == False:
+            self.optimCounter += 1
+        # end if
+
+        self.funcCounter += 1
+
+        self.setMemo(evaluationT.paramNatural, outputT, evaluationT.isCoarse)
+        self.setCheckpoint(evaluationT)
+        self.addTiming(evaluationT, "store", ticT)
+        self.setTiming(evaluationT)
+
+        return self.getOutput(evaluationT, outputT)
+
+    # end commitEvaluation
+
+    def getOutput(self, evaluationT, outputT):
+        """ get the optimizer function value from the evaluation efficiency (weight and minimization transform) """
+
+        paramNormalized = evaluationT.paramNormalized
+
+        if not evaluationT.guessParam:
+
+            if self.paramWeight and self.isBound:
+                # Parameters Weight: decreases near the bounds
+                fa = 0.0
+                fb = 0.0
+                for ii in range(0, self.paramCount):
+                    ft = (paramNormalized[ii] * paramNormalized[ii])
+                    fa += ft
+                    fw = self.getWeight(ii, paramNormalized[ii])
+                    fb += ft * (fw * fw)
+                # end for
+                if (fa > 0.0):
+                    outputT = outputT * (fb / fa)
+                # end if
+            # end if
+
+            # all methods minimize except the Bayesian method that maximizes
+            if (self.minimizeMethod == "Bayes"):
+                tOutput = outputT
+            else:
+                tOutput = (1.0 - (outputT / 100.0))
+            # end if
+
+            return tOutput
+
+        else:
+            return outputT
+        # end if
+
+    # end getOutput
+
+    def getMemoKey(self, paramNatural, isCoarse = False):
+        """ the memoization key: the parameters values at the output precision (and the fidelity for the coarse evaluations) """
+        keyT = tuple([float(self.paramFormat[ii] % paramNatural[ii]) for ii in range(0, self.paramCount)])
+        return (keyT + (self.fidelity,)) if isCoarse else keyT
+    # end getMemoKey
+
+    def getMemo(self, paramNatural, isCoarse = False):
+        """ get the efficiency already evaluated for these parameters (None if not evaluated) """
+
+        keyT = self.getMemoKey(paramNatural, isCoarse)
+        outputT = self.memo.pop(keyT, None)
+        if outputT is None:
+            self.memoMiss += 1
+            return None
+        # end if
+
+        # reinserted as the most recently used
+        self.memo[keyT] = outputT
+        self.memoHit += 1
+        return outputT
+
+    # end getMemo
+
+    def setMemo(self, paramNatural, outputT, isCoarse = False):
+        """ save the efficiency evaluated for these parameters """
+
+        keyT = self.getMemoKey(paramNatural, isCoarse)
+        self.memo.pop(keyT, None)
+        self.memo[keyT] = outputT
+        while len(self.memo) > self.memoSize:
+            # remove the least recently used
+            self.memo.popitem(last = False)
+        # end while
+
+    # end setMemo
+
+    def setMemoSize(self, memoSize = 4096):
+        """ set the maximum number of entries in the memoization table """
+
+        if memoSize >= 1:
+            self.memoSize = int(memoSize)
+        # end if
+        while len(self.memo) > self.memoSize:
+            self.memo.popitem(last = False)
+        # end while
+
+    # end setMemoSize
+
+    @staticmethod
+    def removeOutputFiles(outputDirT):
+        """ delete the output directory content (everything in that directory will be deleted!) """
+        for fileT in os.listdir(outputDirT):
+            pathT = os.path.join(outputDirT, fileT)
+            try:
+                if os.path.isfile(pathT):
+                    os.unlink(pathT)
+                elif os.path.isdir(pathT):
+                    shutil.rmtree(pathT)
+                # end if
+            except:
+                pass
+            # end try
+        # end for
+
+        return
+
+    # end removeOutputFiles
+
+    def updateOutputFile(self, outputFilenameOld, outputComment, outputFilenameSuffix, workDir = None, outputHeader = True):
+        """ update/rename the output files (the header written only if outputHeader)...
+            ...returns the new filename (None if not found) """
+
+        if workDir is None:
+            workDir = self.outputDir
+        # end if
+
+        outputFilenameNew = ""
+
+        # Files in the output (or sandbox) directory
+        try:
+            pathOld = os.path.join(workDir, outputFilenameOld)
+            if not os.path.isfile(pathOld):
+                return None
+            # end if
+            fileT = open(workDir + outputFilenameOld, "r")
+            fileT.close()
+            # Exists... change filename and shutil.move it to the outpur dir
+            strT1 = outputFilenameOld.split(".")[0]
+            strT2 = outputFilenameOld.split(".")[1]
+            outputFilenameNew = strT1 + "_" + (self.counterFormat.format(self.optimCounter)) + "_" + outputFilenameSuffix + "." + strT2
+            shutil.move(workDir + outputFilenameOld, self.outputDir + outputFilenameNew)
+        except:
+            return None
+        # end try
+
+        if not outputHeader:
+            return outputFilenameNew
+        # end if
+
+        try:
+            # Save optimization infos
+            fileHeader = "# " + self.title + "\n# "
+            fileHeader += outputComment + "\n# "
+            for ii in range(0, self.paramCount):
+                fileHeader += self.paramName[ii]
+                if (ii < (self.paramCount - 1)):
+                    fileHeader += "\t"
+                # end if
+            # end for
+            fileHeader += "\n# "
+            for ii in range(0, self.paramCount):
+                fileHeader += (self.paramFormat[ii] % self.paramNatural[ii])
+                if (ii < (self.paramCount - 1)):
+                    fileHeader += "\t"
+                # end if
+            # end for
+            fileHeader += "\n"
+
+            fileT = open(self.outputDir + outputFilenameNew, "r")
+            lll = False
+            fileContent = ""
+            for lineT in fileT:
+                if lll == False:
+                    if lineT.startswith(self.simulator.header):
+                        fileContent = lineT + fileHeader
+                    else:
+                        fileContent = fileHeader + lineT
+                    lll = True
+                    continue
+                # end if
+                fileContent += lineT
+            # end for
+            fileT.close()
+            fileContent += "\n"
+            fileT = open(self.outputDir + outputFilenameNew, "w")
+            fileT.write(fileContent)
+            fileT.close()
+        except Exception as excT:
+            # catch only Exception (since sys.exit raise BaseException)
+            dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+            pass
+        # end try
+
+        return outputFilenameNew
+
+    # end updateOutputFile
+
+    def updateOutput(self, dateStrCompact, workDir = None, listPosition = None):
+        """ update the simulator output files (all, or only those at listPosition) """
+
+        if dateStrCompact is None:
+            dateT = datetime.datetime.now()
+            dateStrCompact = dateT.strftime("%Y%m%d-%H%M%S")
+        # end if
+
+        outputHeader = (self.outputArchive == "header")
+        dictComment = collections.OrderedDict()
+
+        for ii in (range(0, self.outputCount) if (listPosition is None) else listPosition):
+            outputFilenameNew = self.updateOutputFile(self.outputFilename[ii], self.outputComment[ii], dateStrCompact, workDir, outputHeader)
+            if outputFilenameNew is not None:
+                dictComment[outputFilenameNew] = self.outputComment[ii]
+            # end if
+        # end for
+
+        strManifest = None
+        if (not outputHeader) and (len(dictComment) > 0):
+            # the headers of the files renamed, in one manifest record
+            try:
+                strManifest = slalomStore.appendManifest(self.outputDir, self.optimCounter, dateStrCompact, self.title, self.paramName,
+                    [(self.paramFormat[ii] % self.paramNatural[ii]) for ii in range(0, self.paramCount)], self.simulator.header, dictComment)
+            except:
+                dispError("cannot write the output files manifest (%s)" % slalomStore.manifestFilename, doExit = False)
+            # end try
+        # end if
+
+        if self.archive is not None:
+            # archived on the background thread
+            self.archive.add(list(dictComment.keys()), strManifest)
+        # end if
+
+        return
+
+    # end updateOutput
+
+    def deleteOutput(self, workDir = None):
+        """ delete the simulator output files """
+
+        if workDir is None:
+            workDir = self.outputDir
+        # end if
+
+        for ii in range(0, self.outputCount):
+            pathT = os.path.join(workDir, self.outputFilename[ii])
+            try:
+                if os.path.isfile(pathT):
+                    os.unlink(pathT)
+                # end if
+            except:
+                pass
+            # end try
+        # end for
+
+        return
+
+    # end deleteOutput
+
+    def prepare(self):
+        """ prepare the optimization """
+
+        if self.isRunning:
+            return False
+        # end if
+
+        if not self.isChecked():
+            dispError("Simulator path and parameters not up to date",
+                        doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        # end if
+
+        if not self.updatePath():
+            dispError("Simulator path cannot be updated", doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        # end if
+
+        self.optimCounter = 1
+        self.funcCounter = 1
+        self.jacCounter = 0
+        self.elapsedTime = 0
+        self.delaySum = 0
+        self.delayCount = 0
+        self.timeoutDelaySum = 0
+        self.timeoutDelayCount = 0
+        self.sandboxCounter = 0
+        self.earlyStopCount = 0
+        self.timeoutCounter = 0
+        self.failedCount = 0
+        self.recoveredCount = 0
+        self.isRunning = True
+
+        if self.engine is not None:
+            self.engine.stop()
+        # end if
+        self.engine = slalomEngine(self.workerCount)
+
+        self.memo.clear()
+        self.memoHit = 0
+        self.memoMiss = 0
+        self.prepareTemplate()
+        self.prepareCache()
+        self.prepareCheckpoint()
+        self.prepareStore()
+        self.prepareArchive()
+
+        self.stopSet()
+
+        if self.isResumed:
+            # the previous optimization output is kept
+            pathStopped = os.path.join(self.outputDir, self.stoppedFilename)
+            try:
+                if os.path.isfile(pathStopped):
+                    os.unlink(pathStopped)
+                # end if
+            except:
+                pass
+            # end try
+            self.stoppedDone = False
+        # end if
+
+        # remove the simulator verbose output file
+        pathT = os.path.join(self.outputDir, self.verboseFilename)
+        try:
+            if os.path.isfile(pathT):
+                os.unlink(pathT)
+            # end if
+        except:
+            pass
+        # end try
+
+        # remove the simulator output files
+        for ii in range(0, self.outputCount):
+            pathT = os.path.join(self.outputDir, self.outputFilename[ii])
+            try:
+                if os.path.isfile(pathT):
                     os.unlink(pathT)
                 # end if
             except:
@@ -1683,503 +2756,1572 @@ class slalomCore(object):
             # end try
         # end for
 
-        self.optimCounter = 1
-        self.funcCounter = 1
-        self.elapsedTime = 0
-        dateT = datetime.datetime.now()
-        dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
+        self.optimCounter = 1
+        self.funcCounter = 1
+        self.elapsedTime = 0
+        dateT = datetime.datetime.now()
+        dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
+
+        if self.isResumed:
+            strT = "# ---------------------------------------------------------------\n"
+            strT += "# " + self.title + "\n# Optimization (" + self.optimType
+            if self.optimType == "Optim":
+                strT += " " + self.minimizeMethod
+            # end if
+            strT += ") resumed @ " + dateStr
+            strT += "\n# ---------------------------------------------------------------\n"
+            self.log(strT)
+            fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+            fileOptim.write(strT)
+            fileOptim.close()
+            return True
+        # end if
+
+        strT = "# ---------------------------------------------------------------\n"
+        strT += "# " + self.title + "\n# Optimization (" + self.optimType
+        if self.optimType == "Optim":
+            strT += " " + self.minimizeMethod
+        # end if
+        strT += ") started @ "
+        strT += dateStr
+        if self.optimType == "Optim":
+            strT += ("\n# With tolerance = %g" % self.tolerance)
+            if (self.minimizeMethod != "Bayes"):
+                strT += (" and jaceps = [ %.5f" % self.jaceps[0])
+                if self.paramCount > 1:
+                    strT += ("  %.5f" % self.jaceps[1])
+                # end if
+                if self.paramCount > 2:
+                    strT += ("  %.5f" % self.jaceps[2])
+                # end if
+                if self.paramCount > 3:
+                    strT += ("  %.5f" % self.jaceps[3])
+                # end if
+                if self.paramCount > 4:
+                    strT += ("  %.5f" % self.jaceps[4])
+                # end if
+                if self.paramCount > 5:
+                    strT += " ..."
+                # end if
+                strT += " ]"
+            # end if
+            if self.paramWeight and self.isBound:
+                strT += " Weighted"
+            # end if
+        # end if
+        strT += "\n# Parameter:\t"
+        for ii in range(0, self.paramCount - 1):
+            strT += self.paramName[ii] + "\t"
+        # end for
+        strT += self.paramName[self.paramCount - 1] + "\n"
+        strT += "# StartValue:\t"
+        for ii in range(0, self.paramCount - 1):
+            strT += (self.paramFormat[ii] % self.paramStart[ii]) + "\t"
+        # end for
+        strT += (self.paramFormat[self.paramCount - 1] % self.paramStart[self.paramCount - 1]) + "\n"
+        strT += "# EndValue:  \t"
+        for ii in range(0, self.paramCount - 1):
+            strT += (self.paramFormat[ii] % self.paramEnd[ii]) + "\t"
+        # end for
+        strT += (self.paramFormat[self.paramCount - 1] % self.paramEnd[self.paramCount - 1]) + "\n"
+        strT += "# InitValue: \t"
+        for ii in range(0, self.paramCount - 1):
+            strT += (self.paramFormat[ii] % self.paramInit[ii]) + "\t"
+        # end for
+        strT += (self.paramFormat[self.paramCount - 1] % self.paramInit[self.paramCount - 1]) + "\n"
+        strT += "# NormValue: \t"
+        for ii in range(0, self.paramCount - 1):
+            strT += (self.paramFormat[ii] % self.paramNorm[ii]) + "\t"
+        # end for
+        strT += (self.paramFormat[self.paramCount - 1] % self.paramNorm[self.paramCount - 1])
+        if self.optimType == "Brute":
+            strT += "\n# Points:   \t"
+            for ii in range(0, self.paramCount - 1):
+                strT += ("%9s" % self.paramPoints[ii]) + "\t"
+            # end for
+            strT += ("%9s" % self.paramPoints[self.paramCount - 1])
+            if self.bruteSampling != "grid":
+                strT += ("\n# Sampling:  \t%s (%d points)" % (self.bruteSampling, self.bruteBudget))
+            # end if
+        # end if
+        if (not self.resultsText) and (self.store is not None):
+            strT += ("\n# Results:   \t%s (rows not written here, export with slalomStore.py --export)" % slalomStore.storeFilename)
+        # end if
+        strT += "\n# ---------------------------------------------------------------\n\n"
+        self.log(strT)
+
+        fileOptim = open(self.outputDir + self.outputOptimizedFilename, "w")
+        fileOptim.write(strT)
+        fileOptim.close()
+
+        return True
+
+    # end prepare
+
+    def start(self, optimType):
+        """ start the optimization """
+
+        if optimType == "Snap":
+            self.startSnapshot()
+        elif optimType == "Brute":
+            self.startBrute()
+        elif optimType == "Optim":
+            self.startOptim()
+        else:
+            dispError("Specify the optimType to \"Brute\", \"Snap\" or \"Optim\"", doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        #end if
+
+    # end start
+
+    def startOptim(self):
+        """ start the optimization """
+
+        self.optimType = "Optim"
+
+        self.setCounterFormat(maxcount = 2 * self.optimPoints)
+
+        tStart = 0.0
+        tEnd = 0.0
+        tRangeMin = 0.0
+        tEps = 5.0 * self.tolerance
+
+        self.jaceps = np.zeros(self.paramCount)
+
+        self.paramBounds = list() if self.isBound else None
+
+        if self.paramWeight and self.isBound:
+            # Tukey Window (Parameters Weight: decreases near the bounds)
+            # If optimum is near the bounds, disable this feature or enlarge domain
+            nn = self.weightPoints
+            aa = self.weightAlpha
+            wn = np.arange(0, nn)
+            wm = nn % 2
+            ww = int(np.floor(aa * (float(nn - 1)) / 2.0))
+            wn1 = wn[0 : ww + 1]
+            wn2 = wn[ww + 1 : nn - ww - 1]
+            wn3 = wn[nn - ww - 1 :]
+            ww1 = 0.5 * (1.0 + np.cos(np.pi * (-1.0 + (2.0 * wn1 / aa / (nn - 1)))))
+            ww2 = np.ones(wn2.shape)
+            ww3 = 0.5 * (1.0 + np.cos(np.pi * ((-2.0 / aa) + 1.0 + (2.0 * wn3 / aa / (nn - 1)))))
+            self.weightFunc = np.concatenate((ww1, ww2, ww3))
+
+            # Save the weight window
+            try:
+                icw = len(self.weightFunc)
+                if (icw >= 7):
+                    fileT = open(self.outputDir + self.weightFilename, "w")
+                    strT = "# " + self.title + "\n"
+                    strT += "# Tukey Window (Parameters Weight)\n"
+                    for ii in range(0, icw):
+                        strT += ("\n%d\t%g" % (ii, self.weightFunc[ii]))
+                    # end for
+                    fileT.write(strT)
+                    fileT.close()
+                # end if
+            except:
+                pass
+            # end try
+
+        else:
+            self.weightFunc = None
+        # end if
+
+        strT = "Index\tTime\t"
+
+        for ii in range(0, self.paramCount):
+            if self.paramLogscale[ii]:
+                tStart = math.log10(self.paramStart[ii]) / math.log10(self.paramNorm[ii])
+                tEnd = math.log10(self.paramEnd[ii]) / math.log10(self.paramNorm[ii])
+            else:
+                tStart = self.paramStart[ii] / self.paramNorm[ii]
+                tEnd = self.paramEnd[ii] / self.paramNorm[ii]
+            # end if
+            if (ii == 0) or ((tEnd - tStart) < tRangeMin):
+                tRangeMin = tEnd - tStart
+            # end if
+
+            self.jaceps[ii] = (tEnd - tStart) / float(self.optimPoints - 1)
+
+            # tolerance should be kept less than eps
+            if self.jaceps[ii] <= self.tolerance:
+                self.tolerance = 0.2 * self.jaceps[ii]
+            # end if
+
+            if self.isBound:
+                self.paramBounds.append((tStart, tEnd))
+            # end if
+            strT += self.paramName[ii] + "\t"
+        # end for
+
+        if tRangeMin < 1e-9:
+            return False
+        # end if
+
+        tEps = tRangeMin / float(self.optimPoints - 1)
+
+        # tolerance should be kept less than eps
+        if tEps <= self.tolerance:
+            self.tolerance = 0.2 * tEps
+        # end if
+
+        if not self.prepare():
+            return False
+        # end if
+
+        if not self.isResumed:
+            strT += "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n"
+            fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+            fileOptim.write(strT)
+            fileOptim.close()
+        # end if
+
+        self.optimCounter = 1
+        self.funcCounter = 1
+        self.jacCounter = 0
+        self.guessParam = False
+        self.bruteSimul = False
+
+        # resumed: the evaluations done are replayed from the checkpoint, the counters and maximum restored
+        self.loadCheckpoint()
+
+        outX = None
+        outSuccess = None
+        outMessage = None
+        outNit = None
+        outFun = None
+        outNFev = None
+        outNJev = None
+        outNHev = None
+        outNLFev = None
+        outXl = None
+        outFunl = None
+
+        # Choose the initial values
+        paramNormalized0 = self.guess()
+
+        if self.isBound:
+            try:
+                self.isBound = True
+                if (self.minimizeMethod == "Bayes"):
+                    BayesianBbounds = {}
+                    for ii in range(0, self.paramCount):
+                        BayesianBbounds[self.paramName[ii]] = self.paramBounds[ii]
+                    # end for
+                    # with more than one worker, a batch of points (one per worker) is suggested for each GP fit...
+                    # ...and evaluated concurrently (maxIter is the total number of suggested points)
+                    # with bayesAsync set, a new point is suggested as soon as a worker is free, the pending ones being fantasised
+                    BayesianOptimizer = BayesianOptimization(
+                        f=self.optimizeFuncBayesian,
+                        pbounds=BayesianBbounds,
+                        random_state=self.randomSeed,
+                        verbose=0,
+                        f_batch=self.optimizeBatchBayesian if (self.workerCount > 1) else None
+                    )
+                    # multi-fidelity: the Bayesian optimization done with coarse evaluations, the best ones then promoted
+                    self.isCoarse = (self.fidelity is not None) and (self.coarseTemplate is not None)
+                    if (self.fidelity is not None) and (self.coarseTemplate is None):
+                        self.log("\nMulti-fidelity disabled: the input file has no resolution variable (%s)\n" % ", ".join([itemT[0] for itemT in self.simulator.coarse]))
+                    # end if
+                    # warm start: the points of previous optimizations registered (and memoized) before the first fit...
+                    # ...the random initialization skipped
+                    # multi-fidelity: these full resolution points are not registered in the coarse target space...
+                    # ...(the two fidelities not mixed in the same Gaussian process) but promotion candidates, see promoteCoarse
+                    self.warmStartCount = 0
+                    for paramNormalized, paramNatural, outputT in self.loadWarmStart():
+                        if self.isCoarse:
+                            self.fineList.append((outputT, np.array(paramNormalized)))
+                            self.setMemo(paramNatural, outputT)
+                            self.warmStartCount += 1
+                            continue
+                        # end if
+                        paramNormalizedBayesian = {}
+                        for ii in range(0, self.paramCount):
+                            paramNormalizedBayesian[self.paramName[ii]] = paramNormalized[ii]
+                        # end for
+                        try:
+                            BayesianOptimizer.register(params=paramNormalizedBayesian, target=self.getOutput(slalomEvaluation(paramNormalized, paramNatural), outputT))
+                        except KeyError:
+                            # point already registered
+                            continue
+                        # end try
+                        self.setMemo(paramNatural, outputT)
+                        self.warmStartCount += 1
+                    # end for
+                    initPoints = 0 if ((self.warmStartCount > 0) and (not self.isCoarse)) else (self.paramCount if (self.paramCount <= 5) else 5)
+                    if (self.workerCount > 1) and self.bayesAsync:
+                        self.asyncCounter = 0
+                        self.asyncPending = dict()
+                        self.asyncWaiting = dict()
+                        BayesianOptimizer.maximize_async(
+                            f_submit=self.submitBayesian,
+                            f_collect=self.collectBayesian,
+                            workers=self.workerCount,
+                            init_points=initPoints,
+                            n_iter=self.maxIter
+                        )
+                    else:
+                        BayesianOptimizer.maximize(
+                            init_points=initPoints,
+                            n_iter=self.maxIter,
+                            batch_size=self.workerCount
+                        )
+                    # end if
+                    if self.isCoarse:
+                        # the optimum given at full resolution
+                        outX, outFun = self.promoteCoarse()
+                    else:
+                        outFun = BayesianOptimizer.max['target']
+                        params = BayesianOptimizer.max['params']
+                        outX = np.array([])
+                        for ii in range(0, len(params)):
+                            outX = np.append(outX, params[self.paramName[ii]])
+                        # end for
+                    # end if
+                    outSuccess = True
+                    outMessage = 'Done.'
+                    outNit = self.maxIter
+                else:
+                    outResult = optimize.minimize(self.optimizeFunc, paramNormalized0, method=self.minimizeMethod, jac=self.getOptimizeJac(self.optimizeFunc), bounds=self.paramBounds, tol=self.tolerance, options={ 'eps': tEps, 'maxiter': self.maxIter, 'disp': False, 'ftol': self.tolerance })
+                # end if
+                try:
+                    if (self.minimizeMethod != "Bayes"):
+                        outX = outResult.x
+                        outSuccess = outResult.success
+                        outMessage = outResult.message
+                        outNit = outResult.nit
+                        outFun = outResult.fun
+                        outNFev = outResult.nfev
+                        outNJev = outResult.njev
+                        outNHev = outResult.nhev
+                        outNLFev = outResult.nlfev
+                        outXl = outResult.xl
+                        outFunl = outResult.funl
+                    # end if
+                except:
+                    pass
+                # end try
+            except Exception as excT:
+                # catch only Exception (since sys.exit raise BaseException)
+                if self.stoppedDone is False:
+                    dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+                # end if
+            # end try
+        else:
+            # not bound methods
+            try:
+                outResult = optimize.minimize(self.optimizeFunc, paramNormalized0, method=self.minimizeMethod, jac=False, tol=self.tolerance, options={ 'maxiter': self.maxIter, 'disp': False })
+                outX = outResult.x
+                outSuccess = outResult.success
+                outMessage = outResult.message
+                outNit = outResult.nit
+            except Exception as excT:
+                # catch only Exception (since sys.exit raise BaseException)
+                dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+            # end try
+        # end if
+
+        self.finish(errorOccured=False, userStopped=False, x=outX, success=outSuccess, message=outMessage, nit=outNit, nlfev=outNLFev, xl=outXl, funl=outFunl)
+
+        return True
+
+    # end startOptim
+
+    def promoteCoarse(self):
+        """ multi-fidelity: evaluate at full resolution the best fidelityPromote fraction of the coarse evaluations...
+            ...single-stage promotion: the promoted points are evaluated once at full resolution, with the full resolution...
+            ...points already known (warm start, checkpoint: not evaluated again), and the best of them given...
+            ...(no intermediate fidelity, no full resolution Gaussian process fitted)...
+            ...returns the normalized parameters of the best one and its optimizer value (None and outputOptimized if none) """
+
+        self.isCoarse = False
+
+        listCoarse = sorted(self.coarseList, key = lambda itemT: itemT[0], reverse = True)
+        promotedCount = max(1, int(math.ceil(self.fidelityPromote * float(len(listCoarse)))))
+
+        listParamNormalized = list()
+        listKey = set()
+        for outputT, paramNormalized in listCoarse:
+            keyT = self.getMemoKey(self.getNatural(paramNormalized))
+            if keyT in listKey:
+                continue
+            # end if
+            listKey.add(keyT)
+            listParamNormalized.append(paramNormalized)
+            if len(listParamNormalized) >= promotedCount:
+                break
+            # end if
+        # end for
+
+        self.promotedCount = len(listParamNormalized)
+        self.log("\nMulti-fidelity: %d of %d coarse evaluations promoted to full resolution\n" % (self.promotedCount, len(listCoarse)))
+
+        # the full resolution points already known compared with the promoted ones (memoized: not evaluated again)
+        for outputT, paramNormalized in self.fineList:
+            keyT = self.getMemoKey(self.getNatural(paramNormalized))
+            if keyT in listKey:
+                continue
+            # end if
+            listKey.add(keyT)
+            listParamNormalized.append(paramNormalized)
+        # end for
+
+        if len(listParamNormalized) < 1:
+            return None, self.outputOptimized
+        # end if
+
+        listOutput = self.optimizeBatch(listParamNormalized)
+        iBest = int(np.argmax(listOutput))
+
+        return listParamNormalized[iBest], listOutput[iBest]
+
+    # end promoteCoarse
+
+    def startSnapshot(self):
+        """ start the optimization (Snap: one calculation for the initial parameters set) """
+
+        self.optimType = "Snap"
+
+        self.setCounterFormat(maxcount = 2)
+
+        if not self.prepare():
+            return False
+        # end if
+
+        strT = "Index\tTime\t"
+        for ii in range(0, self.paramCount):
+            strT += self.paramName[ii] + "\t"
+        # end for
+
+        strT += "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n"
+        fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+        fileOptim.write(strT)
+        fileOptim.close()
+
+        self.optimCounter = 1
+        self.funcCounter = 1
+        self.jacCounter = 0
+        self.guessParam = False
+        self.bruteSimul = True
+
+        # resumed: the counters and maximum restored from the checkpoint
+        self.loadCheckpoint()
+
+        paramNormalized = np.zeros(self.paramCount)
+
+        for ii in range(0, self.paramCount):
+            self.paramNatural[ii] = self.paramInit[ii]
+            if self.paramLogscale[ii]:
+                paramNormalized[ii] = math.log10(self.paramNatural[ii]) / math.log10(self.paramNorm[ii])
+            else:
+                paramNormalized[ii] = self.paramNatural[ii] / self.paramNorm[ii]
+            # end if
+        # end for
+
+        # Run the optimization
+        self.optimizeFunc(paramNormalized)
+
+        self.finish(errorOccured=False, userStopped=False)
+
+    # end startSnapshot
+
+    # create the grid for the brute force iterations: lazily indexed (see slalomGrid)
+    def getGrid(self, arrParams):
+        tGrid = slalomGrid(arrParams)
+        iCount = 10 * tGrid.count * len(arrParams)
+        if iCount < 10:
+            iCount = 10
+        # end if
+        self.setCounterFormat(iCount)
+        return tGrid
+    # end getGrid
+
+    def getSampling(self, arrBounds):
+        """ the Brute points sampled (Sobol or Latin hypercube) in the normalized ranges (arrays of 2 values: start and end)...
+            ...the fixed parameters (one value) kept. The random generator is seeded with randomSeed (same points when resuming) """
+
+        na = len(arrBounds)
+        listVary = [ii for ii in range(0, na) if (len(arrBounds[ii]) > 1)]
+        ns = self.bruteBudget if (len(listVary) > 0) else 1
+        nv = max(1, len(listVary))
+
+        if self.bruteSampling == "sobol":
+            if qmc is None:
+                dispError("Sobol sampling requires scipy version 1.7 or later", doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+            # end if
+            sobolT = qmc.Sobol(d=nv, scramble=True, seed=self.randomSeed)
+            with warnings.catch_warnings():
+                # the Sobol sequence balance properties are kept for a power of 2 number of points
+                warnings.simplefilter("ignore")
+                arrU = sobolT.random(ns)
+            # end with
+        else:
+            # Latin hypercube: one point in each of the ns intervals of each parameter
+            randomT = np.random.RandomState(self.randomSeed)
+            arrU = np.zeros((ns, nv))
+            for jj in range(0, nv):
+                arrU[:, jj] = (randomT.permutation(ns) + randomT.uniform(size=ns)) / float(ns)
+            # end for
+        # end if
+
+        tGrid = np.zeros((ns, na))
+        jj = 0
+        for ii in range(0, na):
+            if len(arrBounds[ii]) > 1:
+                tGrid[:, ii] = arrBounds[ii][0] + (arrU[:, jj] * (arrBounds[ii][1] - arrBounds[ii][0]))
+                jj += 1
+            else:
+                tGrid[:, ii] = arrBounds[ii][0]
+            # end if
+        # end for
+
+        iCount = 10 * ns * na
+        if iCount < 10:
+            iCount = 10
+        # end if
+        self.setCounterFormat(iCount)
+        return tGrid
+
+    # end getSampling
+
+    def startBrute(self):
+        """ start the optimization (brute force) """
+
+        self.optimType = "Brute"
+
+        if not self.prepare():
+            return False
+        # end if
+
+        if not self.isResumed:
+            strT = "Index\tTime\t"
+            for ii in range(0, self.paramCount):
+                strT += self.paramName[ii] + "\t"
+            # end for
+
+            strT += "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n"
+            fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+            fileOptim.write(strT)
+            fileOptim.close()
+        # end if
+
+        self.optimCounter = 1
+        self.funcCounter = 1
+        self.jacCounter = 0
+        self.guessParam = False
+        self.bruteSimul = True
+
+        # resumed: the evaluations done are replayed from the checkpoint, the counters, maximum and screening data restored
+        self.loadCheckpoint()
+
+        paramNormalized = np.zeros(self.paramCount)
+
+        dateT = datetime.datetime.now()
+        dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
+
+        # For ... for all parameters, if not fixed
+        self.paramBounds = list()
+        tStart = 0.0
+        tEnd = 0.0
+        tInit = 0.0
+        tStep = 0.0
+        for ii in range(0, self.paramCount):
+            if self.paramLogscale[ii]:
+                tStart = math.log10(self.paramStart[ii]) / math.log10(self.paramNorm[ii])
+                tEnd = math.log10(self.paramEnd[ii]) / math.log10(self.paramNorm[ii])
+                tInit = math.log10(self.paramInit[ii]) / math.log10(self.paramNorm[ii])
+            else:
+                tStart = self.paramStart[ii] / self.paramNorm[ii]
+                tEnd = self.paramEnd[ii] / self.paramNorm[ii]
+                tInit = self.paramInit[ii] / self.paramNorm[ii]
+            # end if
+            if (self.paramPoints[ii] > 1) and (self.bruteSampling != "grid"):
+                # sampled parameter: its range
+                self.paramBounds.append(np.array([tStart, tEnd]))
+            elif self.paramPoints[ii] > 1:
+                tStep = (tEnd - tStart) / float(self.paramPoints[ii] - 1)
+                arr = np.array([])
+                for jj in range(0, self.paramPoints[ii]):
+                    arr = np.append(arr, tStart + float(jj) * tStep)
+                # end for
+                self.paramBounds.append(arr)
+            else:
+                self.paramBounds.append(np.array([tInit]))
+            # end if
+        # end for
+
+        if self.bruteSampling == "grid":
+            paramNormalizedGrid = self.getGrid(self.paramBounds)
+        else:
+            paramNormalizedGrid = self.getSampling(self.paramBounds)
+        # end if
+        # the grid count (Python integer, len() limited to sys.maxsize) or the number of samples
+        self.paramCountTotal = paramNormalizedGrid.count if (self.bruteSampling == "grid") else int(paramNormalizedGrid.shape[0])
+
+        # the grid indices range evaluated
+        indexStart = min(self.bruteStart, self.paramCountTotal)
+        indexEnd = self.paramCountTotal if (self.bruteEnd is None) else min(self.bruteEnd, self.paramCountTotal)
+        if (indexStart > 0) or (indexEnd < self.paramCountTotal):
+            self.log("\nBrute grid points %d to %d evaluated (of %d)\n" % (indexStart + 1, indexEnd, self.paramCountTotal))
+        # end if
+
+        # grid points already evaluated by an interrupted optimization are skipped
+        listDone = self.getBruteDone()
+        if len(listDone) > 0:
+            self.screenedCount, self.failedCount = self.getResumedCount()
+            self.log("\nBrute optimization resumed: %d / %d points already evaluated\n" % (len([ii for ii in listDone if (ii >= indexStart) and (ii < indexEnd)]), indexEnd - indexStart))
+        # end if
+
+        # the grid points are given to the workers by chunks (the stop request is checked between chunks)...
+        # ...the indices streamed (the grid points calculated for each chunk)
+        chunkSize = 1 if (self.workerCount <= 1) else (self.workerCount * self.bruteChunk)
+        listChunk = list()
+        ii = indexStart
+        while ii < indexEnd:
+            if ii not in listDone:
+                listChunk.append(ii)
+            # end if
+            ii += 1
+            if (len(listChunk) < chunkSize) and (ii < indexEnd):
+                continue
+            # end if
+            if self.screening is not None:
+                listChunk = self.screenBrute(paramNormalizedGrid, listChunk)
+            # end if
+            if len(listChunk) > 0:
+                self.optimizeBatch([paramNormalizedGrid[jj] for jj in listChunk], listIndex = listChunk)
+            # end if
+            listChunk = list()
+        # end while
+
+        self.finish(errorOccured=False, userStopped=False)
+        self.bruteSimul = False
+
+        return True
+
+    # end startBrute
+
+    def screenBrute(self, paramNormalizedGrid, listChunk):
+        """ surrogate pre-screening of a chunk of Brute grid points: the points whose efficiency upper confidence bound...
+            ...is less than screening times the maximum efficiency are skipped (marked in the output)...
+            ...returns the grid indices to evaluate """
+
+        dataCount = len(self.screeningData)
+        if (dataCount < max(self.screeningMin, 2)) or (self.outputOptimized <= 0.0):
+            return listChunk
+        # end if
+
+        # the parameters scaled to [0, 1] in the grid range
+        gridMin = np.array([np.min(tt) for tt in self.paramBounds])
+        gridRange = np.array([(np.max(tt) - np.min(tt)) for tt in self.paramBounds])
+        gridRange[gridRange <= 0.0] = 1.0
+
+        # refitted when the results grew by 10 % (at least one new result)
+        if (self.screeningModel is None) or (dataCount >= (self.screeningFitted + max(1, self.screeningFitted // 10))):
+            try:
+                modelT = GaussianProcessRegressor(kernel=Matern(nu=2.5), alpha=1e-6, normalize_y=True, n_restarts_optimizer=5, random_state=self.randomSeed)
+                modelT.fit(np.array([(itemT[0] - gridMin) / gridRange for itemT in self.screeningData]), np.array([itemT[1] for itemT in self.screeningData]))
+                self.screeningModel = modelT
+                self.screeningFitted = dataCount
+            except:
+                self.screeningModel = None
+                return listChunk
+            # end try
+        # end if
+
+        arrX = np.array([(paramNormalizedGrid[ii] - gridMin) / gridRange for ii in listChunk])
+        arrMean, arrStd = self.screeningModel.predict(arrX, return_std=True)
+        arrUCB = arrMean + (self.screeningKappa * arrStd)
+        thresholdT = self.screening * self.outputOptimized
+
+        listRun = list()
+        for jj in range(0, len(listChunk)):
+            if arrUCB[jj] >= thresholdT:
+                listRun.append(listChunk[jj])
+                continue
+            # end if
+            evaluationT = slalomEvaluation(paramNormalizedGrid[listChunk[jj]], self.getNatural(paramNormalizedGrid[listChunk[jj]]), self.outputDir)
+            evaluationT.gridIndex = listChunk[jj]
+            self.setScreened(evaluationT, arrUCB[jj], thresholdT)
+        # end for
+
+        return listRun
+
+    # end screenBrute
+
+    def setScreened(self, evaluationT, ucbT, thresholdT):
+        """ mark a Brute grid point skipped by the pre-screening: commented row in the optimization output, grid index done """
+
+        self.screenedCount += 1
+
+        try:
+            strT = "# " + self.counterFormat.format(evaluationT.gridIndex + 1) + "\t" + datetime.datetime.now().strftime("%Y%m%d-%H%M%S") + "\t"
+            strT += self.getParamKey(evaluationT.paramNatural) + ("\tskipped: efficiency upper bound %.5f < %.5f\n" % (ucbT, thresholdT))
+            fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
+            fileOptim.write(strT)
+            fileOptim.close()
+        except:
+            pass
+        # end try
+
+        self.setBruteDone(evaluationT)
+
+    # end setScreened
+
+    def getBruteDone(self):
+        """ get the Brute grid indices already evaluated (when resuming), and start the progress file otherwise """
+
+        listDone = set()
+        pathBrute = os.path.join(self.outputDir, self.bruteFilename)
+        strGrid = "# Grid:\t%d\t" % self.paramCountTotal + "\t".join([("%d" % len(tt)) for tt in self.paramBounds])
+        strGrid += (("\t" + self.bruteSampling) if (self.bruteSampling != "grid") else "") + "\n"
+
+        if (not self.isResumed) or (not os.path.isfile(pathBrute)):
+            fileT = open(pathBrute, "w")
+            fileT.write(strGrid)
+            fileT.close()
+            return listDone
+        # end if
+
+        fileT = open(pathBrute, "r")
+        for lineT in fileT:
+            if lineT.startswith("#"):
+                if lineT.startswith("# Grid:") and (lineT != strGrid):
+                    fileT.close()
+                    dispError("cannot resume: the Brute grid differs from the previous one (%s)" % pathBrute,
+                        doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+                # end if
+                continue
+            # end if
+            try:
+                listDone.add(int(lineT))
+            except:
+                pass
+            # end try
+        # end for
+        fileT.close()
+
+        return listDone
 
-        strT = "# ---------------------------------------------------------------\n"
-        strT += "# " + self.title + "\n# Optimization (" + self.optimType
-        if self.optimType == "Optim":
-            strT += " " + self.minimizeMethod
+    # end getBruteDone
+
+    def getResumedCount(self):
+        """ when resuming a Brute optimization, the grid points skipped by the pre-screening and the failed evaluations...
+            ...counted in the output files (not in the checkpoint): returns (screenedCount, failedCount) """
+
+        screenedCount = 0
+        failedCount = 0
+        try:
+            fileT = open(self.outputDir + self.outputOptimizedFilename, "r")
+            screenedCount = len([lineT for lineT in fileT if (lineT.startswith("# ") and ("\tskipped: " in lineT))])
+            fileT.close()
+        except:
+            pass
+        # end try
+        try:
+            fileT = open(self.outputDir + self.failedFilename, "r")
+            failedCount = len([lineT for lineT in fileT if ((len(lineT.strip()) > 0) and (not lineT.startswith("Index\t")))])
+            fileT.close()
+        except:
+            pass
+        # end try
+
+        return screenedCount, failedCount
+
+    # end getResumedCount
+
+    def setBruteDone(self, evaluationT):
+        """ save the Brute grid index of an evaluation just merged (used to resume an interrupted optimization) """
+
+        if evaluationT.gridIndex is None:
+            return
         # end if
-        strT += ") started @ "
-        strT += dateStr
-        if self.optimType == "Optim":
-            strT += ("\n# With tolerance = %g" % self.tolerance)
-            if (self.minimizeMethod != "Bayes"):
-                strT += (" and jaceps = [ %.5f" % self.jaceps[0])
-                if self.paramCount > 1:
-                    strT += ("  %.5f" % self.jaceps[1])
-                # end if
-                if self.paramCount > 2:
-                    strT += ("  %.5f" % self.jaceps[2])
-                # end if
-                if self.paramCount > 3:
-                    strT += ("  %.5f" % self.jaceps[3])
+
+        try:
+            fileT = open(self.outputDir + self.bruteFilename, "a")
+            fileT.write("%d\n" % evaluationT.gridIndex)
+            fileT.close()
+        except:
+            pass
+        # end try
+
+    # end setBruteDone
+
+    def prepareCheckpoint(self):
+        """ start the checkpoint file or, when resuming, check it and get its random seed (the random generators seeded) """
+
+        pathT = os.path.join(self.outputDir, self.checkpointFilename)
+        strMode = "# Checkpoint:\t" + self.optimType + "\t" + (self.minimizeMethod if (self.optimType == "Optim") else "") + "\t" + "\t".join(self.paramName) + "\n"
+
+        self.randomSeed = None
+        if self.isResumed and os.path.isfile(pathT):
+            fileT = open(pathT, "r")
+            for lineT in fileT:
+                if not lineT.startswith("#"):
+                    break
                 # end if
-                if self.paramCount > 4:
-                    strT += ("  %.5f" % self.jaceps[4])
+                if lineT.startswith("# Checkpoint:") and (lineT != strMode):
+                    fileT.close()
+                    dispError("cannot resume: the optimization differs from the previous one (%s)" % pathT,
+                        doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
                 # end if
-                if self.paramCount > 5:
-                    strT += " ..."
+                listT = lineT.rstrip("\r\n").split("\t")
+                if lineT.startswith("# Seed:"):
+                    self.randomSeed = int(listT[1])
+                elif lineT.startswith("# Init:"):
+                    self.paramInit = np.array([float(tT) for tT in listT[1:]])
                 # end if
-                strT += " ]"
+            # end for
+            fileT.close()
+        # end if
+
+        if self.randomSeed is None:
+            self.randomSeed = random.SystemRandom().randint(0, 2**31 - 2)
+            fileT = open(pathT, "w")
+            fileT.write(strMode)
+            fileT.write("# Seed:\t%d\n" % self.randomSeed)
+            fileT.write("# Init:\t" + "\t".join([("%.17g" % tT) for tT in self.paramInit]) + "\n")
+            fileT.close()
+        # end if
+
+        # same seed when resuming: the same random points (Bayesian initialization, perturbation) are replayed
+        random.seed(self.randomSeed)
+        np.random.seed(self.randomSeed)
+
+    # end prepareCheckpoint
+
+    def setCheckpoint(self, evaluationT):
+        """ append the evaluation just merged to the checkpoint: counters, results (efficiency, Jsc, Voc, FF) and parameters """
+
+        try:
+            strT = "%d\t%d\t%d\t" % (self.optimCounter, self.funcCounter, self.jacCounter)
+            strT += "\t".join([("%.17g" % tT) for tT in [evaluationT.outputT, evaluationT.fJsc, evaluationT.fVoc, evaluationT.fFF]]) + "\t"
+            strT += "\t".join([("%.17g" % tT) for tT in evaluationT.paramNatural])
+            # multi-fidelity: the coarse evaluations end with their fidelity
+            strT += (("\t%.17g" % self.fidelity) if evaluationT.isCoarse else "") + "\n"
+            fileT = open(self.outputDir + self.checkpointFilename, "a")
+            fileT.write(strT)
+            fileT.close()
+        except:
+            pass
+        # end try
+
+    # end setCheckpoint
+
+    def loadCheckpoint(self):
+        """ when resuming, replay the checkpoint: memoization of the evaluations done, counters and maximum restored...
+            ...returns the number of evaluations replayed """
+
+        pathT = os.path.join(self.outputDir, self.checkpointFilename)
+        if (not self.isResumed) or (not os.path.isfile(pathT)):
+            return 0
+        # end if
+
+        listEntry = list()
+        fileT = open(pathT, "r")
+        for lineT in fileT:
+            if lineT.startswith("#"):
+                continue
             # end if
-            if self.paramWeight and self.isBound:
-                strT += " Weighted"
+            listT = lineT.rstrip("\r\n").split("\t")
+            if (len(listT) != (7 + self.paramCount)) and (len(listT) != (8 + self.paramCount)):
+                # incomplete line (interrupted while writing)
+                continue
             # end if
-        # end if
-        strT += "\n# Parameter:\t"
-        for ii in range(0, self.paramCount - 1):
-            strT += self.paramName[ii] + "\t"
-        # end for
-        strT += self.paramName[self.paramCount - 1] + "\n"
-        strT += "# StartValue:\t"
-        for ii in range(0, self.paramCount - 1):
-            strT += (self.paramFormat[ii] % self.paramStart[ii]) + "\t"
-        # end for
-        strT += (self.paramFormat[self.paramCount - 1] % self.paramStart[self.paramCount - 1]) + "\n"
-        strT += "# EndValue:  \t"
-        for ii in range(0, self.paramCount - 1):
-            strT += (self.paramFormat[ii] % self.paramEnd[ii]) + "\t"
-        # end for
-        strT += (self.paramFormat[self.paramCount - 1] % self.paramEnd[self.paramCount - 1]) + "\n"
-        strT += "# InitValue: \t"
-        for ii in range(0, self.paramCount - 1):
-            strT += (self.paramFormat[ii] % self.paramInit[ii]) + "\t"
+            try:
+                isCoarse = (len(listT) == (8 + self.paramCount))
+                if isCoarse and (self.fidelity != float(listT[-1])):
+                    continue
+                # end if
+                listEntry.append(([int(tT) for tT in listT[0:3]], [float(tT) for tT in listT[3:7]], np.array([float(tT) for tT in listT[7:7 + self.paramCount]]), isCoarse))
+            except:
+                pass
+            # end try
         # end for
-        strT += (self.paramFormat[self.paramCount - 1] % self.paramInit[self.paramCount - 1]) + "\n"
-        strT += "# NormValue: \t"
-        for ii in range(0, self.paramCount - 1):
-            strT += (self.paramFormat[ii] % self.paramNorm[ii]) + "\t"
+        fileT.close()
+
+        if len(listEntry) < 1:
+            return 0
+        # end if
+
+        # all the evaluations done are kept in memory
+        if self.memoSize < (len(listEntry) + 4096):
+            self.memoSize = len(listEntry) + 4096
+        # end if
+
+        for listCounter, listOutput, paramNatural, isCoarse in listEntry:
+            outputT, fJsc, fVoc, fFF = listOutput
+            self.setMemo(paramNatural, outputT, isCoarse)
+            if isCoarse:
+                self.coarseList.append((outputT, self.getNormalized(paramNatural)))
+                continue
+            # end if
+            if self.fidelity is not None:
+                # multi-fidelity: the full resolution evaluations done (promoted) kept apart from the coarse ones
+                self.fineList.append((outputT, self.getNormalized(paramNatural)))
+            # end if
+            if self.screening is not None:
+                self.screeningData.append((self.getNormalized(paramNatural), outputT))
+            # end if
+            if outputT > self.outputOptimized:
+                self.outputOptimized = outputT
+                self.paramOptim = np.array(paramNatural)
+            # end if
+            self.outputOptimizedx = max(self.outputOptimizedx, math.fabs(fJsc))
+            self.outputOptimizedy = max(self.outputOptimizedy, math.fabs(fVoc))
+            self.outputOptimizedz = max(self.outputOptimizedz, fFF)
         # end for
-        strT += (self.paramFormat[self.paramCount - 1] % self.paramNorm[self.paramCount - 1])
-        if self.optimType == "Brute":
-            strT += "\n# Points:   \t"
-            for ii in range(0, self.paramCount - 1):
-                strT += ("%9s" % self.paramPoints[ii]) + "\t"
+        self.optimCounter, self.funcCounter, self.jacCounter = listEntry[-1][0]
+
+        self.log("\nCheckpoint: %d evaluations replayed, maximum efficiency: %g %%\n" % (len(listEntry), self.outputOptimized))
+
+        return len(listEntry)
+
+    # end loadCheckpoint
+
+    def setResume(self, outputDir):
+        """ continue an interrupted optimization in its output directory...
+            ...(the evaluations done replayed from the checkpoint: counters, maximum and memoization restored...
+            ...the Brute grid points already evaluated skipped) """
+
+        if self.isRunning:
+            return False
+        # end if
+
+        if (not outputDir.endswith('/')) and (not outputDir.endswith('\\')):
+            outputDir += self.dirSepChar
+        # end if
+
+        if not os.path.isfile(outputDir + self.outputOptimizedFilename):
+            dispError("cannot resume: optimization output not found in '%s'" % outputDir,
+                doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        # end if
+
+        # the output directory just created (by setPath) is not used
+        try:
+            if (self.outputDir != outputDir) and os.path.isdir(self.outputDir) and (len(os.listdir(self.outputDir)) == 0):
+                os.rmdir(self.outputDir)
+            # end if
+        except:
+            pass
+        # end try
+
+        self.outputDir = outputDir
+        self.outputDirShort = os.path.basename(outputDir.rstrip('/\\'))
+        self.outputRoot = outputDir[0:len(outputDir) - len(self.outputDirShort) - 1]
+        self.isResumed = True
+
+        fileT = open(self.currentDir + "ofname.txt", "w")
+        fileT.write(self.outputDir + self.outputOptimizedFilename)
+        fileT.close()
+
+        return True
+
+    # end setResume
+
+    def getMinimizeMethod(self):
+        return self.minimizeMethod
+    # end getMinimizeMethod
+
+    def setMinimizeMethod(self, minimizeMethod, maxIter = 10, tolerance = 1e-3, optimPoints = 51):
+        """ set the optimization method ('L-BFGS-B' or 'SLSQP') """
+        
+        if (maxIter >= 1) and (maxIter <= 1024):
+            self.maxIter = maxIter
+        # end if
+
+        if (tolerance >= 1e-6) and (tolerance <= 1.0):
+            self.tolerance = tolerance
+        # end if
+
+        # optimPoints is used to approximate the jacobian. If increased, the optimisation time will dramatically increase. The default value is 51 and the maximum value is 201.
+        if (optimPoints < 11):
+            self.optimPoints = 11
+        elif (optimPoints > 201):
+            self.optimPoints = 201
+        else:
+            self.optimPoints = optimPoints
+        # end if
+
+        self.weightPoints = self.optimPoints * 2
+
+        if minimizeMethod in self.minimizeMethodList:
+            self.minimizeMethod = minimizeMethod
+            if (self.minimizeMethod == "L-BFGS-B") or (self.minimizeMethod == "SLSQP") or (self.minimizeMethod == "Bayes"):
+                self.isBound = True
+            else:
+                self.isBound = False
+            # end if
+        else:
+            strT = minimizeMethod + " unknown. Supported algorithms: "
+            for ii in range(0, len(self.minimizeMethodList)):
+                strT += self.minimizeMethodList[ii] + "  "
             # end for
-            strT += ("%9s" % self.paramPoints[self.paramCount - 1])
+            dispError(strT, doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
         # end if
-        strT += "\n# ---------------------------------------------------------------\n\n"
-        self.log(strT)
+    # end setMinimizeMethod
 
-        fileOptim = open(self.outputDir + self.outputOptimizedFilename, "w")
-        fileOptim.write(strT)
-        fileOptim.close()
+    def setWorkers(self, workerCount = 1):
+        """ set the number of simulations run concurrently (each one in its own sandbox directory) """
 
-        return True
+        if self.isRunning:
+            return False
+        # end if
 
-    # end prepare
+        if (workerCount >= 1) and (workerCount <= 256):
+            self.workerCount = int(workerCount)
+        # end if
 
-    def start(self, optimType):
-        """ start the optimization """
+        return True
 
-        if optimType == "Snap":
-            self.startSnapshot()
-        elif optimType == "Brute":
-            self.startBrute()
-        elif optimType == "Optim":
-            self.startOptim()
-        else:
-            dispError("Specify the optimType to \"Brute\", \"Snap\" or \"Optim\"", doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-        #end if
+    # end setWorkers
 
-    # end start
+    def setWarmStart(self, warmStart = None):
+        """ set the results files (simuloutput_optimized.txt) of previous optimizations used to start the Bayesian method """
 
-    def startOptim(self):
-        """ start the optimization """
+        if self.isRunning:
+            return False
+        # end if
 
-        self.optimType = "Optim"
+        if warmStart is None:
+            self.warmStart = list()
+        elif isinstance(warmStart, str):
+            self.warmStart = [tT for tT in warmStart.split(",") if (len(tT) > 0)]
+        else:
+            self.warmStart = list(warmStart)
+        # end if
 
-        self.setCounterFormat(maxcount = 2 * self.optimPoints)
+        return True
 
-        tStart = 0.0
-        tEnd = 0.0
-        tRangeMin = 0.0
-        tEps = 5.0 * self.tolerance
+    # end setWarmStart
 
-        self.jaceps = np.zeros(self.paramCount)
+    def getWarmStart(self):
+        return self.warmStart
+    # end getWarmStart
 
-        self.paramBounds = list() if self.isBound else None
+    def loadWarmStart(self):
+        """ read the warm start results files: the rows converted to normalized parameters (using paramNorm and paramLogscale)...
+            ...the columns found by the parameters name, the rows outside the current bounds skipped...
+            ...returns the list of (paramNormalized, paramNatural, efficiency) """
 
-        if self.paramWeight and self.isBound:
-            # Tukey Window (Parameters Weight: decreases near the bounds)
-            # If optimum is near the bounds, disable this feature or enlarge domain
-            nn = self.weightPoints
-            aa = self.weightAlpha
-            wn = np.arange(0, nn)
-            wm = nn % 2
-            ww = int(np.floor(aa * (float(nn - 1)) / 2.0))
-            wn1 = wn[0 : ww + 1]
-            wn2 = wn[ww + 1 : nn - ww - 1]
-            wn3 = wn[nn - ww - 1 :]
-            ww1 = 0.5 * (1.0 + np.cos(np.pi * (-1.0 + (2.0 * wn1 / aa / (nn - 1)))))
-            ww2 = np.ones(wn2.shape)
-            ww3 = 0.5 * (1.0 + np.cos(np.pi * ((-2.0 / aa) + 1.0 + (2.0 * wn3 / aa / (nn - 1)))))
-            self.weightFunc = np.concatenate((ww1, ww2, ww3))
+        listPoint = list()
+        listKey = set()
 
-            # Save the weight window
+        for filenameT in self.warmStart:
             try:
-                icw = len(self.weightFunc)
-                if (icw >= 7):
-                    fileT = open(self.outputDir + self.weightFilename, "w")
-                    strT = "# " + self.title + "\n"
-                    strT += "# Tukey Window (Parameters Weight)\n"
-                    for ii in range(0, icw):
-                        strT += ("\n%d\t%g" % (ii, self.weightFunc[ii]))
-                    # end for
-                    fileT.write(strT)
+                if slalomStore.isStore(filenameT):
+                    # results store (simuloutput_results.jsonl): the records read as the results file rows
+                    listLine = slalomStore.readLines(filenameT)
+                else:
+                    fileT = open(filenameT, "r")
+                    listLine = fileT.readlines()
                     fileT.close()
                 # end if
             except:
-                pass
+                self.log("\nWarm start: cannot read '%s'\n" % filenameT)
+                continue
             # end try
 
-        else:
-            self.weightFunc = None
+            listColumn = None
+            pointCount = 0
+            for lineT in listLine:
+                if lineT.startswith("#") or (len(lineT.strip()) < 1):
+                    continue
+                # end if
+                listT = lineT.rstrip("\r\n").split("\t")
+                if listT[0] == "Index":
+                    # column header: the parameters of the current device should all be present
+                    listColumn = None
+                    if all([(nameT in listT) for nameT in self.paramName]) and (listT[-1] == "Efficiency"):
+                        listColumn = [listT.index(nameT) for nameT in self.paramName]
+                    # end if
+                    continue
+                # end if
+                if listColumn is None:
+                    continue
+                # end if
+                try:
+                    paramNatural = np.array([float(listT[ii]) for ii in listColumn])
+                    outputT = float(listT[-1])
+                except:
+                    continue
+                # end try
+
+                if any([(self.paramLogscale[ii] and (paramNatural[ii] <= 0.0)) for ii in range(0, self.paramCount)]):
+                    continue
+                # end if
+                paramNormalized = self.getNormalized(paramNatural)
+                isValid = True
+                for ii in range(0, self.paramCount):
+                    # the parameters are written with a limited precision: bounds checked with a small tolerance
+                    (paramMin, paramMax) = self.paramBounds[ii]
+                    tTol = 1e-6 * max(1.0, math.fabs(paramMax - paramMin))
+                    if (paramNormalized[ii] < (paramMin - tTol)) or (paramNormalized[ii] > (paramMax + tTol)):
+                        isValid = False
+                        break
+                    # end if
+                    paramNormalized[ii] = min(max(paramNormalized[ii], paramMin), paramMax)
+                # end for
+                if not isValid:
+                    continue
+                # end if
+
+                # each point registered once (the Bayesian target space requires unique points)
+                keyT = self.getMemoKey(paramNatural)
+                if keyT in listKey:
+                    continue
+                # end if
+                listKey.add(keyT)
+                listPoint.append((paramNormalized, paramNatural, outputT))
+                pointCount += 1
+            # end for
+
+            self.log("\nWarm start: %d points imported from '%s'\n" % (pointCount, filenameT))
+        # end for
+
+        return listPoint
+
+    # end loadWarmStart
+
+    def setScreening(self, screening = None, screeningKappa = 2.576, screeningMin = 10):
+        """ set the Brute surrogate pre-screening: the grid points with an efficiency upper confidence bound less than...
+            ...screening (0 < screening < 1, None to disable) times the maximum efficiency are skipped """
+
+        if self.isRunning:
+            return False
         # end if
 
-        strT = "Index\tTime\t"
+        if (screening is None) or ((screening > 0.0) and (screening < 1.0)):
+            self.screening = screening
+        # end if
+        if screeningKappa >= 0.0:
+            self.screeningKappa = float(screeningKappa)
+        # end if
+        if screeningMin >= 2:
+            self.screeningMin = int(screeningMin)
+        # end if
 
-        for ii in range(0, self.paramCount):
-            if self.paramLogscale[ii]:
-                tStart = math.log10(self.paramStart[ii]) / math.log10(self.paramNorm[ii])
-                tEnd = math.log10(self.paramEnd[ii]) / math.log10(self.paramNorm[ii])
-            else:
-                tStart = self.paramStart[ii] / self.paramNorm[ii]
-                tEnd = self.paramEnd[ii] / self.paramNorm[ii]
-            # end if
-            if (ii == 0) or ((tEnd - tStart) < tRangeMin):
-                tRangeMin = tEnd - tStart
-            # end if
+        return True
 
-            self.jaceps[ii] = (tEnd - tStart) / float(self.optimPoints - 1)
+    # end setScreening
 
-            # tolerance should be kept less than eps
-            if self.jaceps[ii] <= self.tolerance:
-                self.tolerance = 0.2 * self.jaceps[ii]
-            # end if
+    def getScreening(self):
+        return self.screening
+    # end getScreening
 
-            if self.isBound:
-                self.paramBounds.append((tStart, tEnd))
-            # end if
-            strT += self.paramName[ii] + "\t"
-        # end for
+    def setFidelity(self, fidelity = None, fidelityPromote = 0.25):
+        """ set the multi-fidelity mode (Bayesian method): the coarse evaluations resolution (0 < fidelity < 1, None to disable)...
+            ...and the fraction of the coarse evaluations promoted to full resolution """
 
-        if tRangeMin < 1e-9:
+        if self.isRunning:
             return False
         # end if
 
-        tEps = tRangeMin / float(self.optimPoints - 1)
+        if (fidelity is None) or ((fidelity > 0.0) and (fidelity < 1.0)):
+            self.fidelity = fidelity
+        # end if
+        if (fidelityPromote > 0.0) and (fidelityPromote <= 1.0):
+            self.fidelityPromote = float(fidelityPromote)
+        # end if
 
-        # tolerance should be kept less than eps
-        if tEps <= self.tolerance:
-            self.tolerance = 0.2 * tEps
+        return True
+
+    # end setFidelity
+
+    def getFidelity(self):
+        return self.fidelity
+    # end getFidelity
+
+    def setEarlyStop(self, earlyStop = None, earlyStopColumns = None):
+        """ set the early termination: the simulator is stopped earlyStop log points after the Voc crossing (None to disable)...
+            ...earlyStopColumns: the anode (voltage, current) log columns, names in the log header or positions (None: simulator defaults) """
+
+        if self.isRunning:
+            return False
         # end if
 
-        if not self.prepare():
+        if earlyStop is None:
+            self.earlyStop = None
+        elif (earlyStop >= 1) and (earlyStop <= 100):
+            self.earlyStop = int(earlyStop)
+        # end if
+
+        if (earlyStopColumns is None) or (len(earlyStopColumns) == 2):
+            self.earlyStopColumns = None if (earlyStopColumns is None) else tuple(earlyStopColumns)
+        # end if
+
+        return True
+
+    # end setEarlyStop
+
+    def setTimeout(self, timeout = None, timeoutFactor = None):
+        """ set the simulator watchdog: timeout in seconds and/or timeoutFactor times the mean full resolution run duration (None to disable) """
+
+        if self.isRunning:
             return False
         # end if
 
-        strT += "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n"
-        fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
-        fileOptim.write(strT)
-        fileOptim.close()
+        self.timeout = float(timeout) if ((timeout is not None) and (timeout > 0.0)) else None
+        self.timeoutFactor = float(timeoutFactor) if ((timeoutFactor is not None) and (timeoutFactor > 1.0)) else None
 
-        self.optimCounter = 1
-        self.funcCounter = 1
-        self.jacCounter = 0
-        self.guessParam = False
-        self.bruteSimul = False
+        return True
 
-        outX = None
-        outSuccess = None
-        outMessage = None
-        outNit = None
-        outFun = None
-        outNFev = None
-        outNJev = None
-        outNHev = None
-        outNLFev = None
-        outXl = None
-        outFunl = None
+    # end setTimeout
 
-        # Choose the initial values
-        paramNormalized0 = self.guess()
+    def getTimeout(self):
+        return self.timeout, self.timeoutFactor
+    # end getTimeout
 
-        if self.isBound:
-            try:
-                self.isBound = True
-                if (self.minimizeMethod == "Bayes"):
-                    BayesianBbounds = {}
-                    for ii in range(0, self.paramCount):
-                        BayesianBbounds[self.paramName[ii]] = self.paramBounds[ii]
-                    # end for
-                    BayesianOptimizer = BayesianOptimization(
-                        f=self.optimizeFuncBayesian,
-                        pbounds=BayesianBbounds,
-                        verbose=0
-                    )
-                    BayesianOptimizer.maximize(
-                        init_points=self.paramCount if (self.paramCount <= 5) else 5,
-                        n_iter=self.maxIter,
-                    )
-                    outFun = BayesianOptimizer.max['target']
-                    params = BayesianOptimizer.max['params']
-                    outX = np.array([])
-                    for ii in range(0, len(params)):
-                        outX = np.append(outX, params[self.paramName[ii]])
-                    # end for
-                    outSuccess = True
-                    outMessage = 'Done.'
-                    outNit = self.maxIter
-                else:
-                    outResult = optimize.minimize(self.optimizeFunc, paramNormalized0, method=self.minimizeMethod, jac=self.getOptimizeJac(self.optimizeFunc), bounds=self.paramBounds, tol=self.tolerance, options={ 'eps': tEps, 'maxiter': self.maxIter, 'disp': False, 'ftol': self.tolerance })
-                # end if
-                try:
-                    if (self.minimizeMethod != "Bayes"):
-                        outX = outResult.x
-                        outSuccess = outResult.success
-                        outMessage = outResult.message
-                        outNit = outResult.nit
-                        outFun = outResult.fun
-                        outNFev = outResult.nfev
-                        outNJev = outResult.njev
-                        outNHev = outResult.nhev
-                        outNLFev = outResult.nlfev
-                        outXl = outResult.xl
-                        outFunl = outResult.funl
-                    # end if
-                except:
-                    pass
-                # end try
-            except Exception as excT:
-                # catch only Exception (since sys.exit raise BaseException)
-                if self.stoppedDone is False:
-                    dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-                # end if
-            # end try
-        else:
-            # not bound methods
-            try:
-                outResult = optimize.minimize(self.optimizeFunc, paramNormalized0, method=self.minimizeMethod, jac=False, tol=self.tolerance, options={ 'maxiter': self.maxIter, 'disp': False })
-                outX = outResult.x
-                outSuccess = outResult.success
-                outMessage = outResult.message
-                outNit = outResult.nit
-            except Exception as excT:
-                # catch only Exception (since sys.exit raise BaseException)
-                dispError(traceback.format_exc(), doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
-            # end try
+    def setResultsText(self, resultsText = True):
+        """ write (True) or not (False) the evaluations rows in the results text file (simuloutput_optimized.txt)...
+            ...the rows are always in the results store (simuloutput_results.jsonl) """
+
+        if self.isRunning:
+            return False
+        # end if
+
+        self.resultsText = bool(resultsText)
+
+        return True
+
+    # end setResultsText
+
+    def getResultsText(self):
+        return self.resultsText
+    # end getResultsText
+
+    def setArchiveChunk(self, archiveChunk = None):
+        """ set the number of evaluations per archive chunk (incremental archiving on a background thread)...
+            ...None to zip the output directory at the optimization end """
+
+        if self.isRunning:
+            return False
         # end if
 
-        self.finish(errorOccured=False, userStopped=False, x=outX, success=outSuccess, message=outMessage, nit=outNit, nlfev=outNLFev, xl=outXl, funl=outFunl)
+        self.archiveChunk = int(archiveChunk) if ((archiveChunk is not None) and (archiveChunk >= 1)) else None
 
         return True
 
-    # end startOptim
-
-    def startSnapshot(self):
-        """ start the optimization (Snap: one calculation for the initial parameters set) """
+    # end setArchiveChunk
 
-        self.optimType = "Snap"
+    def getArchiveChunk(self):
+        return self.archiveChunk
+    # end getArchiveChunk
 
-        self.setCounterFormat(maxcount = 2)
+    def setOutputArchive(self, outputArchive = "header"):
+        """ set the simulator output files archiving: "header" (header written in each file) or "rename" (files only renamed...
+            ...their header in the manifest simuloutput_manifest.jsonl, joined with slalomStore.readOutput) """
 
-        if not self.prepare():
+        if self.isRunning:
             return False
         # end if
 
-        strT = "Index\tTime\t"
-        for ii in range(0, self.paramCount):
-            strT += self.paramName[ii] + "\t"
-        # end for
-
-        strT += "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n"
-        fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
-        fileOptim.write(strT)
-        fileOptim.close()
+        if outputArchive not in self.outputArchiveList:
+            strT = "Invalid output archiving '%s'. Valid options: " % str(outputArchive)
+            for ii in range(0, len(self.outputArchiveList)):
+                strT += self.outputArchiveList[ii] + "  "
+            # end for
+            dispError(strT, doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        # end if
 
-        self.optimCounter = 1
-        self.funcCounter = 1
-        self.jacCounter = 0
-        self.guessParam = False
-        self.bruteSimul = True
+        self.outputArchive = outputArchive
 
-        paramNormalized = np.zeros(self.paramCount)
+        return True
 
-        for ii in range(0, self.paramCount):
-            self.paramNatural[ii] = self.paramInit[ii]
-            if self.paramLogscale[ii]:
-                paramNormalized[ii] = math.log10(self.paramNatural[ii]) / math.log10(self.paramNorm[ii])
-            else:
-                paramNormalized[ii] = self.paramNatural[ii] / self.paramNorm[ii]
-            # end if
-        # end for
+    # end setOutputArchive
 
-        # Run the optimization
-        self.optimizeFunc(paramNormalized)
+    def getOutputArchive(self):
+        return self.outputArchive
+    # end getOutputArchive
 
-        self.finish(errorOccured=False, userStopped=False)
+    def setFailurePolicy(self, failurePolicy = "abort", failurePenalty = 0.0, failureRetry = 2, failurePerturb = 0.01):
+        """ set the failure policy ("abort", "penalty", "perturb" or "relax"), the penalty efficiency (%)...
+            ...and, for "perturb", the maximum number of retries and the perturbation (fraction of the parameters range) """
 
-    # end startSnapshot
+        if self.isRunning:
+            return False
+        # end if
 
-    # create the grid for the brute force iterations
-    def doGrid(self, arrP, tR, tGrid):
-        ns = arrP.shape[0]
-        ms = tGrid.shape[0] // (tR * ns)
-        for n in range(ns):
-            tVal = arrP[n]
-            for k in range(tR):
-                for m in range(ms):
-                    idx = (k * ns * ms) + (n * ms) + m
-                    tGrid[idx] = tVal
-                # end for
+        if failurePolicy not in self.failurePolicyList:
+            strT = "Invalid failure policy '%s'. Valid policies: " % str(failurePolicy)
+            for ii in range(0, len(self.failurePolicyList)):
+                strT += self.failurePolicyList[ii] + "  "
             # end for
-        # end for
-    # end doGrid
+            dispError(strT, doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        # end if
 
-    def getGrid(self, arrParams):
-        arrParams = [np.array(tt) for tt in arrParams]
-        arrShapes = [tt.shape[0] for tt in arrParams]
-        tType = arrParams[0].dtype
-        na = len(arrParams)
-        ns = np.prod(arrShapes)
-        tGrid = np.zeros((ns, na), dtype=tType)
-        tRep = np.cumprod([1] + arrShapes[:-1])
-        for ii in range(na):
-            self.doGrid(arrParams[ii], tRep[ii], tGrid[:, ii])
-        # end for
-        iCount = 10 * ns * na
-        if iCount < 10:
-            iCount = 10
+        self.failurePolicy = failurePolicy
+        self.failurePenalty = float(failurePenalty)
+        if (failureRetry >= 1) and (failureRetry <= 10):
+            self.failureRetry = int(failureRetry)
+        # end if
+        if (failurePerturb > 0.0) and (failurePerturb < 0.5):
+            self.failurePerturb = float(failurePerturb)
         # end if
-        self.setCounterFormat(iCount)
-        return tGrid
-    # end getGrid
 
-    def startBrute(self):
-        """ start the optimization (brute force) """
+        return True
 
-        self.optimType = "Brute"
+    # end setFailurePolicy
 
-        if not self.prepare():
+    def getFailurePolicy(self):
+        return self.failurePolicy
+    # end getFailurePolicy
+
+    def getEarlyStop(self):
+        return self.earlyStop
+    # end getEarlyStop
+
+    def getWorkers(self):
+        return self.workerCount
+    # end getWorkers
+
+    def setCache(self, cacheDir = None, cacheSize = 512):
+        """ set the persistent evaluation cache directory (None to disable) and its maximum size in MB """
+
+        if self.isRunning:
             return False
         # end if
 
-        strT = "Index\tTime\t"
+        if (cacheDir is not None) and (not cacheDir.endswith('/')) and (not cacheDir.endswith('\\')):
+            cacheDir += self.dirSepChar
+        # end if
+        self.cacheDir = cacheDir
+        if cacheSize >= 1:
+            self.cacheSize = int(cacheSize)
+        # end if
+
+        return True
+
+    # end setCache
+
+    def getCache(self):
+        return self.cacheDir
+    # end getCache
+
+    def prepareCache(self):
+        """ open the persistent evaluation cache with the input and model files of this optimization """
+
+        self.cache = None
+        if self.cacheDir is None:
+            return
+        # end if
+
+        try:
+            cacheT = slalomCache(self.cacheDir, self.cacheSize)
+
+            fileT = open(self.outputDir + self.inputFilename, "r")
+            inputContent = fileT.read()
+            fileT.close()
+
+            listModelContent = list()
+            for ii in range(0, self.modelCount):
+                if self.modelFilename[ii] == "":
+                    break
+                # end if
+                fileT = open(self.outputDir + self.modelFilename[ii], "r")
+                listModelContent.append(fileT.read())
+                fileT.close()
+            # end for
+
+            # the parameters lines are not in the context hash (the parameters values are in the key)
+            listPrefix = [(self.simulator.vardeclpre % self.paramName[ii]) for ii in range(0, self.paramCount)]
+            listPrefix += [("double " + self.paramName[ii] + " = ") for ii in range(0, self.paramCount)]
+            if self.simulator.name == "atlas":
+                # the tonyplot commands are skipped
+                listPrefix.append("tonyplot")
+            # end if
+
+            cacheT.setContext(self.simulator.name, inputContent, listModelContent, listPrefix)
+            self.cache = cacheT
+        except:
+            dispError("cannot open the evaluation cache in '%s': cache disabled" % self.cacheDir, doExit = False)
+            self.cache = None
+        # end try
+
+    # end prepareCache
+
+    def prepareStore(self):
+        """ open the results store in the output directory (kept and appended if the optimization is resumed) """
+
+        self.store = None
+
+        try:
+            storeT = slalomStore(self.outputDir)
+            if not storeT.open(self.title, self.paramName, self.paramFormat, self.counterFormat):
+                dispError("results store in '%s' written with other parameters: store disabled" % self.outputDir, doExit = False)
+                return
+            # end if
+            self.store = storeT
+        except:
+            dispError("cannot open the results store in '%s': store disabled" % self.outputDir, doExit = False)
+            self.store = None
+        # end try
+
+    # end prepareStore
+
+    def prepareArchive(self):
+        """ start the incremental archiving of the output files (the chunks of a resumed optimization kept) """
+
+        self.archive = None
+        if self.archiveChunk is None:
+            return
+        # end if
+
+        try:
+            archiveT = slalomArchive(self.outputDir, self.archiveChunk)
+            archiveT.start()
+            self.archive = archiveT
+        except:
+            dispError("cannot start the incremental archiving in '%s': output zipped at the end" % slalomArchive.getArchiveDir(self.outputDir), doExit = False)
+            self.archive = None
+        # end try
+
+    # end prepareArchive
+
+    def getCacheKey(self, paramNatural, isCoarse = False):
+        """ get the parameters key as written in the simulator input and model files (the simulator precision)...
+            ...and the fidelity for the coarse evaluations """
+
+        listT = list()
         for ii in range(0, self.paramCount):
-            strT += self.paramName[ii] + "\t"
+            listT.append(self.simulator.vardecl % (self.paramName[ii], float(self.paramFormatShort[ii] % paramNatural[ii])))
+            listT.append("%g" % float(self.paramFormat[ii] % paramNatural[ii]))
         # end for
+        if isCoarse:
+            listT.append("fidelity=%g" % self.fidelity)
+        # end if
 
-        strT += "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n"
-        fileOptim = open(self.outputDir + self.outputOptimizedFilename, "a")
-        fileOptim.write(strT)
-        fileOptim.close()
+        return "\t".join(listT)
 
-        self.optimCounter = 1
-        self.funcCounter = 1
-        self.jacCounter = 0
-        self.guessParam = False
-        self.bruteSimul = True
+    # end getCacheKey
 
-        paramNormalized = np.zeros(self.paramCount)
+    def getCached(self, evaluationT):
+        """ get the evaluation results from the persistent cache, if any (without running the simulator) """
 
-        dateT = datetime.datetime.now()
-        dateStr = dateT.strftime("%Y-%m-%d %H:%M:%S")
+        if self.cache is None:
+            return False
+        # end if
 
-        # For ... for all parameters, if not fixed
-        # Limited to 5 parameters
-        if self.paramCount > 5:
-            strT = "\n---------------------------------------------------------------\n"
-            strT += " The number of parameters is limited to 5 in the Brute optimization"
-            strT += dateStr
-            strT += "\n---------------------------------------------------------------\n"
-            self.log(strT)
+        evaluationT.isCacheChecked = True
+        entryT = self.cache.get(self.getCacheKey(evaluationT.paramNatural, evaluationT.isCoarse))
+        if entryT is None:
+            return False
+        # end if
+
+        evaluationT.outputT = entryT["Efficiency"]
+        evaluationT.outputO = entryT["SimulatorEfficiency"]
+        evaluationT.fJm = entryT["Jm"]
+        evaluationT.fVm = entryT["Vm"]
+        evaluationT.fFF = entryT["FF"]
+        evaluationT.fJsc = entryT["Jsc"]
+        evaluationT.fVoc = entryT["Voc"]
+        evaluationT.isCached = True
+        evaluationT.status = "done"
+
+        # the cached J-V characteristic (full and photovoltaic part) is given back as the evaluation output
+        if evaluationT.isSandbox and ((entryT["JV"] is not None) or (entryT["JVP"] is not None)):
             try:
-                pathStopped = os.path.join(self.outputDir, self.stoppedFilename)
-                fileT = open(pathStopped, "w")
-                fileT.write("SLALOM\nStopped\n")
-                fileT.close()
+                slalomEngine.createSandbox(evaluationT.workDir)
             except:
                 pass
             # end try
-            sys.exit(0)
         # end if
-
-        self.paramBounds = list()
-        tStart = 0.0
-        tEnd = 0.0
-        tInit = 0.0
-        tStep = 0.0
-        for ii in range(0, self.paramCount):
-            if self.paramLogscale[ii]:
-                tStart = math.log10(self.paramStart[ii]) / math.log10(self.paramNorm[ii])
-                tEnd = math.log10(self.paramEnd[ii]) / math.log10(self.paramNorm[ii])
-                tInit = math.log10(self.paramInit[ii]) / math.log10(self.paramNorm[ii])
-            else:
-                tStart = self.paramStart[ii] / self.paramNorm[ii]
-                tEnd = self.paramEnd[ii] / self.paramNorm[ii]
-                tInit = self.paramInit[ii] / self.paramNorm[ii]
-            # end if
-            if self.paramPoints[ii] > 1:
-                tStep = (tEnd - tStart) / float(self.paramPoints[ii] - 1)
-                arr = np.array([])
-                for jj in range(0, self.paramPoints[ii]):
-                    arr = np.append(arr, tStart + float(jj) * tStep)
-                # end for
-                self.paramBounds.append(arr)
-            else:
-                self.paramBounds.append(np.array([tInit]))
+        for (nameT, positionT) in [("JV", self.outputFilenameJVposition), ("JVP", self.outputFilenameJVPposition)]:
+            if entryT[nameT] is None:
+                continue
             # end if
+            try:
+                pathT = evaluationT.workDir + self.outputFilename[positionT]
+                if self.outputArchive == "rename":
+                    # the J-V files are only renamed (never rewritten): hard-linked to the cache entry, if on the same file system
+                    try:
+                        os.link(entryT[nameT], pathT)
+                    except:
+                        shutil.copyfile(entryT[nameT], pathT)
+                    # end try
+                else:
+                    shutil.copyfile(entryT[nameT], pathT)
+                # end if
+            except:
+                pass
+            # end try
         # end for
 
-        paramNormalizedGrid = self.getGrid(self.paramBounds)
-        for paramNormalized in paramNormalizedGrid:
-            self.optimizeFunc(paramNormalized)
-        # end for
+        return True
 
-        self.finish(errorOccured=False, userStopped=False)
-        self.bruteSimul = False
+    # end getCached
 
-        return True
+    def setCached(self, evaluationT):
+        """ save the evaluation results in the persistent cache """
 
-    # end startBrute
+        if (self.cache is None) or evaluationT.isCached:
+            return
+        # end if
 
-    def getMinimizeMethod(self):
-        return self.minimizeMethod
-    # end getMinimizeMethod
+        self.cache.put(self.getCacheKey(evaluationT.paramNatural, evaluationT.isCoarse), self.paramName, evaluationT.paramNatural,
+            evaluationT.outputT, evaluationT.outputO, evaluationT.fJm, evaluationT.fVm, evaluationT.fFF, evaluationT.fJsc, evaluationT.fVoc,
+            pathJV = evaluationT.workDir + self.outputFilename[self.outputFilenameJVposition],
+            pathJVP = evaluationT.workDir + self.outputFilename[self.outputFilenameJVPposition])
 
-    def setMinimizeMethod(self, minimizeMethod, maxIter = 10, tolerance = 1e-3, optimPoints = 51):
-        """ set the optimization method ('L-BFGS-B' or 'SLSQP') """
-        
-        if (maxIter >= 1) and (maxIter <= 1024):
-            self.maxIter = maxIter
+    # end setCached
+
+    def setBruteRange(self, bruteStart = 0, bruteEnd = None):
+        """ set the Brute grid indices range [bruteStart, bruteEnd) evaluated (bruteEnd None: up to the grid end) """
+
+        if self.isRunning:
+            return False
         # end if
 
-        if (tolerance >= 1e-6) and (tolerance <= 1.0):
-            self.tolerance = tolerance
+        if (bruteStart >= 0) and ((bruteEnd is None) or (bruteEnd > bruteStart)):
+            self.bruteStart = int(bruteStart)
+            self.bruteEnd = None if (bruteEnd is None) else int(bruteEnd)
         # end if
 
-        # optimPoints is used to approximate the jacobian. If increased, the optimisation time will dramatically increase. The default value is 51 and the maximum value is 201.
-        if (optimPoints < 11):
-            self.optimPoints = 11
-        elif (optimPoints > 201):
-            self.optimPoints = 201
-        else:
-            self.optimPoints = optimPoints
+        return True
+
+    # end setBruteRange
+
+    def getBruteRange(self):
+        return self.bruteStart, self.bruteEnd
+    # end getBruteRange
+
+    def setBruteSampling(self, bruteSampling = "grid", bruteBudget = 256):
+        """ set the Brute mode sampling: "grid" (full factorial grid), "sobol" or "lhs" with bruteBudget points """
+
+        if self.isRunning:
+            return False
         # end if
 
-        self.weightPoints = self.optimPoints * 2
+        if bruteSampling in self.bruteSamplingList:
+            self.bruteSampling = bruteSampling
+        # end if
+        if bruteBudget >= 1:
+            self.bruteBudget = int(bruteBudget)
+        # end if
 
-        if minimizeMethod in self.minimizeMethodList:
-            self.minimizeMethod = minimizeMethod
-            if (self.minimizeMethod == "L-BFGS-B") or (self.minimizeMethod == "SLSQP") or (self.minimizeMethod == "Bayes"):
-                self.isBound = True
-            else:
-                self.isBound = False
-            # end if
-        else:
-            strT = minimizeMethod + " unknown. Supported algorithms: "
-            for ii in range(0, len(self.minimizeMethodList)):
-                strT += self.minimizeMethodList[ii] + "  "
-            # end for
-            dispError(strT, doExit = True, atExit = self.finish, errFilename = self.currentDir + 'errlog.txt')
+        return True
+
+    # end setBruteSampling
+
+    def getBruteSampling(self):
+        return self.bruteSampling
+    # end getBruteSampling
+
+    def setBayesAsync(self, bayesAsync = False):
+        """ set the Bayesian method mode with more than one worker: asynchronous (True) or by batches (False) """
+
+        if self.isRunning:
+            return False
         # end if
-    # end setMinimizeMethod
+
+        self.bayesAsync = bayesAsync
+
+        return True
+
+    # end setBayesAsync
+
+    def getBayesAsync(self):
+        return self.bayesAsync
+    # end getBayesAsync
 
     def getRunning(self):
         return self.isRunning
@@ -2372,6 +4514,44 @@ class slalomCore(object):
 
 # end slalomCore
 
+# the Brute grid, lazily indexed: each point calculated from its index (no grid array)...
+# ...the first parameter varying the slowest, the last one the fastest
+class slalomGrid(object):
+
+    def __init__(self, arrParams):
+        """ slalomGrid constructor: arrParams, the list of the values of each parameter """
+
+        self.arrParams = [np.array(tt) for tt in arrParams]
+        self.arrShapes = [int(tt.shape[0]) for tt in self.arrParams]
+
+        # the index stride of each parameter (Python integers: no overflow whatever the grid size)
+        self.arrStride = [1] * len(self.arrShapes)
+        for ii in range(len(self.arrShapes) - 2, -1, -1):
+            self.arrStride[ii] = self.arrStride[ii + 1] * self.arrShapes[ii + 1]
+        # end for
+        # the number of grid points: use count, not len() (OverflowError beyond sys.maxsize)
+        self.count = (self.arrStride[0] * self.arrShapes[0]) if (len(self.arrShapes) > 0) else 0
+
+    # end __init__
+
+    def __getitem__(self, index):
+        """ the grid point of a given index """
+
+        if (index < 0) or (index >= self.count):
+            raise IndexError("grid index out of range")
+        # end if
+
+        tPoint = np.zeros(len(self.arrParams), dtype=self.arrParams[0].dtype)
+        for ii in range(0, len(self.arrParams)):
+            tPoint[ii] = self.arrParams[ii][(index // self.arrStride[ii]) % self.arrShapes[ii]]
+        # end for
+
+        return tPoint
+
+    # end __getitem__
+
+# end slalomGrid
+
 # class to disable standard output buffering
 class UnbufferedStdout(object):
 
@@ -0,0 +1,279 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================
+# SLALOM - Open-Source Solar Cell Multivariate Optimizer
+# Copyright(C) 2012-2019 Sidi OULD SAAD HAMADY (1,2,*), Nicolas FRESSENGEAS (1,2). All rights reserved.
+# (1) Université de Lorraine, Laboratoire Matériaux Optiques, Photonique et Systèmes, Metz, F-57070, France
+# (2) Laboratoire Matériaux Optiques, Photonique et Systèmes, CentraleSupélec, Université Paris-Saclay, Metz, F-57070, France
+# (*) sidi.hamady@univ-lorraine.fr
+# SLALOM source code is available to download from:
+# https://github.com/sidihamady/SLALOM
+# https://hal.archives-ouvertes.fr/hal-01897934
+# http://www.hamady.org/photovoltaics/slalom_source.zip
+# Cite as: S Ould Saad Hamady and N Fressengeas, EPJ Photovoltaics, 9:13, 2018.
+# See Copyright Notice in COPYRIGHT
+# ======================================================================================================
+
+# ------------------------------------------------------------------------------------------------------
+# File:           slalomEngine.py
+# Type:           Class
+# Use:            slalomEngine is used by slalomCore.py
+#                  it runs the simulator evaluations concurrently through a pool of workers...
+#                  ...each evaluation using its own sandbox directory (input, models, launcher and outputs)
+#                  ...the simulator being an external process, threads are sufficient here.
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import shutil
+import collections
+
+try:
+    import queue
+except ImportError:
+    import Queue as queue
+# end try
+
+import numpy as np
+
+from multiprocessing.pool import ThreadPool
+
+class slalomEvaluation(object):
+    """ one simulator evaluation: parameters, working directory, status and results """
+
+    def __init__(self, paramNormalized, paramNatural, workDir = None):
+        """ slalomEvaluation constructor """
+
+        self.paramNormalized = np.array(paramNormalized, dtype=float)
+        self.paramNatural = np.array(paramNatural, dtype=float)
+
+        # the directory where the simulator input is written and the simulator run
+        self.workDir = workDir
+        # True if workDir is a sandbox (to be removed after the results merge)
+        self.isSandbox = False
+
+        # evaluation context (set when the evaluation is created)
+        self.inJac = False
+        self.guessParam = False
+        self.optimCounter = 0
+        # index in the Brute grid (None if not a grid point)
+        self.gridIndex = None
+        # True if the results come from the persistent cache (the simulator not launched)...
+        # ...and True once the cache looked up (not looked up again by the worker)
+        self.isCached = False
+        self.isCacheChecked = False
+        # True if the results come from the memoization (neither evaluated nor merged again)
+        self.isMemoized = False
+        # asynchronous Bayesian method: the point as suggested (dict), given back when collected
+        self.paramBayesian = None
+        # True if the simulator was stopped once Voc crossed (early termination), the outputs extracted from the partial log
+        self.isStopped = False
+        # True if the simulator was stopped by the watchdog (timeout)
+        self.isTimeout = False
+        # failure policy: number of retries done and True if the last one used relaxed numerics...
+        # ...and the random generator of the perturbed retries (created at the first one)
+        self.retryCount = 0
+        self.isRelaxed = False
+        self.randomState = None
+        # multi-fidelity: True if evaluated with the coarse (low resolution) input file
+        self.isCoarse = False
+
+        # instrumentation: duration in seconds of each phase (see slalomCore.addTiming) and simulator exit code
+        self.timing = collections.OrderedDict()
+        self.exitCode = None
+
+        # status:
+        # * "pending": not yet evaluated
+        # * "done": evaluated, results valid
+        # * "failed": the efficiency cannot be evaluated (the optimization continues)
+        # * "error": fatal error (the optimization is stopped)
+        self.status = "pending"
+        self.error = None
+        self.errorOutput = None
+        self.warning = list()
+
+        # results
+        self.outputT = 0.0
+        self.outputO = 0.0
+        self.fJm = 0.0
+        self.fVm = 0.0
+        self.fFF = 0.0
+        self.fJsc = 0.0
+        self.fVoc = 0.0
+
+        # run duration in seconds
+        self.duration = 0.0
+
+    # end __init__
+
+    def isDone(self):
+        return (self.status == "done")
+    # end isDone
+
+# end slalomEvaluation
+
+class slalomEngine(object):
+    """ the SLALOM evaluation engine: runs the simulator evaluations through a pool of workers """
+
+    def __init__(self, workerCount = 1):
+        """ slalomEngine constructor """
+
+        self.workerCount = max(1, int(workerCount))
+        self.pool = None
+
+        # asynchronous evaluations: the evaluations done are put in doneQueue (in the completion order)
+        self.doneQueue = queue.Queue()
+        self.pendingCount = 0
+
+    # end __init__
+
+    def start(self):
+        """ start the workers pool (only used with more than one worker) """
+
+        if (self.pool is None) and (self.workerCount > 1):
+            self.pool = ThreadPool(processes = self.workerCount)
+        # end if
+
+    # end start
+
+    def stop(self):
+        """ stop the workers pool """
+
+        if self.pool is not None:
+            try:
+                self.pool.close()
+                self.pool.join()
+            except:
+                pass
+            # end try
+            self.pool = None
+        # end if
+
+    # end stop
+
+    def isConcurrent(self):
+        return (self.workerCount > 1)
+    # end isConcurrent
+
+    def run(self, runFunc, listEvaluation):
+        """ run runFunc on every evaluation and return when all are done (the list order is kept) """
+
+        if (not self.isConcurrent()) or (len(listEvaluation) <= 1):
+            for evaluationT in listEvaluation:
+                runFunc(evaluationT)
+            # end for
+            return listEvaluation
+        # end if
+
+        self.start()
+        # chunksize set to one: each evaluation goes to the first free worker
+        self.pool.map(runFunc, listEvaluation, chunksize = 1)
+
+        return listEvaluation
+
+    # end run
+
+    def stream(self, runFunc, listEvaluation):
+        """ run runFunc on every evaluation and yield each one as soon as it and all the previous ones are done...
+            ...(the list order is kept, while the free workers continue with the next evaluations) """
+
+        if (not self.isConcurrent()) or (len(listEvaluation) <= 1):
+            for evaluationT in listEvaluation:
+                yield runFunc(evaluationT)
+            # end for
+            return
+        # end if
+
+        self.start()
+        for evaluationT in self.pool.imap(runFunc, listEvaluation, chunksize = 1):
+            yield evaluationT
+        # end for
+
+    # end stream
+
+    def submit(self, runFunc, evaluationT):
+        """ start runFunc on the evaluation without waiting (the evaluation is retrieved with wait) """
+
+        self.pendingCount += 1
+
+        if not self.isConcurrent():
+            self.doneQueue.put(runFunc(evaluationT))
+            return
+        # end if
+
+        self.start()
+        self.pool.apply_async(runFunc, (evaluationT,), callback = self.doneQueue.put)
+
+    # end submit
+
+    def put(self, evaluationT):
+        """ add an evaluation already done (e.g. memoized) without running it (the evaluation is retrieved with wait) """
+
+        self.pendingCount += 1
+        self.doneQueue.put(evaluationT)
+
+    # end put
+
+    def wait(self):
+        """ wait for the next submitted evaluation done, in the completion order (None if no evaluation pending) """
+
+        if self.pendingCount < 1:
+            return None
+        # end if
+
+        # a timeout is given to keep the main thread responsive (KeyboardInterrupt)
+        while True:
+            try:
+                evaluationT = self.doneQueue.get(True, 1.0)
+                break
+            except queue.Empty:
+                pass
+            # end try
+        # end while
+
+        self.pendingCount -= 1
+        return evaluationT
+
+    # end wait
+
+    def getPending(self):
+        return self.pendingCount
+    # end getPending
+
+    @staticmethod
+    def createSandbox(sandboxDir):
+        """ create an empty sandbox directory (removing any previous content) """
+
+        if os.path.isdir(sandboxDir):
+            shutil.rmtree(sandboxDir, ignore_errors = True)
+        # end if
+        os.makedirs(sandboxDir)
+
+    # end createSandbox
+
+    @staticmethod
+    def linkFile(pathFrom, pathTo):
+        """ hard link an unchanged file in a sandbox (copied if hard links are not supported) """
+
+        try:
+            os.link(pathFrom, pathTo)
+        except:
+            shutil.copyfile(pathFrom, pathTo)
+        # end try
+
+    # end linkFile
+
+    @staticmethod
+    def removeSandbox(sandboxDir):
+        """ remove a sandbox directory and its content """
+
+        try:
+            if os.path.isdir(sandboxDir):
+                shutil.rmtree(sandboxDir, ignore_errors = True)
+            # end if
+        except:
+            pass
+        # end try
+
+    # end removeSandbox
+
+# end slalomEngine
@@ -0,0 +1,587 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================
+# SLALOM - Open-Source Solar Cell Multivariate Optimizer
+# Copyright(C) 2012-2019 Sidi OULD SAAD HAMADY (1,2,*), Nicolas FRESSENGEAS (1,2). All rights reserved.
+# (1) Université de Lorraine, Laboratoire Matériaux Optiques, Photonique et Systèmes, Metz, F-57070, France
+# (2) Laboratoire Matériaux Optiques, Photonique et Systèmes, CentraleSupélec, Université Paris-Saclay, Metz, F-57070, France
+# (*) sidi.hamady@univ-lorraine.fr
+# SLALOM source code is available to download from:
+# https://github.com/sidihamady/SLALOM
+# https://hal.archives-ouvertes.fr/hal-01897934
+# http://www.hamady.org/photovoltaics/slalom_source.zip
+# Cite as: S Ould Saad Hamady and N Fressengeas, EPJ Photovoltaics, 9:13, 2018.
+# See Copyright Notice in COPYRIGHT
+# ======================================================================================================
+
+# ------------------------------------------------------------------------------------------------------
+# File:           slalomJV.py
+# Type:           Class and Module
+# Use:            slalomJV is used by slalomCore.py
+#                  it reads the J-V characteristic calculated by the simulator (simuloutput_jv.log)...
+#                  ...in one pass into NumPy arrays, and keeps the photovoltaic part (J-V from 0 V to Voc)...
+#                  ...written in simuloutput_jvp.log.
+#                 extractPV calculates the photovoltaic figures of merit (Jsc, Voc, Jm, Vm, Pmax, FF)...
+#                  ...of one J-V curve or of a stack of curves at once.
+#                 To run the parser and extractPV micro-benchmarks from the console type:
+#                   python slalomJV.py
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import math
+import time
+import tempfile
+
+import numpy as np
+from scipy import interpolate
+
+class slalomJV(object):
+    """ the J-V characteristic read from the simulator output """
+
+    # voltages below DblPrecision (in absolute value) are set to zero
+    DblPrecision = 1e-13
+
+    def __init__(self):
+        """ slalomJV constructor """
+
+        # the J-V points kept (voltage in increasing order, up to the third point in direct polarization)
+        self.voltage = np.array([])
+        self.current = np.array([])
+        self.power = np.array([])
+
+        # number of points with V*J < 0 (the photovoltaic part)
+        self.pvPoints = 0
+
+        # the voltage before the first point in direct polarization (Voc approximation)
+        self.vocx = 0.0
+
+        # the photovoltaic part of the file (header lines and J-V points with V*J <= 0)
+        self.content = ""
+
+        # position of the last line read (the third point in direct polarization), None if the whole file is read
+        self.lastLine = None
+
+    # end __init__
+
+    @staticmethod
+    def read(pathJV, dataSeparator = " ", linesToSkip = 4):
+        """ read the J-V file: the comment and the linesToSkip first lines are the header...
+            ...the voltage should be in increasing order: the points not in increasing order are skipped...
+            ...raises ValueError if the file content is not valid """
+
+        fileT = open(pathJV, "r")
+        listLine = fileT.readlines()
+        fileT.close()
+
+        return slalomJV.readLines(listLine, dataSeparator, linesToSkip)
+
+    # end read
+
+    @staticmethod
+    def readLines(listLine, dataSeparator = " ", linesToSkip = 4):
+        """ read the J-V file content already loaded (list of lines, e.g. from an archive): see read """
+
+        # header lines (kept in the JVP content) and data lines positions
+        listHeader = list()
+        listData = list()
+        iLine = 0
+        for ii in range(0, len(listLine)):
+            if listLine[ii].startswith("#"):
+                listHeader.append(ii)
+            elif iLine < linesToSkip:
+                iLine += 1
+                listHeader.append(ii)
+            else:
+                listData.append(ii)
+            # end if
+        # end for
+
+        arrV, arrJ, arrPos, iError = slalomJV.parse(listLine, listData, dataSeparator)
+
+        jvT = slalomJV.filter(listLine, listHeader, arrV, arrJ, arrPos)
+
+        # a line not valid is an error only if read, i.e. before the third point in direct polarization
+        if (iError is not None) and ((jvT.lastLine is None) or (jvT.lastLine > iError)):
+            raise ValueError("J-V file content not valid (line %d)" % (iError + 1))
+        # end if
+
+        return jvT
+
+    # end readLines
+
+    @staticmethod
+    def parse(listLine, listData, dataSeparator):
+        """ convert the data lines (two first columns) to arrays: voltage, current and line position...
+            ...and the position of the first line not valid (None if all valid) """
+
+        nData = len(listData)
+        if nData < 1:
+            return np.array([]), np.array([]), np.array([], dtype=int), None
+        # end if
+
+        # the columns separated by spaces or tabs, whatever their number, if the separator is a space
+        strSep = None if (dataSeparator.strip() == "") else dataSeparator
+
+        # all the data lines converted at once (the lines with less than two columns are skipped)
+        listField = [listLine[ii].split(strSep) for ii in listData]
+        listPos = [listData[ii] for ii in range(0, nData) if (len(listField[ii]) >= 2)]
+        if len(listPos) < 1:
+            return np.array([]), np.array([]), np.array([], dtype=int), None
+        # end if
+        try:
+            listValid = [fieldT for fieldT in listField if (len(fieldT) >= 2)]
+            arrV = np.fromiter(map(float, [fieldT[0] for fieldT in listValid]), dtype=float, count=len(listPos))
+            arrJ = np.fromiter(map(float, [fieldT[1] for fieldT in listValid]), dtype=float, count=len(listPos))
+            return arrV, arrJ, np.array(listPos, dtype=int), None
+        except ValueError:
+            pass
+        # end try
+
+        # a value not valid: converted line by line, in preallocated arrays, up to the line not valid
+        arrV = np.empty(nData)
+        arrJ = np.empty(nData)
+        arrPos = np.empty(nData, dtype=int)
+        nn = 0
+        iError = None
+        for ii in range(0, nData):
+            fieldT = listField[ii]
+            if len(fieldT) < 2:
+                continue
+            # end if
+            try:
+                arrV[nn] = float(fieldT[0])
+                arrJ[nn] = float(fieldT[1])
+            except ValueError:
+                iError = listData[ii]
+                break
+            # end try
+            arrPos[nn] = listData[ii]
+            nn += 1
+        # end for
+
+        return arrV[0:nn], arrJ[0:nn], arrPos[0:nn], iError
+
+    # end parse
+
+    @staticmethod
+    def filter(listLine, listHeader, arrV, arrJ, arrPos):
+        """ keep the points in increasing voltage order, up to the third point in direct polarization (V > 0 and J > 0) """
+
+        jvT = slalomJV()
+        nData = len(arrV)
+
+        arrP = np.fabs(arrV * arrJ)
+        arrVz = np.where(np.fabs(arrV) < slalomJV.DblPrecision, 0.0, arrV)
+
+        # the first point kept is the one before the first voltage increase
+        iFirst = -1
+        if nData >= 2:
+            arrInc = np.nonzero(arrV[1:] > arrV[0:-1])[0]
+            if len(arrInc) > 0:
+                iFirst = int(arrInc[0])
+            # end if
+        # end if
+
+        if iFirst < 0:
+            jvT.content = "".join([listLine[ii] for ii in listHeader])
+            return jvT
+        # end if
+
+        # next points: kept if the voltage is greater than the previous line voltage...
+        # ...(the point just after the first one is compared to the first one)
+        iStart = iFirst + 2
+        arrPrev = np.empty(nData)
+        arrPrev[iStart:] = arrV[iStart - 1:-1]
+        if iStart < nData:
+            arrPrev[iStart] = arrV[iFirst]
+        # end if
+        arrKeep = np.zeros(nData, dtype=bool)
+        arrKeep[iStart:] = arrV[iStart:] > arrPrev[iStart:]
+
+        # a point kept with its voltage set to zero is compared with the zero voltage
+        for ii in (np.nonzero(arrVz[iStart:-1] != arrV[iStart:-1])[0] + iStart):
+            if arrKeep[ii]:
+                arrPrev[ii + 1] = arrVz[ii]
+                arrKeep[ii + 1] = arrV[ii + 1] > arrPrev[ii + 1]
+            # end if
+        # end for
+
+        arrIndex = np.nonzero(arrKeep)[0]
+
+        # stop after the third point in direct polarization
+        arrDirect = np.nonzero((arrVz[arrIndex] > 0.0) & (arrJ[arrIndex] > 0.0))[0]
+        if len(arrDirect) > 0:
+            jvT.vocx = float(arrPrev[arrIndex[arrDirect[0]]])
+        # end if
+        if len(arrDirect) > 2:
+            arrIndex = arrIndex[0:arrDirect[2] + 1]
+        # end if
+
+        jvT.voltage = np.concatenate(([arrV[iFirst]], arrVz[arrIndex]))
+        jvT.current = np.concatenate(([arrJ[iFirst]], arrJ[arrIndex]))
+        jvT.power = np.concatenate(([arrP[iFirst]], arrP[arrIndex]))
+
+        arrVJ = arrVz[arrIndex] * arrJ[arrIndex]
+        jvT.pvPoints = int(np.count_nonzero(arrVJ < 0.0))
+
+        # the header lines before the last point read and the photovoltaic points, in the file order
+        if len(arrDirect) > 2:
+            jvT.lastLine = int(arrPos[arrIndex[-1]])
+        # end if
+        iLast = jvT.lastLine if (jvT.lastLine is not None) else len(listLine)
+        listPos = [ii for ii in listHeader if ii < iLast]
+        listPos += arrPos[arrIndex[arrVJ <= 0.0]].tolist()
+        listPos.sort()
+        jvT.content = "".join([listLine[ii] for ii in listPos])
+
+        return jvT
+
+    # end filter
+
+    def writeContent(self, pathJVP):
+        """ write the photovoltaic part (J-V from 0 V to Voc) in one write """
+
+        fileJVP = open(pathJVP, "w")
+        fileJVP.write(self.content)
+        fileJVP.close()
+
+    # end writeContent
+
+# end slalomJV
+
+def extractPV(voltage, current, power = None):
+    """ photovoltaic figures of merit from J-V curves (J in mA/cm2, negative in the photovoltaic quadrant):...
+        ...voltage and current are one curve (1-D) or a stack of curves (2-D, one curve per row, voltage possibly 1-D if shared)...
+        ...power (|V*J|, optional, same shape as current) is used for the maximum power point instead of -V*J...
+        ...returns (Jsc, Voc, Jm, Vm, Pmax, FF): Jsc and Jm positive (mA/cm2), Voc and Vm in V, Pmax in mW/cm2, FF in %...
+        ...scalars for one curve and arrays for a stack, NaN if not found """
+
+    # the curves without crossing or maximum give NaN: no floating point warning
+    errT = np.seterr(all = "ignore")
+
+    isStack = (np.ndim(current) == 2)
+    arrJ = np.atleast_2d(np.asarray(current, dtype=float))
+    arrV = np.broadcast_to(np.atleast_2d(np.asarray(voltage, dtype=float)), arrJ.shape)
+    nCurves, nPoints = arrJ.shape
+    arrRow = np.arange(nCurves)
+    arrNaN = np.full(nCurves, np.nan)
+
+    if nPoints < 3:
+        np.seterr(**errT)
+        listPV = [arrNaN] * 6
+        return tuple(listPV) if isStack else tuple([float(fT[0]) for fT in listPV])
+    # end if
+
+    def getFirst(arrMask):
+        # first True index in each row, -1 if none
+        arrIndex = np.argmax(arrMask, axis = 1)
+        return np.where(arrMask[arrRow, arrIndex], arrIndex, -1)
+    # end getFirst
+
+    # Short-circuit current: V crossing zero (sign change), J linearly interpolated at V = 0
+    arrIndex = getFirst((arrV[:, 0:-1] <= 0.0) & (arrV[:, 1:] > 0.0))
+    arrFound = (arrIndex >= 0)
+    arrK = np.where(arrFound, arrIndex, 0)
+    fV0, fV1 = arrV[arrRow, arrK], arrV[arrRow, arrK + 1]
+    fJ0, fJ1 = arrJ[arrRow, arrK], arrJ[arrRow, arrK + 1]
+    arrJsc = np.where(arrFound, -(fJ0 + (fJ1 - fJ0) * (0.0 - fV0) / (fV1 - fV0)), arrNaN)
+
+    # Open-circuit voltage: J crossing zero (from negative to positive), V inversely interpolated at J = 0
+    arrIndex = getFirst((arrJ[:, 0:-1] < 0.0) & (arrJ[:, 1:] >= 0.0))
+    arrFound = (arrIndex >= 0)
+    arrK = np.where(arrFound, arrIndex, 0)
+    fV0, fV1 = arrV[arrRow, arrK], arrV[arrRow, arrK + 1]
+    fJ0, fJ1 = arrJ[arrRow, arrK], arrJ[arrRow, arrK + 1]
+    arrVoc = np.where(arrFound, fV0 + (fV1 - fV0) * (0.0 - fJ0) / np.where(arrFound, fJ1 - fJ0, 1.0), arrNaN)
+
+    # Maximum power point: argmax in the photovoltaic quadrant, refined with a parabola through the three points around
+    arrP = (-arrV * arrJ) if (power is None) else np.broadcast_to(np.atleast_2d(np.asarray(power, dtype=float)), arrJ.shape)
+    arrMask = (arrV >= 0.0) & (arrJ <= 0.0)
+    arrK = np.argmax(np.where(arrMask, arrP, -np.inf), axis = 1)
+    arrKc = np.clip(arrK, 1, nPoints - 2)
+    arrFound = (arrK >= 1) & (arrK <= (nPoints - 2)) & arrMask[arrRow, arrKc - 1] & arrMask[arrRow, arrKc] & arrMask[arrRow, arrKc + 1]
+    fPm, fP0, fPp = arrP[arrRow, arrKc - 1], arrP[arrRow, arrKc], arrP[arrRow, arrKc + 1]
+    fDenom = fPm - (2.0 * fP0) + fPp
+    arrOffset = np.where(fDenom < 0.0, 0.5 * (fPm - fPp) / np.where(fDenom < 0.0, fDenom, -1.0), 0.0)
+    arrVm = np.where(arrFound, arrV[arrRow, arrKc] + arrOffset * 0.5 * (arrV[arrRow, arrKc + 1] - arrV[arrRow, arrKc - 1]), arrNaN)
+    arrPmax = np.where(arrFound, fP0 - 0.25 * (fPm - fPp) * arrOffset, arrNaN)
+    arrJm = np.where(arrFound & (arrVm > 0.0), arrPmax / np.where(arrVm > 0.0, arrVm, 1.0), arrNaN)
+
+    # Fill factor
+    arrFF = 100.0 * arrPmax / np.fabs(arrJsc * arrVoc)
+
+    np.seterr(**errT)
+
+    listPV = [arrJsc, arrVoc, arrJm, arrVm, arrPmax, arrFF]
+    return tuple(listPV) if isStack else tuple([float(fT[0]) for fT in listPV])
+
+# end extractPV
+
+def calcEfficiency(jvT, Psolar = 100.037, interpKind = 'cubic', ffMax = 95.0, windowLen = 8):
+    """ photovoltaic figures of merit of the J-V characteristic read (jvT, with at least 12 photovoltaic points):...
+        ...the J-V curve is interpolated on a grid windowLen times finer (current linear, power interpKind)...
+        ...Psolar is the incident power density (mW/cm2, Atlas default AM 1.5 spectrum gives 100.037 mW/cm2)...
+        ...and the maximum power is not valid if the fill factor reaches ffMax (%)...
+        ...returns (efficiency, Jm, Vm, FF, Jsc, Voc, warning): warning is None if all the figures of merit are found """
+
+    arrVoltage = jvT.voltage
+    arrCurrent = jvT.current
+    arrPower = jvT.power
+    iPoints = len(arrVoltage)
+    fVocx = jvT.vocx
+
+    fJm = 0.0
+    fVm = 0.0
+    fFF = 0.0
+    fJsc = 0.0
+    fVoc = 0.0
+    Pmax = 0.0
+    strWarning = None
+
+    # interpolate the J-V data to accurately calculate the efficiency
+    funcCurrent = interpolate.interp1d(arrVoltage, arrCurrent, kind='slinear')
+    funcPower = interpolate.interp1d(arrVoltage, arrPower, kind=interpKind)
+    iPointsNew = iPoints * windowLen
+    #
+
+    dV = (arrVoltage[iPoints - 1] - arrVoltage[0]) / float(iPointsNew - 1)
+    arrVoltageNew = np.arange(arrVoltage[0], arrVoltage[iPoints - 1] + dV, dV)
+    iPointsNew = len(arrVoltageNew)
+
+    iC = iPointsNew
+    for ii in range(iPointsNew - 1, iPointsNew - windowLen - 1, -1):
+        if (arrVoltageNew[ii] > arrVoltage[iPoints - 1]):
+            iC -= 1
+        else:
+            break
+        # end if
+    # end for
+    if iC < iPointsNew:
+        arrVoltageNew = np.delete(arrVoltageNew, np.arange(iC, iPointsNew, 1))
+        iPointsNew = len(arrVoltageNew)
+    # end for
+
+    arrCurrentNew = funcCurrent(arrVoltageNew)
+    arrPowerNew = funcPower(arrVoltageNew)
+
+    # Find PV parameters (zero crossings and maximum power point)
+    fJscPV, fVocPV, fJmPV, fVmPV, PmaxPV, fFFPV = extractPV(arrVoltageNew, arrCurrentNew, arrPowerNew)
+
+    bFoundJsc = not math.isnan(fJscPV)
+    bFoundVoc = not math.isnan(fVocPV)
+    bFoundPmax = not math.isnan(PmaxPV)
+
+    # Short-circuit current (mA/cm2)
+    if bFoundJsc:
+        fJsc = fJscPV
+    elif ((arrCurrentNew[0] < 0.0) and (arrVoltageNew[0] > 0.0)):
+        fJsc = -arrCurrentNew[0]
+    # end if
+
+    # Open-circuit voltage (V)
+    if bFoundVoc:
+        fVoc = fVocPV
+    elif ((arrCurrentNew[iPointsNew - 1] < 0.0) and (arrVoltageNew[iPointsNew - 1] > 0.0)):
+        fVoc = arrVoltageNew[iPointsNew - 1]
+    elif (fVocx > 0.01):
+        fVoc = fVocx
+        bFoundVoc = True
+    # end if
+
+    # Maximum power (mW/cm2), the current being negative
+    if bFoundPmax:
+        fJm = -fJmPV
+        fVm = fVmPV
+        Pmax = PmaxPV
+    # end if
+
+    if ((bFoundJsc == True) and (bFoundVoc == True) and (bFoundPmax == True)):
+        fFF = 100.0 * Pmax / math.fabs(fJsc * fVoc)
+        if (fFF >= ffMax):
+            bFoundPmax = False
+        # end if
+    # end if
+
+    if ((bFoundJsc == False) or (bFoundVoc == False) or (bFoundPmax == False)):
+        strWarning = "Cannot evaluate efficiency: "
+        if bFoundJsc:
+            strWarning += ("  JSC = %.5f mA/cm2" % math.fabs(fJsc))
+        else:
+            strWarning += "  JSC not found"
+        # end if
+        if bFoundVoc:
+            strWarning += ("  VOC = %.5f V" % math.fabs(fVoc))
+        else:
+            strWarning += "  VOC not found"
+        # end if
+        if bFoundPmax:
+            strWarning += ("  Pmax = %.5f mW/cm2" % Pmax)
+        else:
+            strWarning += "  Pmax not found"
+            Pmax = 0.0
+        # end if
+        strWarning += "\n -> increase V-range and/or decrease V-step"
+    # end if
+
+    outputT = 100.0 * Pmax / Psolar
+    if (outputT == 0.0):
+        fJsc = 0.0
+        fVoc = 0.0
+        fFF = 0.0
+    # end if
+
+    return outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning
+
+# end calcEfficiency
+
+def readJVLegacy(pathJV, dataSeparator = " ", linesToSkip = 4):
+    """ the previous line by line J-V reader (growing the arrays with np.append), used by the benchmark """
+
+    arrVoltage = np.array([])
+    arrCurrent = np.array([])
+    arrPower = np.array([])
+    iLine = 0
+    iVpos = 0
+    iPVPoints = 0
+    fVocx = 0.0
+    fVprev = 0.0
+    fJprev = 0.0
+    fPprev = 0.0
+    bStarted = False
+    bFirstV = False
+    JVPcontent = ""
+
+    fileT = open(pathJV, "r")
+    for lineT in fileT:
+        if (lineT.startswith("#")):
+            JVPcontent += lineT
+            continue
+        # end if
+        if iLine < linesToSkip:
+            iLine += 1
+            JVPcontent += lineT
+            continue
+        # end if
+        arrLine = lineT.split(dataSeparator)
+        if (len(arrLine) < 2):
+            continue
+        # end if
+        fV = float(arrLine[0])
+        fJ = float(arrLine[1])
+        fP = math.fabs(fV * fJ)
+        if (False == bStarted):
+            bStarted = True
+            fVprev = fV
+            fJprev = fJ
+            fPprev = fP
+            continue
+        # end if
+        if (fV <= fVprev):
+            fVprev = fV
+            fJprev = fJ
+            fPprev = fP
+            continue
+        # end if
+        if (math.fabs(fV) < slalomJV.DblPrecision):
+            fV = 0.0
+        # end if
+        if (False == bFirstV):
+            bFirstV = True
+            arrVoltage = np.append(arrVoltage, fVprev)
+            arrCurrent = np.append(arrCurrent, fJprev)
+            arrPower = np.append(arrPower, fPprev)
+            continue
+        # end if
+        arrVoltage = np.append(arrVoltage, fV)
+        arrCurrent = np.append(arrCurrent, fJ)
+        arrPower = np.append(arrPower, fP)
+        if (fV * fJ) <= 0.0:
+            JVPcontent += lineT
+        # end if
+        if ((fV > 0.0) and (fJ > 0.0)):
+            if (iVpos == 0):
+                fVocx = fVprev
+            # end if
+            iVpos += 1
+            if (iVpos > 2):
+                break
+            # end if
+        # end if
+        if ((fV * fJ) < 0.0):
+            iPVPoints += 1
+        #end if
+        fVprev = fV
+        iLine += 1
+    # end for
+    fileT.close()
+
+    return arrVoltage, arrCurrent, arrPower, iPVPoints, fVocx, JVPcontent
+
+# end readJVLegacy
+
+def benchmarkJV(listPoints = [1000, 10000, 100000]):
+    """ J-V reader micro-benchmark: synthetic diode curves, the results compared to the previous reader """
+
+    dirT = tempfile.mkdtemp()
+    pathJV = os.path.join(dirT, "simuloutput_jv.log")
+
+    for nPoints in listPoints:
+        # a diode J-V curve from -0.1 V to 1.4 V with some repeated voltages (as the simulator gives)
+        arrV = np.linspace(-0.1, 1.4, nPoints)
+        arrV[nPoints // 3] = arrV[(nPoints // 3) - 1]
+        arrJ = 1e-12 * (np.exp(arrV / 0.0389) - 1.0) - 20.0
+        fileT = open(pathJV, "w")
+        fileT.write("# benchmark\nv ATLAS\nheader\nheader\nheader\n")
+        fileT.write("".join([("%.6e %.6e\n" % (arrV[ii], arrJ[ii])) for ii in range(0, nPoints)]))
+        fileT.close()
+
+        ticT = time.time()
+        jvT = slalomJV.read(pathJV)
+        durationT = time.time() - ticT
+
+        legacyLimit = 20000
+        if nPoints <= legacyLimit:
+            ticT = time.time()
+            arrVoltage, arrCurrent, arrPower, iPVPoints, fVocx, JVPcontent = readJVLegacy(pathJV)
+            durationLegacy = time.time() - ticT
+            isSame = (np.array_equal(arrVoltage, jvT.voltage) and np.array_equal(arrCurrent, jvT.current) and np.array_equal(arrPower, jvT.power)
+                      and (iPVPoints == jvT.pvPoints) and (fVocx == jvT.vocx) and (JVPcontent == jvT.content))
+            print("%7d points: %8.2f ms (previous reader: %8.2f ms, %s results)" % (nPoints, 1000.0 * durationT, 1000.0 * durationLegacy, "same" if isSame else "DIFFERENT"))
+        else:
+            print("%7d points: %8.2f ms (previous reader: skipped above %d points)" % (nPoints, 1000.0 * durationT, legacyLimit))
+        # end if
+    # end for
+
+    try:
+        os.unlink(pathJV)
+        os.rmdir(dirT)
+    except:
+        pass
+    # end try
+
+# end benchmarkJV
+
+def benchmarkPV(nCurves = 1000, nPoints = 1000):
+    """ extractPV micro-benchmark: a stack of synthetic diode curves, Jsc and Voc compared to their exact values """
+
+    arrV = np.linspace(-0.1, 1.4, nPoints)
+    arrJph = np.linspace(5.0, 40.0, nCurves)
+    fJ0 = 1e-12
+    fVt = 0.0389
+    arrJ = (fJ0 * (np.exp(arrV / fVt) - 1.0))[np.newaxis, :] - arrJph[:, np.newaxis]
+
+    ticT = time.time()
+    arrJsc, arrVoc, arrJm, arrVm, arrPmax, arrFF = extractPV(arrV, arrJ)
+    durationT = time.time() - ticT
+
+    errJsc = np.max(np.fabs(arrJsc - arrJph))
+    errVoc = np.max(np.fabs(arrVoc - fVt * np.log(1.0 + (arrJph / fJ0))))
+    print("%7d curves of %d points: %8.2f ms (Jsc error: %.3g mA/cm2, Voc error: %.3g V)" % (nCurves, nPoints, 1000.0 * durationT, errJsc, errVoc))
+
+# end benchmarkPV
+
+if __name__ == "__main__":
+    benchmarkJV()
+    benchmarkPV()
+# end if
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================
+# SLALOM - Open-Source Solar Cell Multivariate Optimizer
+# Copyright(C) 2012-2019 Sidi OULD SAAD HAMADY (1,2,*), Nicolas FRESSENGEAS (1,2). All rights reserved.
+# (1) Université de Lorraine, Laboratoire Matériaux Optiques, Photonique et Systèmes, Metz, F-57070, France
+# (2) Laboratoire Matériaux Optiques, Photonique et Systèmes, CentraleSupélec, Université Paris-Saclay, Metz, F-57070, France
+# (*) sidi.hamady@univ-lorraine.fr
+# SLALOM source code is available to download from:
+# https://github.com/sidihamady/SLALOM
+# https://hal.archives-ouvertes.fr/hal-01897934
+# http://www.hamady.org/photovoltaics/slalom_source.zip
+# Cite as: S Ould Saad Hamady and N Fressengeas, EPJ Photovoltaics, 9:13, 2018.
+# See Copyright Notice in COPYRIGHT
+# ======================================================================================================
+
+# ------------------------------------------------------------------------------------------------------
+# File:           slalomOffline.py
+# Type:           Module
+# Use:            slalomOffline re-analyzes the J-V characteristics saved by an optimization...
+#                  ...(simuloutput_jv_<index>_<date>.log in the output directory or in its zip archive, their header...
+#                  ...joined from simuloutput_manifest.jsonl if archived without header)...
+#                  ...without running the simulator again: the figures of merit are calculated as in...
+#                  ...slalomCore (slalomJV.calcEfficiency) through a pool of processes...
+#                  ...and the refreshed results table written (same columns as simuloutput_optimized.txt).
+#                 If the J-V file of an evaluation is not saved (cached evaluation), its J-V from 0 V to Voc is listed...
+#                  ...as failed (Voc and FF cannot be evaluated from it), as the J-V files giving a warning.
+#                 To re-analyze from the console type (output directories and/or zip archives):
+#                   python slalomOffline.py --output results.txt --workers 8 path/to/outputdir path/to/output.zip
+#                  options: --psolar 100.037 (mW/cm2) --interp cubic (power interpolation) --ffmax 95 (FF limit in %)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import re
+import math
+import sys
+import time
+import getopt
+import zipfile
+import datetime
+import traceback
+import multiprocessing
+
+from slalomJV import *
+from slalomStore import *
+
+# the J-V files written by slalomCore (updateOutputFile): <name>_<index>_<date>.log
+JVPattern = re.compile(r"^simuloutput_(jv|jvp)_(\d+)_(\d{8}-\d{6})\.log$")
+
+# the J-V file format (same for all the supported simulators)
+DataSeparator = " "
+LinesToSkip = 4
+
+# the minimum number of points with V*J < 0 (as in slalomCore.getEfficiency)
+PVPointsMin = 12
+
+def findJV(pathSource):
+    """ list the J-V files of an output directory or zip archive, sorted by index:...
+        ...list of (index, date, name), the J-V from 0 V to Voc listed only if the J-V file is not saved """
+
+    if zipfile.is_zipfile(pathSource):
+        zipT = zipfile.ZipFile(pathSource, "r")
+        listName = zipT.namelist()
+        zipT.close()
+    else:
+        listName = os.listdir(pathSource)
+    # end if
+
+    dictJV = dict()
+    for nameT in listName:
+        matchT = JVPattern.match(os.path.basename(nameT))
+        if matchT is None:
+            continue
+        # end if
+        keyT = (int(matchT.group(2)), matchT.group(3))
+        if (matchT.group(1) == "jv") or (keyT not in dictJV):
+            dictJV[keyT] = nameT
+        # end if
+    # end for
+
+    return [(keyT[0], keyT[1], dictJV[keyT]) for keyT in sorted(dictJV.keys())]
+
+# end findJV
+
+def analyzeLines(listLine, Psolar = 100.037, interpKind = 'cubic', ffMax = 95.0):
+    """ figures of merit of one saved J-V file content:...
+        ...returns (paramName, paramValue, figures of merit as calculated by calcEfficiency or None, warning) """
+
+    # the header written by slalomCore: title, comment, parameters name and value
+    listComment = [lineT[1:].strip() for lineT in listLine if lineT.startswith("#")]
+    paramName = listComment[2].split("\t") if (len(listComment) > 3) else []
+    paramValue = listComment[3].split("\t") if (len(listComment) > 3) else []
+
+    try:
+        jvT = slalomJV.readLines(listLine, DataSeparator, LinesToSkip)
+    except Exception as excT:
+        return paramName, paramValue, None, str(excT)
+    # end try
+
+    if jvT.pvPoints < PVPointsMin:
+        return paramName, paramValue, None, ("Cannot evaluate efficiency: J-V curve has less than %d points with V*J < 0" % PVPointsMin)
+    # end if
+
+    try:
+        figureT = calcEfficiency(jvT, Psolar = Psolar, interpKind = interpKind, ffMax = ffMax)
+    except:
+        return paramName, paramValue, None, traceback.format_exc().strip().split("\n")[-1]
+    # end try
+
+    # some figures of merit not found (as in slalomCore.getEfficiency, the evaluation failed)
+    if figureT[6] is not None:
+        return paramName, paramValue, None, figureT[6]
+    # end if
+
+    return paramName, paramValue, figureT[0:6], None
+
+# end analyzeLines
+
+def analyzeChunk(taskT):
+    """ analyze a chunk of J-V files (run in a worker process)...
+        ...taskT: (source index, source path, list of (index, date, name), Psolar, interpKind, ffMax) """
+
+    sourceIndex, pathSource, listJV, Psolar, interpKind, ffMax = taskT
+
+    zipT = zipfile.ZipFile(pathSource, "r") if zipfile.is_zipfile(pathSource) else None
+
+    # the headers of the J-V files archived without header (outputArchive "rename")
+    dictManifest = dict()
+    try:
+        if zipT is not None:
+            listName = [nameT for nameT in zipT.namelist() if (os.path.basename(nameT) == slalomStore.manifestFilename)]
+            if len(listName) > 0:
+                dictManifest, sizeT = slalomStore.parseManifest(zipT.read(listName[0]).decode("utf-8", "replace"))
+            # end if
+        else:
+            dictManifest = slalomStore.readManifest(pathSource)
+        # end if
+    except:
+        dictManifest = dict()
+    # end try
+
+    listRow = list()
+    for indexT, dateT, nameT in listJV:
+        try:
+            if zipT is not None:
+                strContent = zipT.read(nameT).decode("utf-8", "replace")
+            else:
+                fileT = open(os.path.join(pathSource, nameT), "r")
+                strContent = fileT.read()
+                fileT.close()
+            # end if
+            listLine = slalomStore.joinHeader(strContent, nameT, dictManifest).splitlines(True)
+            paramName, paramValue, figureT, strWarning = analyzeLines(listLine, Psolar, interpKind, ffMax)
+            if JVPattern.match(os.path.basename(nameT)).group(1) == "jvp":
+                # only the J-V from 0 V to Voc saved (cached evaluation): no point beyond Voc, Voc and FF not found
+                figureT, strWarning = None, "J-V from 0 V to Voc only (cached evaluation): Voc and FF cannot be evaluated"
+            # end if
+        except:
+            paramName, paramValue, figureT, strWarning = [], [], None, traceback.format_exc().strip().split("\n")[-1]
+        # end try
+        listRow.append((sourceIndex, indexT, dateT, nameT, paramName, paramValue, figureT, strWarning))
+    # end for
+
+    if zipT is not None:
+        zipT.close()
+    # end if
+
+    return listRow
+
+# end analyzeChunk
+
+def isFailed(rowT):
+    """ the efficiency of a row cannot be evaluated (figures of merit not found or warning) """
+    return (rowT[6] is None) or bool(rowT[7])
+# end isFailed
+
+def formatRow(rowT):
+    """ one results table row, as in simuloutput_optimized.txt (commented out if the efficiency cannot be evaluated) """
+
+    sourceIndex, indexT, dateT, nameT, paramName, paramValue, figureT, strWarning = rowT
+
+    # the index as formatted in the file name
+    strT = JVPattern.match(os.path.basename(nameT)).group(2) + "\t" + dateT + "\t"
+    strT += "".join([(valueT + "\t") for valueT in paramValue])
+
+    if isFailed(rowT):
+        return "# " + strT + "failed: " + (strWarning.replace("\n", " ") if strWarning else "?") + "\n"
+    # end if
+
+    outputT, fJm, fVm, fFF, fJsc, fVoc = figureT
+    strT += ("%08.5f\t" % math.fabs(fJm)) + ("%08.5f\t" % fVm) + ("%08.5f\t" % fFF) + ("%08.5f\t" % math.fabs(fJsc)) + ("%08.5f\t" % math.fabs(fVoc)) + ("%08.5f" % outputT) + "\n"
+    return strT
+
+# end formatRow
+
+def reanalyze(listSource, outputFilename, workerCount = None, Psolar = 100.037, interpKind = 'cubic', ffMax = 95.0, chunkSize = 64):
+    """ re-analyze the J-V files of the output directories and zip archives in listSource...
+        ...and write the results table in outputFilename. Returns the number of (analyzed, failed) J-V files """
+
+    if workerCount is None:
+        workerCount = multiprocessing.cpu_count()
+    # end if
+    workerCount = max(1, int(workerCount))
+
+    ticT = time.time()
+
+    # the tasks: chunks of J-V files, each worker process opening the archive once per chunk
+    listTask = list()
+    for sourceIndex in range(0, len(listSource)):
+        listJV = findJV(listSource[sourceIndex])
+        for ii in range(0, len(listJV), chunkSize):
+            listTask.append((sourceIndex, listSource[sourceIndex], listJV[ii:ii + chunkSize], Psolar, interpKind, ffMax))
+        # end for
+    # end for
+
+    listRow = list()
+    if (workerCount > 1) and (len(listTask) > 1):
+        poolT = multiprocessing.Pool(processes = min(workerCount, len(listTask)))
+        try:
+            for listRowT in poolT.imap_unordered(analyzeChunk, listTask, chunksize = 1):
+                listRow.extend(listRowT)
+            # end for
+            poolT.close()
+        except:
+            poolT.terminate()
+            raise
+        finally:
+            poolT.join()
+        # end try
+    else:
+        for taskT in listTask:
+            listRow.extend(analyzeChunk(taskT))
+        # end for
+    # end if
+
+    # the rows in the source then index order
+    listRow.sort(key = lambda rowT: (rowT[0], rowT[1], rowT[2]))
+
+    dateStr = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    failedCount = 0
+
+    fileT = open(outputFilename, "w")
+    fileT.write("# ---------------------------------------------------------------\n")
+    fileT.write("# SLALOM re-analysis @ " + dateStr + "\n")
+    fileT.write("# Psolar: %g mW/cm2\tInterpolation: %s\tFF limit: %g %%\n" % (Psolar, interpKind, ffMax))
+    fileT.write("# ---------------------------------------------------------------\n")
+    iRow = 0
+    for sourceIndex in range(0, len(listSource)):
+        fileT.write("\n# Source: " + listSource[sourceIndex] + "\n")
+        paramHeader = None
+        while (iRow < len(listRow)) and (listRow[iRow][0] == sourceIndex):
+            rowT = listRow[iRow]
+            if (paramHeader is None) and (len(rowT[4]) > 0):
+                paramHeader = rowT[4]
+                fileT.write("Index\tTime\t" + "".join([(nameT + "\t") for nameT in paramHeader]) + "Jm(mA/cm2)\tVm(V)\tFF(%)\tJsc(mA/cm2)\tVoc(V)\tEfficiency\n")
+            # end if
+            if isFailed(rowT):
+                failedCount += 1
+            # end if
+            fileT.write(formatRow(rowT))
+            iRow += 1
+        # end while
+    # end for
+    fileT.close()
+
+    durationT = time.time() - ticT
+    print("%d J-V files analyzed (%d failed) in %.1f s with %d process(es): %s" % (len(listRow), failedCount, durationT, workerCount, outputFilename))
+
+    return len(listRow), failedCount
+
+# end reanalyze
+
+if __name__ == "__main__":
+
+    outputFilename = "simuloutput_reanalyzed.txt"
+    workerCount = None
+    Psolar = 100.037
+    interpKind = 'cubic'
+    ffMax = 95.0
+
+    usageT = "SLALOM re-analysis usage:\n python slalomOffline.py [--output ...] [--workers N] [--psolar 100.037] [--interp cubic] [--ffmax 95] outputDir_or_zip ..."
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], None, ["output=", "workers=", "psolar=", "interp=", "ffmax="])
+        for opt, arg in opts:
+            if opt == "--output":
+                outputFilename = arg
+            elif opt == "--workers":
+                workerCount = int(arg)
+            elif opt == "--psolar":
+                Psolar = float(arg)
+            elif opt == "--interp":
+                interpKind = arg
+            elif opt == "--ffmax":
+                ffMax = float(arg)
+            # end if
+        # end for
+    except Exception as excT:
+        print(str(excT) + "\n" + usageT)
+        sys.exit(1)
+    # end try
+
+    listSource = [pathT for pathT in args if (os.path.isdir(pathT) or zipfile.is_zipfile(pathT))]
+    if (len(listSource) < 1) or (len(listSource) != len(args)):
+        print("output directory or zip archive not found\n" + usageT)
+        sys.exit(1)
+    # end if
+
+    reanalyze(listSource, outputFilename, workerCount, Psolar, interpKind, ffMax)
+
+# end if
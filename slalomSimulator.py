@@ -25,6 +25,7 @@
 # ------------------------------------------------------------------------------------------------------
 
 import os
+import re
 import sys
 
 from slalomCore import *
@@ -54,19 +55,6 @@ class slalomSimulator(object):
             dispError("Unknown simulator engine '%s'" % str(self.name), doExit = True)
         # end if
 
-        del self.command[:]
-        self.command = list()
-
-        if (outputDir is not None):
-            if (os.name == "nt"):
-                self.command.append("@echo off")
-                self.command.append("cd " + outputDir)
-            else:
-                self.command.append("#!/bin/sh")
-                self.command.append("cd " + outputDir)
-            # end if
-        # end if
-
         if (self.name == "atlas"):
             self.header = "v ATLAS"
             self.error = "ERROR:"
@@ -75,9 +63,17 @@ class slalomSimulator(object):
             self.vardeclpre = "set %s"
             self.vardecl = "set %s=%g"
             self.dataSeparator = " "
-            if (inputFilename is not None) and (verboseFilename is not None):
-                self.command.append("deckbuild -run " + inputFilename + " -outfile " + verboseFilename + " -noplot")
-            # end if
+            # simulator log read during the run (early termination): see getLogColumns and getLogPoint...
+            # ...the anode voltage and current columns found by their names in the log header
+            self.logRecord = None
+            self.logVoltage = "v.\"anode\""
+            self.logCurrent = "i.\"anode\""
+            # relaxed numerics (failure policy): (line start, pattern, replacement) applied to the input file lines
+            self.relax = [("method", r"maxtraps=\d+", "maxtraps=20"), ("method", r"itlimit=\d+", "itlimit=250"),
+                          ("set voltagePoints=", r"=\s*(\d+)", lambda matchT: "=%d" % (2 * int(matchT.group(1))))]
+            # resolution variables (multi-fidelity): (line start, pattern, minimum value) scaled down for the coarse evaluations
+            self.coarse = [("set NPointsX", r"=\s*(\d+)\s*$", 2), ("set NPointsY", r"=\s*(\d+)\s*$", 5),
+                           ("set voltagePoints", r"=\s*(\d+)\s*$", 40), ("set BeamWnum", r"=\s*(\d+)\s*$", 21)]
         elif (self.name == "tibercad"):
             self.header = "v ATLAS"
             self.error = [("ERROR:","Atlas error"),("SCI System Error:","Silvaco C interpreter error")]
@@ -85,23 +81,133 @@ class slalomSimulator(object):
             self.vardeclpre = "set %s"
             self.vardecl = "set %s=%g"
             self.dataSeparator = " "
-            if (inputFilename is not None) and (verboseFilename is not None):
-                self.command.append("deckbuild -ascii -run " + inputFilename + " -outfile " + verboseFilename + " -noplot")
-            # end if
+            self.logRecord = None
+            self.logVoltage = "v.\"anode\""
+            self.logCurrent = "i.\"anode\""
+            self.relax = [("method", r"maxtraps=\d+", "maxtraps=20"), ("method", r"itlimit=\d+", "itlimit=250"),
+                          ("set voltagePoints=", r"=\s*(\d+)", lambda matchT: "=%d" % (2 * int(matchT.group(1))))]
+            self.coarse = [("set NPointsX", r"=\s*(\d+)\s*$", 2), ("set NPointsY", r"=\s*(\d+)\s*$", 5),
+                           ("set voltagePoints", r"=\s*(\d+)\s*$", 40), ("set BeamWnum", r"=\s*(\d+)\s*$", 21)]
         else:
             dispError("Unknown simulator engine '%s'" % str(self.name), doExit = True)
         # end if
 
+        del self.command[:]
+        self.command = self.getCommand(inputFilename, currentDir, outputDir, verboseFilename)
+
+    # end update
+
+    def relaxLine(self, lineT):
+        """ the input file line with relaxed numerics (more iterations and traps, finer voltage sweep), unchanged if not concerned """
+
+        lineX = lineT.lstrip("\t ")
+        for startT, patternT, replaceT in self.relax:
+            if lineX.startswith(startT):
+                lineT = re.sub(patternT, replaceT, lineT)
+            # end if
+        # end for
+
+        return lineT
+
+    # end relaxLine
+
+    def coarseLine(self, lineT, fidelity):
+        """ the input file line with a lower resolution (mesh, voltage and wavelength points scaled by fidelity), unchanged if not concerned """
+
+        lineX = lineT.lstrip("\t ")
+        for startT, patternT, minT in self.coarse:
+            if lineX.startswith(startT):
+                lineT = re.sub(patternT, lambda matchT: "=%d" % min(int(matchT.group(1)), max(minT, int(round(fidelity * float(matchT.group(1)))))), lineT)
+            # end if
+        # end for
+
+        return lineT
+
+    # end coarseLine
+
+    def getLogColumns(self, lineT = None, logColumns = None):
+        """ the anode voltage and current column positions in the simulator log data lines...
+            ...logColumns (voltage, current): column names or positions (logVoltage and logCurrent if None)...
+            ...the names are looked up in a header line (lineT) listing the data columns, after an optional leading '#'...
+            ...returns None if not known (lineT not the header): the log points not read, the sweep never stopped early """
+
+        listColumn = [self.logVoltage, self.logCurrent] if (logColumns is None) else list(logColumns)
+        if all([isinstance(columnT, int) for columnT in listColumn]):
+            return tuple(listColumn)
+        # end if
+        if lineT is None:
+            return None
+        # end if
+
+        listT = lineT.split()
+        if (len(listT) > 0) and listT[0].startswith("#"):
+            listT = listT[1:] if (listT[0] == "#") else ([listT[0][1:]] + listT[1:])
+        # end if
+        try:
+            return tuple([columnT if isinstance(columnT, int) else listT.index(columnT) for columnT in listColumn])
+        except ValueError:
+            return None
+        # end try
+
+    # end getLogColumns
+
+    def getLogPoint(self, lineT, logPositions):
+        """ anode voltage and current of one line of the simulator log (None if not a data line)...
+            ...the data lines start with logRecord (if not None) followed by the columns (logPositions, see getLogColumns) """
+
+        listT = lineT.split()
+        if self.logRecord is not None:
+            if (len(listT) < 1) or (listT[0] != self.logRecord):
+                return None
+            # end if
+            listT = listT[1:]
+        # end if
+
+        try:
+            return float(listT[logPositions[0]]), float(listT[logPositions[1]])
+        except (IndexError, ValueError):
+            return None
+        # end try
+
+    # end getLogPoint
+
+    def getCommand(self, inputFilename = None, currentDir = None, outputDir = None, verboseFilename = None):
+        """ build the simulator launcher lines for a given output (working) directory, without modifying the simulator state """
+
+        command = list()
+
+        if (outputDir is not None):
+            if (os.name == "nt"):
+                command.append("@echo off")
+                command.append("cd " + outputDir)
+            else:
+                command.append("#!/bin/sh")
+                command.append("cd " + outputDir)
+            # end if
+        # end if
+
+        if (self.name == "atlas"):
+            if (inputFilename is not None) and (verboseFilename is not None):
+                command.append("deckbuild -run " + inputFilename + " -outfile " + verboseFilename + " -noplot")
+            # end if
+        elif (self.name == "tibercad"):
+            if (inputFilename is not None) and (verboseFilename is not None):
+                command.append("deckbuild -ascii -run " + inputFilename + " -outfile " + verboseFilename + " -noplot")
+            # end if
+        # end if
+
         if (currentDir is not None):
             if (os.name == "nt"):
-                self.command.append("cd " + currentDir)
-                self.command.append("exit")
+                command.append("cd " + currentDir)
+                command.append("exit")
             else:
-                self.command.append("cd " + currentDir)
-                self.command.append("exit 0")
+                command.append("cd " + currentDir)
+                command.append("exit 0")
             # end if
         # end if
 
-    # end update
+        return command
+
+    # end getCommand
 
 # end slalomSimulator
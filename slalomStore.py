@@ -0,0 +1,433 @@
+# -*- coding: utf-8 -*-
+
+# ======================================================================================================
+# SLALOM - Open-Source Solar Cell Multivariate Optimizer
+# Copyright(C) 2012-2019 Sidi OULD SAAD HAMADY (1,2,*), Nicolas FRESSENGEAS (1,2). All rights reserved.
+# (1) Université de Lorraine, Laboratoire Matériaux Optiques, Photonique et Systèmes, Metz, F-57070, France
+# (2) Laboratoire Matériaux Optiques, Photonique et Systèmes, CentraleSupélec, Université Paris-Saclay, Metz, F-57070, France
+# (*) sidi.hamady@univ-lorraine.fr
+# SLALOM source code is available to download from:
+# https://github.com/sidihamady/SLALOM
+# https://hal.archives-ouvertes.fr/hal-01897934
+# http://www.hamady.org/photovoltaics/slalom_source.zip
+# Cite as: S Ould Saad Hamady and N Fressengeas, EPJ Photovoltaics, 9:13, 2018.
+# See Copyright Notice in COPYRIGHT
+# ======================================================================================================
+
+# ------------------------------------------------------------------------------------------------------
+# File:           slalomStore.py
+# Type:           Class and Module
+# Use:            slalomStore is used by slalomCore.py and slalomWindow.py
+#                  it keeps the optimization results in an append-only file (simuloutput_results.jsonl):...
+#                  ...a schema record (parameters name and format) then one record (JSON line) per evaluation...
+#                  ...with the same fields as simuloutput_optimized.txt, and a byte-offset index...
+#                  ...(simuloutput_results.idx: one 8-byte offset per record) to read the records from a given one.
+#                 The readers get only the records written after a known byte offset (or record index).
+#                 The simulator output files archived without header (slalomCore outputArchive "rename") are described...
+#                  ...in simuloutput_manifest.jsonl (one record per evaluation): joinHeader and readOutput give them back...
+#                  ...with their header (title, comment, parameters name and value) as archived with outputArchive "header".
+#                 To export the results as a simuloutput_optimized.txt like file from the console type:
+#                   python slalomStore.py --export results.txt path/to/simuloutput_results.jsonl
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import struct
+import getopt
+import collections
+
+class slalomStore(object):
+    """ the SLALOM append-only results store """
+
+    # the store and index filenames (in the output directory)
+    storeFilename = "simuloutput_results.jsonl"
+    indexFilename = "simuloutput_results.idx"
+
+    # the schema version and the figures of merit (in the simuloutput_optimized.txt columns order)
+    schemaVersion = 1
+    outputName = ["Jm", "Vm", "FF", "Jsc", "Voc", "Efficiency"]
+    outputHeader = ["Jm(mA/cm2)", "Vm(V)", "FF(%)", "Jsc(mA/cm2)", "Voc(V)", "Efficiency"]
+
+    # the output files archived without header: one manifest record per evaluation
+    manifestFilename = "simuloutput_manifest.jsonl"
+
+    # the index entry: unsigned 64-bit little-endian byte offset
+    indexFormat = "<Q"
+    indexSize = struct.calcsize("<Q")
+
+    def __init__(self, outputDir):
+        """ slalomStore constructor (the store written in outputDir) """
+
+        if (not outputDir.endswith('/')) and (not outputDir.endswith('\\')):
+            outputDir += ('\\' if ('\\' in outputDir) else '/')
+        # end if
+        self.pathStore = outputDir + self.storeFilename
+        self.pathIndex = outputDir + self.indexFilename
+        self.schema = None
+        self.count = 0
+
+    # end __init__
+
+    def open(self, title, paramName, paramFormat, counterFormat = '{0:02d}'):
+        """ start the store (its schema record written with the first record) or, if it exists (resumed optimization)...
+            ...check its schema. Returns False if the existing store schema differs """
+
+        schemaT = collections.OrderedDict()
+        schemaT["schema"] = self.schemaVersion
+        schemaT["title"] = title
+        schemaT["param"] = list(paramName)
+        schemaT["format"] = list(paramFormat)
+        schemaT["counter"] = counterFormat
+        schemaT["output"] = list(self.outputName)
+
+        if os.path.isfile(self.pathStore):
+            schemaX = self.readSchema(self.pathStore)
+            if (schemaX is None) or (schemaX["param"] != schemaT["param"]):
+                return False
+            # end if
+            self.schema = schemaX
+            self.count = (os.path.getsize(self.pathIndex) // self.indexSize) if os.path.isfile(self.pathIndex) else 0
+            return True
+        # end if
+
+        self.schema = schemaT
+        self.count = 0
+
+        return True
+
+    # end open
+
+    def setCounterFormat(self, counterFormat):
+        """ set the index format of the text rows (before the first record written) """
+
+        if (self.schema is not None) and (not os.path.isfile(self.pathStore)):
+            self.schema["counter"] = counterFormat
+        # end if
+
+    # end setCounterFormat
+
+    def append(self, index, timeStr, paramNatural, listOutput):
+        """ append the record of one evaluation: index, time (as in the output files name)...
+            ...parameters (natural values) and figures of merit (Jm, Vm, FF, Jsc, Voc, Efficiency) """
+
+        recordT = collections.OrderedDict()
+        recordT["index"] = int(index)
+        recordT["time"] = timeStr
+        recordT["param"] = [float(tT) for tT in paramNatural]
+        for ii in range(0, len(self.outputName)):
+            recordT[self.outputName[ii]] = float(listOutput[ii])
+        # end for
+
+        if not os.path.isfile(self.pathStore):
+            fileT = open(self.pathStore, "w")
+            fileT.write(json.dumps(self.schema) + "\n")
+            fileT.close()
+            fileT = open(self.pathIndex, "wb")
+            fileT.close()
+        # end if
+
+        # the record written in one call (the readers get only the complete lines), then its offset indexed
+        fileT = open(self.pathStore, "a")
+        fileT.seek(0, os.SEEK_END)
+        offsetT = fileT.tell()
+        fileT.write(json.dumps(recordT) + "\n")
+        fileT.close()
+
+        fileT = open(self.pathIndex, "ab")
+        fileT.write(struct.pack(self.indexFormat, offsetT))
+        fileT.close()
+
+        self.count += 1
+
+    # end append
+
+    @staticmethod
+    def isStore(pathStore):
+        """ True if the file is a results store (.jsonl) """
+        return pathStore.endswith(".jsonl")
+    # end isStore
+
+    @staticmethod
+    def readSchema(pathStore):
+        """ the store schema record (None if not found) """
+
+        try:
+            fileT = open(pathStore, "r")
+            lineT = fileT.readline()
+            fileT.close()
+            schemaT = json.loads(lineT)
+            return schemaT if ("schema" in schemaT) else None
+        except:
+            return None
+        # end try
+
+    # end readSchema
+
+    @staticmethod
+    def parse(strContent):
+        """ parse the store content read from a byte offset: list of records (the schema record included, if any)...
+            ...and the number of bytes parsed (the last incomplete line, being written, not parsed)...
+            ...the records being written by json.dumps (ASCII), the characters and bytes count are the same """
+
+        listRecord = list()
+        sizeT = strContent.rfind("\n") + 1
+        for lineT in strContent[0:sizeT].split("\n"):
+            if len(lineT.strip()) < 1:
+                continue
+            # end if
+            try:
+                listRecord.append(json.loads(lineT))
+            except:
+                pass
+            # end try
+        # end for
+
+        return listRecord, sizeT
+
+    # end parse
+
+    @staticmethod
+    def read(pathStore, offset = 0):
+        """ read the records written after a byte offset (0: from the start, with the schema record)...
+            ...returns the list of records and the offset to use for the next read """
+
+        fileT = open(pathStore, "rb")
+        fileT.seek(offset)
+        strContent = fileT.read().decode("utf-8")
+        fileT.close()
+
+        listRecord, sizeT = slalomStore.parse(strContent)
+
+        return listRecord, offset + sizeT
+
+    # end read
+
+    @staticmethod
+    def readFrom(pathStore, recordIndex = 0):
+        """ read the records from the recordIndex'th one (0: the first evaluation), using the byte-offset index...
+            ...returns the list of records and the byte offset to use for the next read """
+
+        pathIndex = pathStore[0:len(pathStore) - len(".jsonl")] + ".idx"
+        offsetT = None
+        try:
+            fileT = open(pathIndex, "rb")
+            fileT.seek(recordIndex * slalomStore.indexSize)
+            bytesT = fileT.read(slalomStore.indexSize)
+            fileT.close()
+            if len(bytesT) == slalomStore.indexSize:
+                offsetT = struct.unpack(slalomStore.indexFormat, bytesT)[0]
+            # end if
+        except:
+            offsetT = None
+        # end try
+
+        if offsetT is None:
+            # index not found or record not yet written
+            if recordIndex > 0:
+                return list(), None
+            # end if
+            offsetT = 0
+        # end if
+
+        return slalomStore.read(pathStore, offsetT)
+
+    # end readFrom
+
+    @staticmethod
+    def appendManifest(outputDir, index, timeStr, title, paramName, paramValue, simulatorHeader, dictComment):
+        """ append the manifest record of the output files of one evaluation archived without header:...
+            ...parameters name and value (as formatted in the header) and, for each file, its comment...
+            ...returns the record line written """
+
+        recordT = collections.OrderedDict()
+        recordT["index"] = int(index)
+        recordT["time"] = timeStr
+        recordT["title"] = title
+        recordT["param"] = list(paramName)
+        recordT["value"] = list(paramValue)
+        recordT["first"] = simulatorHeader
+        recordT["files"] = dictComment
+
+        strT = json.dumps(recordT) + "\n"
+        fileT = open(os.path.join(outputDir, slalomStore.manifestFilename), "a")
+        fileT.write(strT)
+        fileT.close()
+
+        return strT
+
+    # end appendManifest
+
+    @staticmethod
+    def parseManifest(strContent, dictManifest = None):
+        """ add the manifest records to dictManifest (output file name: record)...
+            ...returns dictManifest and the number of bytes parsed (as in parse) """
+
+        if dictManifest is None:
+            dictManifest = dict()
+        # end if
+
+        listRecord, sizeT = slalomStore.parse(strContent)
+        for recordT in listRecord:
+            for nameT in recordT.get("files", {}):
+                dictManifest[nameT] = recordT
+            # end for
+        # end for
+
+        return dictManifest, sizeT
+
+    # end parseManifest
+
+    @staticmethod
+    def readManifest(outputDir):
+        """ the manifest of the output directory (empty if the outputs are archived with their header) """
+
+        pathT = os.path.join(outputDir, slalomStore.manifestFilename)
+        if not os.path.isfile(pathT):
+            return dict()
+        # end if
+
+        fileT = open(pathT, "r")
+        strContent = fileT.read()
+        fileT.close()
+
+        dictManifest, sizeT = slalomStore.parseManifest(strContent)
+
+        return dictManifest
+
+    # end readManifest
+
+    @staticmethod
+    def joinHeader(strContent, nameT, dictManifest):
+        """ the output file content with its header, as archived with outputArchive "header"...
+            ...(the content returned as is if the file is not in the manifest) """
+
+        recordT = dictManifest.get(os.path.basename(nameT)) if dictManifest else None
+        if recordT is None:
+            return strContent
+        # end if
+
+        fileHeader = "# " + recordT["title"] + "\n# "
+        fileHeader += recordT["files"][os.path.basename(nameT)] + "\n# "
+        fileHeader += "\t".join(recordT["param"]) + "\n# "
+        fileHeader += "\t".join(recordT["value"]) + "\n"
+
+        # the header after the simulator header line, if any
+        listLine = strContent.splitlines(True)
+        if len(listLine) < 1:
+            return "\n"
+        # end if
+        if listLine[0].startswith(recordT["first"]):
+            return listLine[0] + fileHeader + "".join(listLine[1:]) + "\n"
+        # end if
+
+        return fileHeader + strContent + "\n"
+
+    # end joinHeader
+
+    @staticmethod
+    def readOutput(pathOutput, dictManifest = None):
+        """ read an output file with its header (the manifest read from the file directory if not given) """
+
+        fileT = open(pathOutput, "r")
+        strContent = fileT.read()
+        fileT.close()
+
+        if dictManifest is None:
+            dictManifest = slalomStore.readManifest(os.path.dirname(os.path.abspath(pathOutput)))
+        # end if
+
+        return slalomStore.joinHeader(strContent, pathOutput, dictManifest)
+
+    # end readOutput
+
+    @staticmethod
+    def formatHeader(schemaT):
+        """ the simuloutput_optimized.txt like header lines of a store schema """
+
+        strT = "# " + schemaT.get("title", "") + "\n"
+        strT += "# Parameter:\t" + "\t".join(schemaT["param"]) + "\n"
+        strT += "Index\tTime\t" + "".join([(nameT + "\t") for nameT in schemaT["param"]]) + "\t".join(slalomStore.outputHeader) + "\n"
+        return strT
+    # end formatHeader
+
+    @staticmethod
+    def formatRow(schemaT, recordT):
+        """ the simuloutput_optimized.txt like row of a store record """
+
+        strT = schemaT.get("counter", '{0:02d}').format(recordT["index"]) + "\t" + recordT["time"] + "\t"
+        for ii in range(0, len(schemaT["param"])):
+            strT += (schemaT["format"][ii] % recordT["param"][ii]) + "\t"
+        # end for
+        strT += "\t".join([("%08.5f" % recordT[nameT]) for nameT in slalomStore.outputName]) + "\n"
+        return strT
+    # end formatRow
+
+    @staticmethod
+    def formatLines(listRecord, schemaT = None):
+        """ the simuloutput_optimized.txt like lines of a list of records (the schema record, if any, giving the header)...
+            ...returns the lines and the schema """
+
+        listLine = list()
+        for recordT in listRecord:
+            if "schema" in recordT:
+                schemaT = recordT
+                listLine.extend(slalomStore.formatHeader(schemaT).splitlines(True))
+                continue
+            # end if
+            if schemaT is None:
+                continue
+            # end if
+            listLine.append(slalomStore.formatRow(schemaT, recordT))
+        # end for
+
+        return listLine, schemaT
+
+    # end formatLines
+
+    @staticmethod
+    def readLines(pathStore):
+        """ all the store records as simuloutput_optimized.txt like lines """
+
+        listRecord, offsetT = slalomStore.read(pathStore, 0)
+        listLine, schemaT = slalomStore.formatLines(listRecord)
+        return listLine
+
+    # end readLines
+
+# end slalomStore
+
+if __name__ == "__main__":
+
+    exportFilename = None
+
+    usageT = "SLALOM results store usage:\n python slalomStore.py --export results.txt path/to/simuloutput_results.jsonl"
+
+    try:
+        opts, args = getopt.getopt(sys.argv[1:], None, ["export="])
+        for opt, arg in opts:
+            if opt == "--export":
+                exportFilename = arg
+            # end if
+        # end for
+    except Exception as excT:
+        print(str(excT) + "\n" + usageT)
+        sys.exit(1)
+    # end try
+
+    if (len(args) != 1) or (not os.path.isfile(args[0])) or (slalomStore.readSchema(args[0]) is None):
+        print("results store not found\n" + usageT)
+        sys.exit(1)
+    # end if
+
+    listLine = slalomStore.readLines(args[0])
+    if exportFilename is None:
+        sys.stdout.write("".join(listLine))
+    else:
+        fileT = open(exportFilename, "w")
+        fileT.write("".join(listLine))
+        fileT.close()
+        print("%d records exported: %s" % (len([lineT for lineT in listLine if lineT[0:1].isdigit()]), exportFilename))
+    # end if
+
+# end if
@@ -766,6 +766,14 @@ class slalomWindow(object):
 
         self.filemtime = 0
 
+        # results store (simuloutput_results.jsonl) byte offset and schema: only the new records read at each update
+        self.storeOffset = 0
+        self.storeSchema = None
+
+        # output files manifest (outputArchive "rename"): the report files header joined from it
+        self.manifest = dict()
+        self.manifestOffset = 0
+
         self.fontsize = 10
 
         self.dataSep = dataSep
@@ -2125,8 +2133,137 @@ class slalomWindow(object):
         self.optimlist = list()
         del self.optimout[:]
         self.optimout = list()
+
+        self.storeOffset = 0
+        self.storeSchema = None
+        self.manifest = dict()
+        self.manifestOffset = 0
     # end resetData
 
+    def getStoreSize(self, pathStore, remoteMon, STDDEVNULL):
+        """ the results store size in bytes (None if the optimization has no results store) """
+
+        try:
+            if remoteMon:
+                strT = subprocess.check_output(['ssh', self.remoteHost, "stat", "--printf=%s", pathStore], stderr=STDDEVNULL)
+                return int(strT)
+            # end if
+            if os.path.isfile(pathStore):
+                return os.path.getsize(pathStore)
+            # end if
+        except:
+            pass
+        # end try
+
+        return None
+
+    # end getStoreSize
+
+    def readAppended(self, pathT, offsetT, remoteMon, STDDEVNULL):
+        """ the bytes appended to a file since offsetT, only the new bytes transferred (None if the file cannot be read) """
+
+        try:
+            if remoteMon:
+                return subprocess.check_output(['ssh', self.remoteHost, "tail", "-c", "+%d" % (offsetT + 1), pathT], stderr=STDDEVNULL)
+            # end if
+            fileT = open(pathT, "rb")
+            fileT.seek(offsetT)
+            bytesT = fileT.read()
+            fileT.close()
+            return bytesT
+        except:
+            return None
+        # end try
+
+    # end readAppended
+
+    def readManifest(self, remoteMon, STDDEVNULL):
+        """ read the output files manifest records appended since the last update (from manifestOffset) """
+
+        pathManifest = self.dataDir + slalomStore.manifestFilename
+        if remoteMon:
+            pathManifest = pathManifest.replace("\\", "/")
+        # end if
+
+        bytesT = self.readAppended(pathManifest, self.manifestOffset, remoteMon, STDDEVNULL)
+        if bytesT is None:
+            return
+        # end if
+
+        self.manifest, sizeT = slalomStore.parseManifest(bytesT.decode("utf-8", "replace"), self.manifest)
+        self.manifestOffset += sizeT
+
+    # end readManifest
+
+    def readStore(self, pathStore, remoteMon, STDDEVNULL):
+        """ read the records appended to the results store since the last update (from storeOffset)...
+            ...returns them as simuloutput_optimized.txt like lines (None if the store cannot be read) """
+
+        # only the new bytes transferred, also appended to the local copy of the store
+        bytesT = self.readAppended(pathStore, self.storeOffset, remoteMon, STDDEVNULL)
+        if bytesT is None:
+            return None
+        # end if
+
+        listRecord, sizeT = slalomStore.parse(bytesT.decode("utf-8", "replace"))
+
+        if remoteMon and (sizeT > 0):
+            try:
+                fileT = open(self.dataDirLocal + slalomStore.storeFilename, "wb" if (self.storeOffset == 0) else "ab")
+                fileT.write(bytesT[0:sizeT])
+                fileT.close()
+            except:
+                pass
+            # end try
+        # end if
+
+        self.storeOffset += sizeT
+        listLine, self.storeSchema = slalomStore.formatLines(listRecord, self.storeSchema)
+
+        return listLine
+
+    # end readStore
+
+    def updateArchive(self, STDDEVNULL):
+        """ download the archive chunks sealed since the last update (incremental archiving) and extract them locally...
+            ...the report files extracted are not downloaded again """
+
+        archiveDir = self.dataZip[0:len(self.dataZip) - len(".zip")] + slalomArchive.dirSuffix + "/"
+        archiveDirLocal = slalomArchive.getArchiveDir(self.dataZipLocal[0:len(self.dataZipLocal) - len(".zip")])
+
+        try:
+            strT = subprocess.check_output(['ssh', self.remoteHost, 'cat', archiveDir + slalomArchive.indexFilename], stderr=STDDEVNULL)
+            listChunk = slalomArchive.readIndex(strT.decode("utf-8", "replace"))
+        except:
+            return
+        # end try
+
+        for chunkName in listChunk:
+            # the sealed chunks are never modified: downloaded once
+            if os.path.isfile(archiveDirLocal + chunkName):
+                continue
+            # end if
+            try:
+                if not os.path.exists(archiveDirLocal):
+                    os.makedirs(archiveDirLocal)
+                # end if
+                subprocess.check_call(['scp', self.remoteHost + ':' + archiveDir + chunkName, archiveDirLocal + chunkName + slalomArchive.partExt], stderr=STDDEVNULL, stdout=STDDEVNULL)
+                with zipfile.ZipFile(archiveDirLocal + chunkName + slalomArchive.partExt, 'r') as zipT:
+                    # the manifest is read from the server (the chunk manifest only has the chunk records)
+                    zipT.extractall(self.dataDirLocal, [nameT for nameT in zipT.namelist() if (nameT != slalomStore.manifestFilename)])
+                # end with
+                os.rename(archiveDirLocal + chunkName + slalomArchive.partExt, archiveDirLocal + chunkName)
+            except:
+                break
+            # end try
+
+            if (self.isRunning() == False):
+                break
+            # end if
+        # end for
+
+    # end updateArchive
+
     def updateDataThread(self):
 
         if self.dataFilename is None:
@@ -2140,7 +2277,20 @@ class slalomWindow(object):
 
         STDDEVNULL = open(os.devnull, 'w')
 
-        if not remoteMon:
+        # the results store (simuloutput_results.jsonl), if any, is read incrementally (only the new records)...
+        # ...otherwise the whole results text file is read at each update
+        pathStore = self.dataDir + slalomStore.storeFilename
+        if remoteMon:
+            pathStore = pathStore.replace("\\", "/")
+        # end if
+        storeSize = self.getStoreSize(pathStore, remoteMon, STDDEVNULL)
+
+        if storeSize is not None:
+            if (self.storeOffset > 0) and (storeSize <= self.storeOffset):
+                self.setRunning(threadrunning = False, fromthread = True)
+                return True
+            # end if
+        elif not remoteMon:
             try:
                 if os.path.isfile(self.dataFilename) == False:
                     self.resetData()
@@ -2164,7 +2314,7 @@ class slalomWindow(object):
             # end try
         # end if
 
-        if (self.filemtime > 0) and (filemtime <= self.filemtime):
+        if (storeSize is None) and (self.filemtime > 0) and (filemtime <= self.filemtime):
             self.setRunning(threadrunning = False, fromthread = True)
             return True
         # end if
@@ -2240,37 +2390,58 @@ class slalomWindow(object):
         # get the file content from remote server or locally.
         # the ssh connexion should use auth keys, not password, for obvious security reasons.
 
-        fileT = None
-        try:
-            if remoteMon:
-                subprocess.check_call(['scp', self.remoteHost + ':' + self.dataFilename, self.dataFilenameLocal], stderr=STDDEVNULL, stdout=STDDEVNULL)
-            # end if
-        except:
-            # check if the data file is locally store
-            if not os.path.isfile(self.dataFilenameLocal):
+        listLine = None
+        if storeSize is not None:
+            if self.storeOffset == 0:
                 self.resetData()
+            # end if
+            listLine = self.readStore(pathStore, remoteMon, STDDEVNULL)
+            if listLine is None:
                 self.setRunning(threadrunning = False, fromthread = True)
                 return False
             # end if
-            pass
-        # end try
+            if self.strViewerFileContent is None:
+                self.strViewerFileContent = ""
+            # end if
+        else:
+            fileT = None
+            try:
+                if remoteMon:
+                    subprocess.check_call(['scp', self.remoteHost + ':' + self.dataFilename, self.dataFilenameLocal], stderr=STDDEVNULL, stdout=STDDEVNULL)
+                # end if
+            except:
+                # check if the data file is locally store
+                if not os.path.isfile(self.dataFilenameLocal):
+                    self.resetData()
+                    self.setRunning(threadrunning = False, fromthread = True)
+                    return False
+                # end if
+                pass
+            # end try
+
+            self.resetData()
 
-        self.resetData()
+            self.strViewerFileContent = ""
+
+            try:
+                fileT = open(self.dataFilenameLocal, "r")
+                listLine = fileT.readlines()
+                fileT.close()
+            except:
+                listLine = list()
+            # end try
+        # end if
 
         bAuto = (self.xIndex == self.yIndex[0])
 
         paramlistItem = ""
 
-        self.strViewerFileContent = ""
-
         self.efficiencyMin = 0.0
         self.efficiencyMax = 0.0
         self.efficiencySel = 0.0
 
         try:
-            fileT = open(self.dataFilenameLocal, "r")
-
-            for lineT in fileT:
+            for lineT in listLine:
 
                 self.strViewerFileContent += lineT
 
@@ -2366,8 +2537,6 @@ class slalomWindow(object):
                 iLine += 1
             # end for
 
-            fileT.close()
-
             self.updateCount += 1
 
         except:
@@ -2389,6 +2558,13 @@ class slalomWindow(object):
             self.efficiencySel = self.datay[self.count - 1][self.iPoints - 1]
         # end if
 
+        if remoteMon:
+            # the report files of the archive chunks sealed (incremental archiving) extracted locally, not downloaded one by one
+            self.updateArchive(STDDEVNULL)
+        # end if
+
+        isManifest = False
+
         for rr in range(0, len(self.strReportFileName)):
             if self.strReportFileName[rr] is None:
                 continue
@@ -2401,6 +2577,12 @@ class slalomWindow(object):
                 return
             # end if
 
+            if not isManifest:
+                # the header of the files archived without header (outputArchive "rename")
+                self.readManifest(remoteMon, STDDEVNULL)
+                isManifest = True
+            # end if
+
             for ii in range(iFcontentLen, iFnameLen):
                 # get the files from the remote server and store them locally.
                 # the ssh connexion should use auth keys, not password, for obvious security reasons.
@@ -2409,7 +2591,7 @@ class slalomWindow(object):
                         subprocess.check_call(['scp', self.remoteHost + ':' + self.strReportFileName[rr][ii], self.strReportFileNameLocal[rr][ii]], stderr=STDDEVNULL, stdout=STDDEVNULL)
                     # end if
                     fileT = open(self.strReportFileNameLocal[rr][ii], "r")
-                    self.strReportFileContent[rr].append(fileT.read())
+                    self.strReportFileContent[rr].append(slalomStore.joinHeader(fileT.read(), self.strReportFileName[rr][ii], self.manifest))
                     fileT.close()
                 except:
                     self.setRunning(threadrunning = False, fromthread = True)
@@ -2605,6 +2787,7 @@ class slalomWindow(object):
             self.killproc = 0
             self.startTime = int(nowT)
             self.filemtime = 0
+            self.storeOffset = 0
             self.updateTime = 0
             self.updateCount = 0
             self.updateDelayMin = 0
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------------------------------
+# File:           test_slalomCache.py
+# Use:            a L-BFGS-B optimization repeated with the persistent cache: nothing simulated again...
+#                  ...the simulator replaced by an analytic efficiency (python -m unittest discover tests)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import slalomCore as slalomCoreModule
+from slalomCore import *
+from slalomDevice import *
+from slalomCache import *
+
+PackageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FixedRandom(object):
+    """ the optimization random seed fixed (the same for the two runs) """
+    def randint(self, a, b):
+        return 12345
+    # end randint
+# end FixedRandom
+
+class TestCache(unittest.TestCase):
+
+    def setUp(self):
+        self.dirT = tempfile.mkdtemp()
+        self.cacheDir = os.path.join(self.dirT, "cache")
+        self.systemRandom = slalomCoreModule.random.SystemRandom
+        slalomCoreModule.random.SystemRandom = FixedRandom
+    # end setUp
+
+    def tearDown(self):
+        slalomCoreModule.random.SystemRandom = self.systemRandom
+        shutil.rmtree(self.dirT, ignore_errors = True)
+    # end tearDown
+
+    def runOptimizer(self, nameT):
+        """ run a L-BFGS-B optimization with the cache, returns the optimizer and the number of simulations """
+
+        currentDir = os.path.join(self.dirT, nameT) + os.sep
+        shutil.copytree(os.path.join(PackageDir, "Device", "Silvaco"), currentDir)
+        Device = slalomDevice("InGaN_PN", currentDir)
+        Device.validate()
+
+        Optimizer = slalomCore(Device, sys.executable, "atlas")
+        Optimizer.setMinimizeMethod("L-BFGS-B", maxIter = 4, tolerance = 1e-3, optimPoints = 21)
+        Optimizer.setCache(self.cacheDir)
+
+        simulatedCount = [0]
+        def simulateEvaluation(evaluationT):
+            """ the analytic efficiency of a normalized parameters set, instead of the simulator """
+            simulatedCount[0] += 1
+            evaluationT.outputT = 20.0 - 10.0 * float(np.sum((np.array(evaluationT.paramNormalized) - 0.3) ** 2)) / 3.0
+            evaluationT.fJm, evaluationT.fVm, evaluationT.fFF, evaluationT.fJsc, evaluationT.fVoc = 19.0 / 3.0, 0.9, 80.0 / 3.0, 20.0 / 3.0, 1.0 / 3.0
+            evaluationT.status = "done"
+            return True
+        # end simulateEvaluation
+        Optimizer.simulateEvaluation = simulateEvaluation
+
+        try:
+            Optimizer.start("Optim")
+        except SystemExit:
+            pass
+        # end try
+
+        return Optimizer, simulatedCount[0]
+
+    # end runOptimizer
+
+    def test_repeated(self):
+        OptimizerFirst, simulatedFirst = self.runOptimizer("first")
+        self.assertTrue(simulatedFirst > 0)
+        self.assertEqual(OptimizerFirst.cache.hitCount, 0)
+
+        # the cached values identical to the simulated ones: the same trajectory, all the points found in the cache
+        OptimizerSecond, simulatedSecond = self.runOptimizer("second")
+        self.assertEqual(simulatedSecond, 0)
+        self.assertEqual(OptimizerSecond.cache.hitCount, simulatedFirst)
+        self.assertEqual(OptimizerSecond.funcCounter, OptimizerFirst.funcCounter)
+        self.assertEqual(OptimizerSecond.outputOptimized, OptimizerFirst.outputOptimized)
+        self.assertTrue(np.array_equal(OptimizerSecond.paramOptim, OptimizerFirst.paramOptim))
+    # end test_repeated
+
+    def test_concurrent(self):
+        # the entries read by concurrent workers: each hit or miss counted once
+        cacheT = slalomCache(self.cacheDir)
+        cacheT.setContext("atlas", "deck", [], [])
+        for ii in range(0, 8):
+            cacheT.put("set A=%d" % ii, ["A"], [float(ii)], 10.0, 10.0, 19.0, 0.9, 80.0, 20.0, 1.0)
+        # end for
+
+        def getEntries():
+            for ii in range(0, 400):
+                cacheT.get("set A=%d" % (ii % 16))
+            # end for
+        # end getEntries
+
+        listThread = [threading.Thread(target = getEntries) for ii in range(0, 8)]
+        for threadT in listThread:
+            threadT.start()
+        # end for
+        for threadT in listThread:
+            threadT.join()
+        # end for
+        self.assertEqual(cacheT.hitCount, 8 * 200)
+        self.assertEqual(cacheT.missCount, 8 * 200)
+    # end test_concurrent
+
+# end TestCache
+
+if __name__ == "__main__":
+    unittest.main()
+# end if
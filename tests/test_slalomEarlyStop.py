@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------------------------------
+# File:           test_slalomEarlyStop.py
+# Use:            early termination of the voltage sweep (slalomCore.watchSimulator) on an Atlas log fragment...
+#                  ...written progressively by a shell script instead of the simulator (python -m unittest discover tests)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slalomCore import *
+from slalomDevice import *
+from slalomEngine import *
+
+PackageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def getLogFragment(isHeader = True):
+    """ Atlas log fragment (simuloutput_all.log): header naming the columns, then one line per bias point...
+        ...the anode voltage is not the first column and the cathode current has the opposite sign of the anode current """
+
+    listLine = ["# Title: InGaN_PN", "# Version: ATLAS"]
+    if isHeader:
+        listLine.append("# i.\"cathode\" v.\"anode\" i.\"anode\" v.\"cathode\"")
+    # end if
+    for fV in np.arange(0.0, 2.01, 0.1):
+        fI = 1e-15 * (np.exp(fV / 0.0389) - 1.0) - 2e-6
+        listLine.append("%.6e %.6e %.6e %.6e" % (-fI, fV, fI, 0.0))
+    # end for
+    return listLine
+
+# end getLogFragment
+
+@unittest.skipIf(os.name == "nt", "the simulator replaced by a shell script")
+class TestEarlyStop(unittest.TestCase):
+
+    def setUp(self):
+        self.dirT = tempfile.mkdtemp()
+        currentDir = os.path.join(self.dirT, "device") + os.sep
+        shutil.copytree(os.path.join(PackageDir, "Device", "Silvaco"), currentDir)
+        Device = slalomDevice("InGaN_PN", currentDir)
+        Device.validate()
+        self.Optimizer = slalomCore(Device, sys.executable, "atlas")
+        self.Optimizer.setEarlyStop(2)
+        # the extract part of the input file, run after the early termination (not used here)
+        self.Optimizer.extractTemplate = ""
+        self.workDir = os.path.join(self.dirT, "work") + os.sep
+        os.makedirs(self.workDir)
+    # end setUp
+
+    def tearDown(self):
+        shutil.rmtree(self.dirT, ignore_errors = True)
+    # end tearDown
+
+    def watch(self, listLine, sleepAfter):
+        """ run the watcher on a script writing the log lines one by one, then sleeping sleepAfter seconds """
+
+        pathLog = self.workDir + self.Optimizer.outputFilename[0]
+        strT = "#!/bin/sh\n"
+        for lineT in listLine:
+            strT += "echo '%s' >> '%s'\nsleep 0.1\n" % (lineT, pathLog)
+        # end for
+        strT += "sleep %d\n" % sleepAfter
+        pathCommand = self.workDir + self.Optimizer.commandFilename
+        fileT = open(pathCommand, "w")
+        fileT.write(strT)
+        fileT.close()
+        os.chmod(pathCommand, 0o755)
+
+        evaluationT = slalomEvaluation([0.5], [0.5], workDir = self.workDir)
+        ticT = time.time()
+        isStopped = self.Optimizer.watchSimulator(evaluationT, dict(os.environ))
+        return isStopped, evaluationT, time.time() - ticT
+
+    # end watch
+
+    def readPoints(self):
+        fileT = open(self.workDir + self.Optimizer.outputFilename[0], "r")
+        listLine = [lineT for lineT in fileT.read().split("\n") if (lineT != "") and (not lineT.startswith("#"))]
+        fileT.close()
+        return [[float(strT) for strT in lineT.split()] for lineT in listLine]
+    # end readPoints
+
+    def test_stopped(self):
+        # the columns found by their names: stopped 2 points after the anode current sign change (Voc crossed)
+        isStopped, evaluationT, durationT = self.watch(getLogFragment(), 30)
+        self.assertTrue(isStopped)
+        self.assertTrue(evaluationT.isStopped)
+        self.assertTrue(durationT < 20.0)
+        listPoint = self.readPoints()
+        arrV = np.array([pointT[1] for pointT in listPoint])
+        arrI = np.array([pointT[2] for pointT in listPoint])
+        # the J-V curve kept up to Voc and beyond (the log points written before the simulator stopped)
+        self.assertTrue(np.any(arrI > 0.0))
+        self.assertTrue(np.sum((arrV > 0.0) & (arrI > 0.0)) >= 3)
+        self.assertTrue(arrV.max() < 1.6)
+    # end test_stopped
+
+    def test_positions(self):
+        # the cathode current taken as the anode current (wrong positions): the sign change never seen, the sweep complete
+        self.Optimizer.setEarlyStop(2, (1, 0))
+        isStopped, evaluationT, durationT = self.watch(getLogFragment(), 0)
+        self.assertFalse(isStopped)
+        self.assertFalse(evaluationT.isStopped)
+        self.assertEqual(len(self.readPoints()), 21)
+    # end test_positions
+
+    def test_header_missing(self):
+        # the columns not found in the log: never stopped early (the complete J-V curve)
+        isStopped, evaluationT, durationT = self.watch(getLogFragment(isHeader = False), 0)
+        self.assertFalse(isStopped)
+        self.assertFalse(evaluationT.isStopped)
+        self.assertEqual(len(self.readPoints()), 21)
+    # end test_header_missing
+
+# end TestEarlyStop
+
+if __name__ == "__main__":
+    unittest.main()
+# end if
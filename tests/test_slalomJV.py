@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------------------------------
+# File:           test_slalomJV.py
+# Use:            photovoltaic figures of merit (extractPV and calcEfficiency) of analytic J-V curves...
+#                  ...(python -m unittest discover tests)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import math
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slalomJV import *
+
+# diode: J = J0 * (exp(V / Vt) - 1) - JL (mA/cm2)
+DiodeJ0 = 1e-12
+DiodeVt = 0.0389
+
+def getDiode(arrV, fJL = 20.0, fVt = DiodeVt, fJ0 = DiodeJ0):
+    return fJ0 * (np.exp(arrV / fVt) - 1.0) - fJL
+# end getDiode
+
+def getDiodeVoc(fJL = 20.0, fVt = DiodeVt):
+    return fVt * math.log(fJL / DiodeJ0 + 1.0)
+# end getDiodeVoc
+
+def getDiodeMPP(fJL = 20.0, fVt = DiodeVt):
+    """ maximum power point (Vm, Pmax) of the diode, on a very fine voltage grid """
+    arrV = np.linspace(0.0, getDiodeVoc(fJL, fVt), 2000001)
+    arrP = -arrV * getDiode(arrV, fJL, fVt)
+    ii = int(np.argmax(arrP))
+    return arrV[ii], arrP[ii]
+# end getDiodeMPP
+
+def getJV(arrV, arrJ, fVocx = 0.0):
+    """ J-V characteristic as read by slalomJV (the points given) """
+    jvT = slalomJV()
+    jvT.voltage = np.array(arrV, dtype=float)
+    jvT.current = np.array(arrJ, dtype=float)
+    jvT.power = np.fabs(jvT.voltage * jvT.current)
+    jvT.pvPoints = int(np.count_nonzero((jvT.voltage * jvT.current) < 0.0))
+    jvT.vocx = fVocx
+    return jvT
+# end getJV
+
+class TestExtractPV(unittest.TestCase):
+
+    def test_diode(self):
+        # Jsc and Voc interpolated at the zero crossings (V = 0 between two points)
+        arrV = np.arange(-0.105, 1.4, 0.01)
+        fJsc, fVoc, fJm, fVm, Pmax, fFF = extractPV(arrV, getDiode(arrV))
+        self.assertAlmostEqual(fJsc, 20.0, places = 6)
+        self.assertAlmostEqual(fVoc, getDiodeVoc(), places = 3)
+        fVmX, PmaxX = getDiodeMPP()
+        self.assertAlmostEqual(fVm, fVmX, places = 2)
+        self.assertAlmostEqual(Pmax, PmaxX, places = 2)
+        self.assertAlmostEqual(fJm, Pmax / fVm, places = 10)
+        self.assertAlmostEqual(fFF, 100.0 * Pmax / (fJsc * fVoc), places = 10)
+    # end test_diode
+
+    def test_parabola(self):
+        # the parabolic refinement is exact for a parabolic power, the maximum between two points
+        arrV = np.arange(0.0, 1.01, 0.1)
+        arrP = 10.0 - 20.0 * (arrV - 0.437) ** 2
+        arrJ = np.full(len(arrV), -1.0)
+        fJsc, fVoc, fJm, fVm, Pmax, fFF = extractPV(arrV, arrJ, arrP)
+        self.assertAlmostEqual(fVm, 0.437, places = 12)
+        self.assertAlmostEqual(Pmax, 10.0, places = 12)
+        # and closer to the diode maximum than the best point of the coarse grid
+        arrV = np.arange(0.0, 1.4, 0.05)
+        arrJ = getDiode(arrV)
+        fJsc, fVoc, fJm, fVm, Pmax, fFF = extractPV(arrV, arrJ)
+        fVmX, PmaxX = getDiodeMPP()
+        self.assertTrue(math.fabs(Pmax - PmaxX) < math.fabs(np.max(-arrV * arrJ) - PmaxX))
+    # end test_parabola
+
+    def test_stack(self):
+        # a stack of curves with a shared voltage gives the figures of merit of each curve
+        arrV = np.arange(-0.1, 1.4, 0.01)
+        listJL = [10.0, 20.0, 30.0]
+        arrJ = np.array([getDiode(arrV, fJL) for fJL in listJL])
+        tupleStack = extractPV(arrV, arrJ)
+        self.assertEqual(len(tupleStack), 6)
+        for ii in range(0, len(listJL)):
+            tupleCurve = extractPV(arrV, arrJ[ii])
+            for jj in range(0, 6):
+                self.assertEqual(tupleStack[jj].shape, (len(listJL),))
+                self.assertEqual(tupleStack[jj][ii], tupleCurve[jj])
+            # end for
+        # end for
+        # the voltage also given per curve (2-D)
+        tupleStack2D = extractPV(np.tile(arrV, (len(listJL), 1)), arrJ)
+        for jj in range(0, 6):
+            self.assertTrue(np.array_equal(tupleStack2D[jj], tupleStack[jj]))
+        # end for
+    # end test_stack
+
+    def test_not_found(self):
+        # no current crossing (Voc beyond the voltage range): Voc and FF not found, Jsc and MPP found
+        arrV = np.arange(-0.1, 1.15, 0.01)
+        fJsc, fVoc, fJm, fVm, Pmax, fFF = extractPV(arrV, getDiode(arrV))
+        self.assertAlmostEqual(fJsc, 20.0, places = 6)
+        self.assertTrue(math.isnan(fVoc))
+        self.assertTrue(math.isnan(fFF))
+        self.assertFalse(math.isnan(Pmax))
+        # no voltage crossing (V > 0 only): Jsc not found
+        arrV = np.arange(0.1, 1.4, 0.01)
+        fJsc, fVoc, fJm, fVm, Pmax, fFF = extractPV(arrV, getDiode(arrV))
+        self.assertTrue(math.isnan(fJsc))
+        self.assertFalse(math.isnan(fVoc))
+        # less than three points: nothing found, for one curve and for a stack
+        tupleT = extractPV([0.0, 0.5], [-20.0, -19.0])
+        self.assertTrue(all([math.isnan(fT) for fT in tupleT]))
+        tupleT = extractPV([0.0, 0.5], [[-20.0, -19.0], [-10.0, -9.0]])
+        self.assertTrue(all([(arrT.shape == (2,)) and np.all(np.isnan(arrT)) for arrT in tupleT]))
+        # a stack with one curve without crossing: NaN for this curve only
+        arrV = np.arange(-0.1, 1.4, 0.01)
+        arrJ = np.array([getDiode(arrV), np.full(len(arrV), -20.0)])
+        arrJsc, arrVoc, arrJm, arrVm, arrPmax, arrFF = extractPV(arrV, arrJ)
+        self.assertFalse(math.isnan(arrVoc[0]))
+        self.assertTrue(math.isnan(arrVoc[1]))
+        self.assertFalse(math.isnan(arrJsc[1]))
+    # end test_not_found
+
+# end TestExtractPV
+
+class TestCalcEfficiency(unittest.TestCase):
+
+    def test_diode(self):
+        # the J-V file content read by slalomJV: from the last reverse bias point to the third point in direct polarization
+        arrV = np.arange(-0.1, 1.4, 0.005)
+        listLine = ["v ATLAS\n", "header\n", "header\n", "header\n"] + [("%.6e %.6e\n" % (fV, fJ)) for fV, fJ in zip(arrV, getDiode(arrV))]
+        jvT = slalomJV.readLines(listLine, " ", 4)
+        outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT)
+        self.assertTrue(strWarning is None)
+        fVmX, PmaxX = getDiodeMPP()
+        self.assertAlmostEqual(fJsc, 20.0, places = 4)
+        self.assertAlmostEqual(fVoc, getDiodeVoc(), places = 3)
+        self.assertAlmostEqual(fVm, fVmX, places = 3)
+        self.assertAlmostEqual(outputT, 100.0 * PmaxX / 100.037, places = 3)
+        # the current at the maximum power point is negative (fJm, as in the J-V file) and Jsc positive
+        self.assertTrue(fJm < 0.0)
+        self.assertAlmostEqual(fFF, 100.0 * (-fJm * fVm) / (fJsc * fVoc), places = 3)
+    # end test_diode
+
+    def test_vocx(self):
+        # no current crossing and the last point in reverse bias: Voc approximated by vocx (the voltage before the first direct point)
+        arrV = np.arange(-0.1, 0.001, 0.005)
+        jvT = getJV(arrV, getDiode(arrV), fVocx = 0.8)
+        outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT)
+        self.assertTrue(strWarning is not None)
+        self.assertTrue("VOC = 0.80000" in strWarning)
+        self.assertTrue("Pmax not found" in strWarning)
+        self.assertEqual((outputT, fJsc, fVoc, fFF), (0.0, 0.0, 0.0, 0.0))
+        # vocx not known: Voc not found
+        jvT.vocx = 0.0
+        outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT)
+        self.assertTrue("VOC not found" in strWarning)
+    # end test_vocx
+
+    def test_last_point(self):
+        # the voltage range ending before Voc: Voc not found (the last voltage kept as approximation)
+        arrV = np.arange(-0.1, 0.6, 0.005)
+        jvT = getJV(arrV, getDiode(arrV))
+        outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT)
+        self.assertTrue("VOC not found" in strWarning)
+        self.assertTrue("JSC = 20.0" in strWarning)
+    # end test_last_point
+
+    def test_ffmax(self):
+        # an almost rectangular J-V curve (FF greater than ffMax): the maximum power not valid
+        arrV = np.arange(-0.1, 0.8, 0.002)
+        jvT = getJV(arrV, getDiode(arrV, fVt = 0.004, fJ0 = 1e-60))
+        outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT)
+        self.assertTrue("Pmax not found" in strWarning)
+        self.assertEqual((outputT, fJsc, fVoc, fFF), (0.0, 0.0, 0.0, 0.0))
+        # valid with a higher limit
+        outputT, fJm, fVm, fFF, fJsc, fVoc, strWarning = calcEfficiency(jvT, ffMax = 100.0)
+        self.assertTrue(strWarning is None)
+        self.assertTrue(95.0 <= fFF < 100.0)
+    # end test_ffmax
+
+# end TestCalcEfficiency
+
+if __name__ == "__main__":
+    unittest.main()
+# end if
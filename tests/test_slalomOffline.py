@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------------------------------
+# File:           test_slalomOffline.py
+# Use:            slalomOffline re-analysis of synthetic J-V files (python -m unittest discover tests)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from slalomOffline import *
+
+def writeJV(pathJV, paramValue, isJVP = False):
+    """ a diode J-V file as written by slalomCore (header then the simulator output), or its part from 0 V to Voc """
+
+    arrV = np.linspace(-0.1, 1.4, 301)
+    arrJ = 1e-12 * (np.exp(arrV / 0.0389) - 1.0) - 20.0
+    strT = "# Test\n# J(V) Characteristic (J in mA/cm2)\n# ParamA\tParamB\n# " + "\t".join(paramValue) + "\n# test\n"
+    strT += "v ATLAS\nheader\nheader\nheader\n"
+    strT += "".join([("%.6e %.6e\n" % (arrV[ii], arrJ[ii])) for ii in range(0, len(arrV))])
+    if isJVP:
+        strT = slalomJV.readLines(strT.splitlines(True), DataSeparator, LinesToSkip).content
+    # end if
+    fileT = open(pathJV, "w")
+    fileT.write(strT)
+    fileT.close()
+
+# end writeJV
+
+class TestReanalyze(unittest.TestCase):
+
+    def setUp(self):
+        self.dirT = tempfile.mkdtemp()
+        self.outputDir = os.path.join(self.dirT, "output")
+        os.makedirs(self.outputDir)
+        self.outputFilename = os.path.join(self.dirT, "reanalyzed.txt")
+    # end setUp
+
+    def tearDown(self):
+        shutil.rmtree(self.dirT, ignore_errors = True)
+    # end tearDown
+
+    def readRows(self):
+        fileT = open(self.outputFilename, "r")
+        listLine = [lineT.rstrip("\n") for lineT in fileT if (lineT.startswith("0") or lineT.startswith("# 0"))]
+        fileT.close()
+        return listLine
+    # end readRows
+
+    def test_full(self):
+        writeJV(os.path.join(self.outputDir, "simuloutput_jv_001_20260101-120000.log"), ["1.0", "2.0"])
+        writeJV(os.path.join(self.outputDir, "simuloutput_jvp_001_20260101-120000.log"), ["1.0", "2.0"], isJVP = True)
+
+        analyzedCount, failedCount = reanalyze([self.outputDir], self.outputFilename, workerCount = 1)
+        self.assertEqual((analyzedCount, failedCount), (1, 0))
+
+        listRow = self.readRows()
+        self.assertEqual(len(listRow), 1)
+        listT = listRow[0].split("\t")
+        self.assertEqual(listT[0:4], ["001", "20260101-120000", "1.0", "2.0"])
+        # Jm, Vm, FF, Jsc, Voc, efficiency of the diode
+        fFF, fJsc, fVoc = float(listT[6]), float(listT[7]), float(listT[8])
+        self.assertAlmostEqual(fJsc, 20.0, places = 2)
+        self.assertAlmostEqual(fVoc, 0.0389 * np.log(20.0 / 1e-12 + 1.0), places = 2)
+        self.assertTrue(70.0 < fFF < 95.0)
+    # end test_full
+
+    def test_jvp_only(self):
+        # cached evaluation: only the J-V from 0 V to Voc saved, listed as failed
+        writeJV(os.path.join(self.outputDir, "simuloutput_jv_001_20260101-120000.log"), ["1.0", "2.0"])
+        writeJV(os.path.join(self.outputDir, "simuloutput_jvp_002_20260101-120001.log"), ["3.0", "4.0"], isJVP = True)
+
+        analyzedCount, failedCount = reanalyze([self.outputDir], self.outputFilename, workerCount = 1)
+        self.assertEqual((analyzedCount, failedCount), (2, 1))
+
+        listRow = self.readRows()
+        self.assertEqual(len(listRow), 2)
+        self.assertFalse(listRow[0].startswith("#"))
+        self.assertTrue(listRow[1].startswith("# 002\t20260101-120001\t3.0\t4.0\tfailed: "))
+        self.assertTrue("0 V to Voc" in listRow[1])
+    # end test_jvp_only
+
+    def test_warning(self):
+        # the figures of merit not all found: the row commented out and counted as failed
+        rowT = (0, 1, "20260101-120000", "simuloutput_jv_001_20260101-120000.log", ["ParamA"], ["1.0"], (0.0, 0.0, 0.0, 0.0, 20.0, 0.0), "Cannot evaluate efficiency: VOC not found")
+        self.assertTrue(isFailed(rowT))
+        self.assertTrue(formatRow(rowT).startswith("# 001\t"))
+    # end test_warning
+
+# end TestReanalyze
+
+if __name__ == "__main__":
+    unittest.main()
+# end if
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------------------------------
+# File:           test_slalomResume.py
+# Use:            interrupted then resumed Brute optimization compared to an uninterrupted one...
+#                  ...the simulator replaced by an analytic efficiency (python -m unittest discover tests)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import slalomCore as slalomCoreModule
+from slalomCore import *
+from slalomDevice import *
+
+PackageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FixedRandom(object):
+    """ the optimization random seed fixed (the same for the uninterrupted and interrupted runs) """
+    def randint(self, a, b):
+        return 12345
+    # end randint
+# end FixedRandom
+
+def simulateEvaluation(evaluationT):
+    """ the analytic efficiency of a normalized parameters set, instead of the simulator """
+
+    evaluationT.outputT = 20.0 - 10.0 * float(np.sum((np.array(evaluationT.paramNormalized) - 0.3) ** 2))
+    evaluationT.fJm, evaluationT.fVm, evaluationT.fFF, evaluationT.fJsc, evaluationT.fVoc = 19.0, 0.9, 80.0, 20.0, 1.0
+    evaluationT.status = "done"
+    return True
+
+# end simulateEvaluation
+
+class TestResumeBrute(unittest.TestCase):
+
+    def setUp(self):
+        self.dirT = tempfile.mkdtemp()
+        self.systemRandom = slalomCoreModule.random.SystemRandom
+        slalomCoreModule.random.SystemRandom = FixedRandom
+    # end setUp
+
+    def tearDown(self):
+        slalomCoreModule.random.SystemRandom = self.systemRandom
+        shutil.rmtree(self.dirT, ignore_errors = True)
+    # end tearDown
+
+    def getOptimizer(self, nameT, outputDir = None, stopCount = None):
+        """ a Brute optimizer in its own device directory (resumed if outputDir given, stopped after stopCount evaluations) """
+
+        currentDir = os.path.join(self.dirT, nameT) + os.sep
+        if not os.path.isdir(currentDir):
+            shutil.copytree(os.path.join(PackageDir, "Device", "Silvaco"), currentDir)
+        # end if
+        Device = slalomDevice("InGaN_PN", currentDir)
+        Device.paramPoints = [4, 1, 3, 3, 1]
+        Device.validate()
+
+        Optimizer = slalomCore(Device, sys.executable, "atlas")
+        Optimizer.setScreening(0.8, screeningMin = 4)
+        if outputDir is not None:
+            Optimizer.setResume(outputDir)
+        # end if
+        Optimizer.simulateEvaluation = simulateEvaluation
+
+        if stopCount is not None:
+            commitEvaluation = Optimizer.commitEvaluation
+            def commitStop(evaluationT):
+                outputT = commitEvaluation(evaluationT)
+                if Optimizer.funcCounter > stopCount:
+                    open(Optimizer.outputDir + Optimizer.stopFilename, "w").close()
+                # end if
+                return outputT
+            # end commitStop
+            Optimizer.commitEvaluation = commitStop
+        # end if
+
+        return Optimizer
+
+    # end getOptimizer
+
+    @staticmethod
+    def runOptimizer(Optimizer):
+        try:
+            Optimizer.start("Brute")
+        except SystemExit:
+            pass
+        # end try
+    # end runOptimizer
+
+    @staticmethod
+    def getRows(Optimizer):
+        """ the results rows without the time column (evaluated and skipped grid points) """
+        fileT = open(Optimizer.outputDir + Optimizer.outputOptimizedFilename, "r")
+        listRow = list()
+        for lineT in fileT:
+            listT = lineT.rstrip("\r\n").split("\t")
+            if (len(listT) > 2) and (listT[0].lstrip("# ").isdigit()):
+                listRow.append("\t".join([listT[0]] + listT[2:]))
+            # end if
+        # end for
+        fileT.close()
+        return sorted(listRow)
+    # end getRows
+
+    def test_resume(self):
+        OptimizerFull = self.getOptimizer("full")
+        self.runOptimizer(OptimizerFull)
+
+        OptimizerStopped = self.getOptimizer("resumed", stopCount = 8)
+        self.runOptimizer(OptimizerStopped)
+        self.assertTrue(OptimizerStopped.funcCounter < OptimizerFull.funcCounter)
+
+        OptimizerResumed = self.getOptimizer("resumed", outputDir = OptimizerStopped.outputDir)
+        self.runOptimizer(OptimizerResumed)
+
+        # the maximum, counters and skipped points as if not interrupted
+        self.assertEqual(OptimizerResumed.outputOptimized, OptimizerFull.outputOptimized)
+        self.assertTrue(np.array_equal(OptimizerResumed.paramOptim, OptimizerFull.paramOptim))
+        self.assertEqual(OptimizerResumed.funcCounter, OptimizerFull.funcCounter)
+        self.assertEqual(OptimizerResumed.screenedCount, OptimizerFull.screenedCount)
+        self.assertEqual(self.getRows(OptimizerResumed), self.getRows(OptimizerFull))
+    # end test_resume
+
+# end TestResumeBrute
+
+if __name__ == "__main__":
+    unittest.main()
+# end if
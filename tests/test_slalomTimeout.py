@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# ------------------------------------------------------------------------------------------------------
+# File:           test_slalomTimeout.py
+# Use:            one simulator timeout in a L-BFGS-B optimization (failure policies "abort" and "penalty")...
+#                  ...the simulator replaced by an analytic efficiency (python -m unittest discover tests)
+# ------------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import slalomCore as slalomCoreModule
+from slalomCore import *
+from slalomDevice import *
+
+PackageDir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+class FixedRandom(object):
+    """ the optimization random seed fixed """
+    def randint(self, a, b):
+        return 12345
+    # end randint
+# end FixedRandom
+
+class TestTimeout(unittest.TestCase):
+
+    def setUp(self):
+        self.dirT = tempfile.mkdtemp()
+        self.systemRandom = slalomCoreModule.random.SystemRandom
+        slalomCoreModule.random.SystemRandom = FixedRandom
+    # end setUp
+
+    def tearDown(self):
+        slalomCoreModule.random.SystemRandom = self.systemRandom
+        shutil.rmtree(self.dirT, ignore_errors = True)
+    # end tearDown
+
+    def getOptimizer(self, failurePolicy):
+        """ a L-BFGS-B optimizer whose second evaluation (in the first Jacobian) times out """
+
+        currentDir = os.path.join(self.dirT, failurePolicy) + os.sep
+        shutil.copytree(os.path.join(PackageDir, "Device", "Silvaco"), currentDir)
+        Device = slalomDevice("InGaN_PN", currentDir)
+        Device.validate()
+
+        Optimizer = slalomCore(Device, sys.executable, "atlas")
+        Optimizer.setMinimizeMethod("L-BFGS-B", maxIter = 4, tolerance = 1e-3, optimPoints = 21)
+        Optimizer.setFailurePolicy(failurePolicy)
+
+        self.outputList = list()
+        simulatedCount = [0]
+
+        def simulateEvaluation(evaluationT):
+            """ the analytic efficiency of a normalized parameters set, instead of the simulator """
+            simulatedCount[0] += 1
+            if simulatedCount[0] == 2:
+                evaluationT.status = "failed"
+                evaluationT.isTimeout = True
+                evaluationT.warning.append("Simulator stopped: still running after 1.0 seconds (timeout)")
+                return True
+            # end if
+            evaluationT.outputT = 20.0 - 10.0 * float(np.sum((np.array(evaluationT.paramNormalized) - 0.3) ** 2))
+            evaluationT.fJm, evaluationT.fVm, evaluationT.fFF, evaluationT.fJsc, evaluationT.fVoc = 19.0, 0.9, 80.0, 20.0, 1.0
+            evaluationT.status = "done"
+            return True
+        # end simulateEvaluation
+        Optimizer.simulateEvaluation = simulateEvaluation
+
+        commitEvaluation = Optimizer.commitEvaluation
+        def commitOutput(evaluationT):
+            outputT = commitEvaluation(evaluationT)
+            self.outputList.append((evaluationT.isTimeout, outputT))
+            return outputT
+        # end commitOutput
+        Optimizer.commitEvaluation = commitOutput
+
+        return Optimizer
+
+    # end getOptimizer
+
+    def test_abort(self):
+        # the timeout stops the optimization, as a simulator error
+        Optimizer = self.getOptimizer("abort")
+        self.assertRaises(SystemExit, Optimizer.start, "Optim")
+        self.assertEqual(Optimizer.timeoutCounter, 1)
+        self.assertEqual(Optimizer.failedCount, 1)
+        self.assertEqual(Optimizer.funcCounter, 2)
+        self.assertEqual(len(self.outputList), 1)
+    # end test_abort
+
+    def test_penalty(self):
+        # the timed out evaluation is given the penalty as efficiency (the worst value for the minimizer)
+        Optimizer = self.getOptimizer("penalty")
+        try:
+            Optimizer.start("Optim")
+        except SystemExit:
+            pass
+        # end try
+        self.assertEqual(Optimizer.timeoutCounter, 1)
+        listTimeout = [outputT for isTimeout, outputT in self.outputList if isTimeout]
+        self.assertEqual(listTimeout, [1.0])
+        self.assertTrue(min([outputT for isTimeout, outputT in self.outputList]) > 0.0)
+        # the first efficiency is about 10.2 %: the timed out point not taken as a maximum by the minimizer
+        self.assertTrue(Optimizer.outputOptimized > 14.0)
+    # end test_penalty
+
+# end TestTimeout
+
+if __name__ == "__main__":
+    unittest.main()
+# end if